@@ -0,0 +1,222 @@
+# app/config/indexes.py
+
+import argparse
+from datetime import datetime
+from pymongo.errors import PyMongoError
+from app.config.mongo import db
+
+# Declarative index registry: collection name -> index specs.
+# `keys` is a list of (field, direction); any other entry is passed to create_index.
+INDEXES = {
+    "articles": [
+        {"name": "url_unique", "keys": [("url", 1)], "unique": True},
+        # Feed sorts paginate on (sort key, _id); each index serves both directions
+        {"name": "created_at_id", "keys": [("created_at", -1), ("_id", -1)]},
+        {"name": "category_created_at_id", "keys": [("category", 1), ("created_at", -1), ("_id", -1)]},
+        {"name": "tags_created_at_id", "keys": [("tags", 1), ("created_at", -1), ("_id", -1)]},
+        {"name": "upvotes_id", "keys": [("upvotes", -1), ("_id", -1)]},
+        {"name": "category_upvotes_id", "keys": [("category", 1), ("upvotes", -1), ("_id", -1)]},
+        {"name": "tags_upvotes_id", "keys": [("tags", 1), ("upvotes", -1), ("_id", -1)]},
+        {"name": "hot_score_id", "keys": [("hot_score", -1), ("_id", -1)]},
+        {"name": "category_hot_score_id", "keys": [("category", 1), ("hot_score", -1), ("_id", -1)]},
+        # Full-text search (GET /article/search) and title prefix autocomplete
+        {
+            "name": "article_text",
+            "keys": [("title", "text"), ("summary", "text"), ("tags", "text"), ("content", "text")],
+            "weights": {"title": 10, "tags": 5, "summary": 3, "content": 1},
+            "default_language": "english",
+        },
+        {"name": "title_terms", "keys": [("title_terms", 1)]},
+        # Incremental export (GET /admin/export/articles) walks (updated_at, _id)
+        {"name": "updated_at_id", "keys": [("updated_at", 1), ("_id", 1)]},
+    ],
+    "raw_articles": [
+        {"name": "url_unique", "keys": [("url", 1)], "unique": True},
+    ],
+    "comments": [
+        {"name": "article_id_created_at", "keys": [("article_id", 1), ("created_at", 1)]},
+    ],
+    "analytics": [
+        {"name": "user_id_unique", "keys": [("user_id", 1)], "unique": True},
+    ],
+    "feeds_metadata": [
+        {"name": "feed_url_unique", "keys": [("feed_url", 1)], "unique": True},
+    ],
+    # Time-series charts read one document per day in a date range
+    "article_stats_hourly": [
+        {"name": "article_id_day", "keys": [("article_id", 1), ("day", 1)]},
+    ],
+    "category_stats_hourly": [
+        {"name": "category_day", "keys": [("category", 1), ("day", 1)]},
+    ],
+    # Reading log: a user's recent reads, "already read?" checks, last-week counts
+    "reading_events": [
+        {"name": "user_id_ts", "keys": [("user_id", 1), ("ts", -1)]},
+        {"name": "user_id_article_id", "keys": [("user_id", 1), ("article_id", 1)]},
+    ],
+    "pipeline_logs": [
+        {"name": "timestamp_desc", "keys": [("timestamp", -1)]},
+    ],
+}
+
+# Representative shapes of the hot queries in routes/ and services/.
+# explain_hot_queries() runs each one and flags any that fall back to a collection scan.
+HOT_QUERIES = [
+    {"name": "article feed (new)", "collection": "articles", "filter": {}, "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "article feed (old)", "collection": "articles", "filter": {}, "sort": [("created_at", 1), ("_id", 1)]},
+    {"name": "article feed (top)", "collection": "articles", "filter": {}, "sort": [("upvotes", -1), ("_id", -1)]},
+    {"name": "article feed by category", "collection": "articles", "filter": {"category": "Technology"}, "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "article feed by category (top)", "collection": "articles", "filter": {"category": "Technology"}, "sort": [("upvotes", -1), ("_id", -1)]},
+    {"name": "article feed by tag", "collection": "articles", "filter": {"tags": "ai"}, "sort": [("created_at", -1), ("_id", -1)]},
+    {"name": "article feed (hot) / trending", "collection": "articles", "filter": {}, "sort": [("hot_score", -1), ("_id", -1)]},
+    {"name": "article feed by category (hot)", "collection": "articles", "filter": {"category": "Technology"}, "sort": [("hot_score", -1), ("_id", -1)]},
+    {"name": "full-text search", "collection": "articles", "filter": {"$text": {"$search": "election"}}},
+    {"name": "title autocomplete", "collection": "articles", "filter": {"title_terms": {"$regex": "^ele"}}},
+    {"name": "article export since watermark", "collection": "articles", "filter": {"updated_at": {"$gte": datetime(2024, 1, 1)}}, "sort": [("updated_at", 1), ("_id", 1)]},
+    {"name": "article dedupe by url", "collection": "articles", "filter": {"url": "https://example.com/a"}},
+    {"name": "raw article dedupe by url", "collection": "raw_articles", "filter": {"url": "https://example.com/a"}},
+    {"name": "comments for article", "collection": "comments", "filter": {"article_id": "000000000000000000000000"}, "sort": [("created_at", 1)]},
+    {"name": "user analytics", "collection": "analytics", "filter": {"user_id": "user"}},
+    {"name": "recent reads for user", "collection": "reading_events", "filter": {"user_id": "user"}, "sort": [("ts", -1)]},
+    {"name": "already-read check", "collection": "reading_events", "filter": {"user_id": {"$in": ["user"]}, "article_id": {"$in": ["000000000000000000000000"]}}},
+    {"name": "feed metadata", "collection": "feeds_metadata", "filter": {"feed_url": "https://example.com/rss"}},
+]
+
+
+def _index_options(spec: dict) -> dict:
+    return {k: v for k, v in spec.items() if k != "keys"}
+
+
+def ensure_indexes(database=db) -> dict:
+    """
+    Create every registered index. Safe to run repeatedly: create_index is
+    a no-op when an identical index already exists. Failures (e.g. duplicate
+    values blocking a unique index) are reported, not raised.
+    """
+    report = {"created": [], "failed": []}
+    for collection_name, specs in INDEXES.items():
+        collection = database[collection_name]
+        for spec in specs:
+            try:
+                collection.create_index(spec["keys"], **_index_options(spec))
+                report["created"].append(f"{collection_name}.{spec['name']}")
+            except PyMongoError as e:
+                print(f"[Indexes] Failed to create {collection_name}.{spec['name']}: {e}")
+                report["failed"].append({"index": f"{collection_name}.{spec['name']}", "error": str(e)})
+    return report
+
+
+def check_indexes(database=db) -> dict:
+    """
+    Compare the indexes that exist in Mongo with the registry.
+    Returns missing, mismatched (same name, different keys/options) and
+    unregistered indexes per collection.
+    """
+    report = {"missing": [], "mismatched": [], "unregistered": []}
+    for collection_name, specs in INDEXES.items():
+        existing = database[collection_name].index_information()
+        registered = {spec["name"] for spec in specs}
+
+        for spec in specs:
+            info = existing.get(spec["name"])
+            label = f"{collection_name}.{spec['name']}"
+            if not info:
+                report["missing"].append(label)
+                continue
+            if any(direction == "text" for _, direction in spec["keys"]):
+                # Text indexes are stored as _fts/_ftsx keys; compare the indexed fields instead
+                same_keys = set(info.get("weights", {})) == {field for field, _ in spec["keys"]}
+            else:
+                same_keys = [tuple(k) for k in info["key"]] == [tuple(k) for k in spec["keys"]]
+            same_unique = bool(info.get("unique")) == bool(spec.get("unique"))
+            if not (same_keys and same_unique):
+                report["mismatched"].append(label)
+
+        for name in existing:
+            if name != "_id_" and name not in registered:
+                report["unregistered"].append(f"{collection_name}.{name}")
+    return report
+
+
+def _plan_stages(plan, stages: list, indexes: list):
+    # Explain output nests stages differently across server versions; walk all of it
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "indexName" in plan:
+            indexes.append(plan["indexName"])
+        for value in plan.values():
+            _plan_stages(value, stages, indexes)
+    elif isinstance(plan, list):
+        for item in plan:
+            _plan_stages(item, stages, indexes)
+
+
+def explain_hot_queries(database=db) -> list:
+    """
+    Explain every query in HOT_QUERIES and report the winning plan's
+    stages and indexes. Entries with `collscan: True` need an index.
+    """
+    results = []
+    for q in HOT_QUERIES:
+        cursor = database[q["collection"]].find(q["filter"])
+        if q.get("sort"):
+            cursor = cursor.sort(q["sort"])
+        try:
+            explain = cursor.limit(20).explain()
+        except PyMongoError as e:
+            results.append({"query": q["name"], "error": str(e)})
+            continue
+
+        stages, indexes = [], []
+        _plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}), stages, indexes)
+        results.append({
+            "query": q["name"],
+            "collection": q["collection"],
+            "collscan": "COLLSCAN" in stages,
+            "stages": stages,
+            "indexes": indexes,
+        })
+    return results
+
+
+def verify_indexes_on_startup():
+    """
+    Apply the registry and log anything that still differs from it.
+    Called from the app lifespan.
+    """
+    created = ensure_indexes()
+    report = check_indexes()
+    if created["failed"] or report["missing"] or report["mismatched"]:
+        print(f"[Indexes] ⚠️ Index registry not fully applied: failed={created['failed']}, "
+              f"missing={report['missing']}, mismatched={report['mismatched']}")
+    else:
+        print(f"[Indexes] ✅ {len(created['created'])} registered indexes verified")
+    if report["unregistered"]:
+        print(f"[Indexes] Unregistered indexes present: {report['unregistered']}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage MongoDB indexes from the registry.")
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes")
+    parser.add_argument("--explain", action="store_true", help="Explain hot queries and flag collection scans")
+    args = parser.parse_args()
+
+    if args.apply:
+        result = ensure_indexes()
+        print(f"Applied {len(result['created'])} indexes, {len(result['failed'])} failed")
+        for failure in result["failed"]:
+            print(f"  ❌ {failure['index']}: {failure['error']}")
+
+    status = check_indexes()
+    for key in ("missing", "mismatched", "unregistered"):
+        print(f"{key}: {', '.join(status[key]) or '-'}")
+
+    if args.explain:
+        for row in explain_hot_queries():
+            if "error" in row:
+                print(f"  ⚠️ {row['query']}: {row['error']}")
+                continue
+            flag = "❌ COLLSCAN" if row["collscan"] else "✅"
+            print(f"  {flag} {row['query']} -> {', '.join(row['indexes']) or '-'} ({' > '.join(row['stages'])})")
@@ -23,5 +23,26 @@ comments_collection = db["comments"]
 analytics_collection = db["analytics"]
 pipeline_logs_collection = db["pipeline_logs"]
 feeds_metadata_collection = db["feeds_metadata"]
+reprocess_checkpoints_collection = db["reprocess_checkpoints"]
+# Hourly engagement buckets (see services/timeseries_service.py)
+article_stats_collection = db["article_stats_hourly"]
+category_stats_collection = db["category_stats_hourly"]
+# Append-only reading log and per-user reading aggregates (see services/reading_service.py)
+reading_events_collection = db["reading_events"]
+reading_stats_collection = db["reading_stats"]
+
+# Async (Motor) client for request handlers — `async def` routes must use these
+# so a slow query never blocks the event loop. The sync client above is for
+# background jobs and schedulers only.
+async_client = AsyncIOMotorClient(MONGO_URI)
+async_db = async_client[MONGO_DB_NAME]
+
+async_articles_collection = async_db["articles"]
+async_comments_collection = async_db["comments"]
+async_analytics_collection = async_db["analytics"]
+async_article_stats_collection = async_db["article_stats_hourly"]
+async_category_stats_collection = async_db["category_stats_hourly"]
+async_reading_events_collection = async_db["reading_events"]
+async_reading_stats_collection = async_db["reading_stats"]
 
 print(f"✅ Connected to MongoDB database: {MONGO_DB_NAME}")
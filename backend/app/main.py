@@ -1,22 +1,38 @@
 from fastapi import FastAPI
 # from app.routes import auth, articles, comments, vocab, ai_tools
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, article, comments, bookmarks, admin, analytics, vocab, finance
+from app.routes import auth, article, comments, bookmarks, admin, analytics, vocab, finance, tags
 from contextlib import asynccontextmanager
 from app.services.scheduler import start_scheduler
 from app.services.analytics_scheduler import start_flusher_scheduler
+from app.config.indexes import verify_indexes_on_startup
+from app.services.view_buffer import view_buffer
+from app.utils.async_redis_client import close_async_redis_client
+from fastapi.concurrency import run_in_threadpool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Startup: make sure the registered Mongo indexes exist
+    try:
+        await run_in_threadpool(verify_indexes_on_startup)
+    except Exception as e:
+        print(f"[Indexes] Startup verification failed: {e}")
+
     # Startup: start the scheduler
     start_scheduler()
     
     start_flusher_scheduler() 
 
+    # Startup: batch article views in-process before they reach Redis
+    view_buffer.start()
+
     yield
     
     # Shutdown: optional cleanup
     print("Shutting down application...")
+    # Buffered views must not be lost on shutdown/redeploy
+    await run_in_threadpool(view_buffer.stop)
+    await close_async_redis_client()
 
 # app = FastAPI(title="Intelligent News Aggregator", lifespan=lifespan,docs_url=None, redoc_url=None, openapi_url=None)
 app = FastAPI(title="Intelligent News Aggregator", lifespan=lifespan)
@@ -28,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -39,6 +56,7 @@ app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])   
 app.include_router(vocab.router, prefix="/vocab", tags=["vocab"])
 app.include_router(finance.router, prefix="/finance", tags=["finance"])
+app.include_router(tags.router, prefix="/tags", tags=["tags"])
 # app.include_router(ai_tools.router, prefix="/ai", tags=["ai_tools"])
 
 @app.get("/")
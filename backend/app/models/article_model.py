@@ -21,6 +21,7 @@ class ArticleDB(ArticleBase):
     downvotes: int = 0
     comments_count: int = 0
     views: int = 0
+    unique_readers: int = 0                  # HyperLogLog estimate
     created_at: datetime
     updated_at: datetime
 
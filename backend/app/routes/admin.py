@@ -1,12 +1,20 @@
 # app/routes/admin.py
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query
+import json
+import zlib
+from bson import ObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.services.news_pipeline import fetch_and_process_feeds, process_raw_article
 from app.services.vocab_scheduler import refresh_daily_vocab
-from app.config.mongo import raw_articles_collection, articles_collection
+from app.config.mongo import raw_articles_collection, articles_collection, async_articles_collection
 from app.utils.dependencies import get_current_admin
 from app.config.mongo import db
+from app.services.job_manager import job_manager
+from app.utils.fast_json import dumps as json_dumps
+from app.utils.pagination import keyset_filter
+from app.services.reprocess_service import reprocess_articles, DEFAULT_BATCH_SIZE, DEFAULT_CPU_BUDGET
 import asyncio
 
 router = APIRouter()
@@ -20,17 +28,178 @@ FEEDS = [
     "https://feeds.arstechnica.com/arstechnica/index"
 ]
 
-@router.post("/refresh")
+async def _run_refresh(job):
+    results = await fetch_and_process_feeds(FEEDS, job=job)
+    processed_count = len([r for r in results if r and not isinstance(r, Exception)])
+    return {"processed_articles": processed_count}
+
+@router.post("/refresh", status_code=202)
 async def manual_refresh(user=Depends(get_current_admin)):
     """
-    Manually trigger the news pipeline to fetch latest articles from all feeds.
-    Only new articles since last fetch will be processed.
+    Queue the news pipeline to fetch latest articles from all feeds.
+    Returns immediately with a job id; poll GET /admin/jobs/{id} for progress.
+    A refresh triggered while another is still running joins that job.
     """
     # refresh_daily_vocab()
     # return {"detail": "Daily vocab refresh triggered"}
-    results = await fetch_and_process_feeds(FEEDS)
-    processed_count = len([r for r in results if r])
-    return {"detail": "Pipeline triggered", "processed_articles": processed_count}
+    job, created = job_manager.submit(
+        "refresh",
+        _run_refresh,
+        params={"feeds": len(FEEDS)},
+        coalesce_key="refresh",
+    )
+    return {
+        "detail": "Pipeline queued" if created else "Pipeline already running",
+        "job_id": job.id,
+        "coalesced": not created,
+        "status": job.status,
+    }
+
+@router.post("/reprocess", status_code=202)
+async def reprocess_stored_articles(
+    category: str | None = Query(None),
+    since: datetime | None = Query(None, description="Only articles created at/after this time"),
+    until: datetime | None = Query(None, description="Only articles created before this time"),
+    model_version: int | None = Query(None, description="Only articles produced by this nlp_version"),
+    include_current: bool = Query(False, description="Also redo articles already on the current NLP version"),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=256),
+    cpu_budget: float = Query(DEFAULT_CPU_BUDGET, gt=0, le=1),
+    limit: int | None = Query(None, ge=1),
+    user=Depends(get_current_admin)
+):
+    """
+    Queue a resumable batch job that re-runs summarization, categories and
+    keywords over stored articles. Only one reprocess job runs at a time.
+    """
+    params = {
+        "category": category,
+        "since": since,
+        "until": until,
+        "model_version": model_version,
+        "outdated_only": not include_current,
+        "batch_size": batch_size,
+        "cpu_budget": cpu_budget,
+        "limit": limit,
+    }
+
+    async def _run_reprocess(job):
+        return await asyncio.to_thread(reprocess_articles, job=job, **params)
+
+    job, created = job_manager.submit(
+        "reprocess",
+        _run_reprocess,
+        params={k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in params.items()},
+        coalesce_key="reprocess",
+    )
+    return {
+        "detail": "Reprocessing queued" if created else "Reprocessing already running",
+        "job_id": job.id,
+        "coalesced": not created,
+        "status": job.status,
+    }
+
+@router.get("/jobs")
+async def list_jobs(user=Depends(get_current_admin)):
+    """
+    List recent background jobs, newest first.
+    """
+    return {"jobs": job_manager.list_jobs()}
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    stream: bool = Query(False, description="Stream NDJSON progress snapshots until the job finishes"),
+    interval: float = Query(1.0, ge=0.2, le=10, description="Seconds between streamed snapshots"),
+    user=Depends(get_current_admin)
+):
+    """
+    Return a job's status and progress counters (feeds done, items scraped,
+    NLP completed). With stream=true the response stays open and emits one
+    JSON line per interval until the job completes or fails.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not stream:
+        return job.snapshot()
+
+    async def progress_stream():
+        while True:
+            yield json.dumps(job.snapshot()) + "\n"
+            if not job.is_active:
+                break
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(progress_stream(), media_type="application/x-ndjson")
+
+# ---------------------
+# Bulk export (NDJSON)
+# ---------------------
+EXPORT_BATCH_SIZE = 1000
+
+@router.get("/export/articles")
+async def export_articles(
+    request: Request,
+    since: datetime | None = Query(None, description="Only articles updated at/after this time (watermark)"),
+    after_id: str | None = Query(None, description="With `since`: resume strictly after this _id at that timestamp"),
+    fields: str | None = Query(None, description="Comma-separated fields to export; defaults to the whole document"),
+    limit: int | None = Query(None, ge=1, description="Stop after this many documents"),
+    compress: bool = Query(True, description="gzip the stream when the client accepts it"),
+    user=Depends(get_current_admin)
+):
+    """
+    Stream articles as NDJSON ordered by (updated_at, _id), straight from a
+    Mongo cursor with constant memory. For incremental pulls, pass the last
+    line's updated_at as `since` and its _id as `after_id`. Without
+    `after_id`, `since` is inclusive (at-least-once); `after_id` without
+    `since` is rejected.
+    """
+    query = {}
+    if after_id and not since:
+        # The export is ordered by updated_at first, so an _id alone is no resume point
+        raise HTTPException(status_code=422, detail="after_id requires since")
+    if since and after_id:
+        if not ObjectId.is_valid(after_id):
+            raise HTTPException(status_code=400, detail="Invalid after_id")
+        query = keyset_filter("updated_at", 1, since, ObjectId(after_id))
+    elif since:
+        query = {"updated_at": {"$gte": since}}
+
+    projection = None
+    if fields:
+        names = [f.strip() for f in fields.split(",") if f.strip() and not f.strip().startswith("$")]
+        # The watermark fields are always included so the pull can resume
+        projection = {name: 1 for name in names} | {"updated_at": 1}
+
+    cursor = (
+        async_articles_collection.find(query, projection)
+        .sort([("updated_at", 1), ("_id", 1)])
+        .batch_size(EXPORT_BATCH_SIZE)
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+
+    use_gzip = compress and "gzip" in request.headers.get("accept-encoding", "").lower()
+
+    async def ndjson_stream():
+        # wbits=31 writes a gzip container around the deflate stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if use_gzip else None
+        chunk = []
+        async for doc in cursor:
+            chunk.append(json_dumps(doc))
+            if len(chunk) >= EXPORT_BATCH_SIZE:
+                data = b"\n".join(chunk) + b"\n"
+                chunk = []
+                yield compressor.compress(data) if compressor else data
+        data = b"\n".join(chunk) + b"\n" if chunk else b""
+        if compressor:
+            yield compressor.compress(data) + compressor.flush()
+        elif data:
+            yield data
+
+    headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if use_gzip else {}
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson", headers=headers)
 
 # @router.post("/refresh")
 # async def manual_refresh(
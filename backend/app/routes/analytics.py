@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.services.analytics_service import analytics_service
 from app.utils.dependencies import get_current_user  # your existing JWT auth dependency
 
@@ -8,25 +8,66 @@ router = APIRouter()
 # Public / site-wide analytics
 # -------------------------------
 @router.get("/trending")
-def get_trending_articles(limit: int = 10):
-    return analytics_service.get_trending_articles(limit)
+async def get_trending_articles(
+    limit: int = Query(10, ge=1, le=100),
+    window: str = Query("24h", pattern="^(1h|24h|7d)$")
+):
+    return await analytics_service.get_trending_articles(limit, window)
+
+@router.get("/articles/{article_id}/unique-readers")
+async def get_unique_readers(article_id: str, days: int = Query(7, ge=1, le=7)):
+    return await analytics_service.get_unique_readers(article_id, days)
+
+SERIES_RESOLUTION = "^(hour|6h|day)$"
+SERIES_METRICS = {"views", "upvotes", "downvotes"}
+
+def _series_metrics(metrics: str | None):
+    if not metrics:
+        return None
+    names = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = [m for m in names if m not in SERIES_METRICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    return names
+
+@router.get("/articles/{article_id}/series")
+async def get_article_series(
+    article_id: str,
+    days: int = Query(7, ge=1, le=90),
+    resolution: str = Query("hour", pattern=SERIES_RESOLUTION),
+    metrics: str | None = Query(None, description="Comma-separated: views, upvotes, downvotes")
+):
+    return await analytics_service.get_engagement_series(
+        article_id=article_id, days=days, resolution=resolution, metrics=_series_metrics(metrics)
+    )
+
+@router.get("/series")
+async def get_engagement_series(
+    category: str | None = Query(None, description="Omit for site-wide totals"),
+    days: int = Query(7, ge=1, le=90),
+    resolution: str = Query("hour", pattern=SERIES_RESOLUTION),
+    metrics: str | None = Query(None, description="Comma-separated: views, upvotes, downvotes")
+):
+    return await analytics_service.get_engagement_series(
+        category=category, days=days, resolution=resolution, metrics=_series_metrics(metrics)
+    )
 
 @router.get("/top-categories")
-def get_top_categories(limit: int = 5):
-    return analytics_service.get_top_categories(limit)
+async def get_top_categories(limit: int = 5):
+    return await analytics_service.get_top_categories(limit)
 
 @router.get("/daily-counts")
-def get_daily_counts(days: int = 7):
-    return analytics_service.get_daily_article_counts(days)
+async def get_daily_counts(days: int = 7):
+    return await analytics_service.get_daily_article_counts(days)
 
 
 # -------------------------------
 # User analytics (requires auth)
 # -------------------------------
 @router.get("/dashboard")
-def get_user_dashboard(user=Depends(get_current_user)):
+async def get_user_dashboard(user=Depends(get_current_user)):
     """
     Fetch the analytics dashboard for the logged-in user.
     Combines Supabase gamification + MongoDB reading history.
     """
-    return analytics_service.get_user_dashboard_data(user["id"])
\ No newline at end of file
+    return await analytics_service.get_user_dashboard_data(user["id"])
\ No newline at end of file
@@ -3,32 +3,58 @@ from typing import List, Optional
 from bson import ObjectId
 from datetime import datetime, timedelta
 from app.models.article_model import ArticleDB
-from app.config.mongo import articles_collection
+from app.config.mongo import async_articles_collection
 from app.utils.dependencies import get_current_user
 from fastapi import Request
 from fastapi.security.utils import get_authorization_scheme_param
-from app.services.views_service import increment_article_view
-from app.utils.supabase_auth import verify_token
+from app.services.view_buffer import view_buffer
+from app.services.unique_readers_service import anonymous_reader_id
+from app.utils.auth_cache import get_token_payload
+from app.services.votes_service import record_vote
+from app.services.search_service import search_articles, autocomplete_titles
+from app.services.feed_service import get_for_you_feed
+from app.utils.pagination import ARTICLE_SORTS, encode_cursor, decode_cursor, keyset_filter, keyset_sort
+from app.utils.response_cache import article_list_cache, article_list_tags
+from app.utils.fast_json import MongoJSONResponse
+from app.utils.http_cache import (
+    make_etag, etag_matches, cache_headers, not_modified,
+    PUBLIC_DETAIL_CACHE, PUBLIC_LIST_CACHE, PRIVATE_CACHE
+)
 
 router = APIRouter()
 
-# Helper: convert Mongo _id to string
-def serialize_article(article) -> dict:
-    article["_id"] = str(article["_id"])
-    return article
+# Fields returned for feed cards. The full `content` body is left out of
+# list responses unless a caller explicitly asks for it via `fields=`.
+CARD_FIELDS = [
+    "title", "url", "summary", "image_url", "category", "tags", "sentiment",
+    "source_url", "upvotes", "downvotes", "comments_count", "views", "unique_readers",
+    "created_at", "updated_at"
+]
+ARTICLE_FIELDS = set(CARD_FIELDS) | {"content", "author_email"}
 
-# ---------------------
-# List Articles (with optional category/tag filter & cursor-based pagination)
-# ---------------------
-@router.get("/", response_model=dict)
-def get_articles(
-    cursor: Optional[datetime] = Query(None),
-    limit: int = 20,
-    category: Optional[str] = Query(None),
-    tag: Optional[str] = Query(None),
-    sort_by: Optional[str] = Query("new"),  # default: newest first
-    date_filter: Optional[str] = Query(None)  # e.g. 'today', 'last_hour'
-):
+# Article detail returns exactly the ArticleDB fields (with its defaults for
+# counters an older document lacks); counters_version is read for the ETag only.
+DETAIL_DEFAULTS = {
+    name: field.get_default() for name, field in ArticleDB.model_fields.items()
+    if not field.is_required()
+}
+DETAIL_PROJECTION = {
+    (field.alias or name): 1 for name, field in ArticleDB.model_fields.items()
+} | {"counters_version": 1}
+
+# Helper: build a Mongo projection from a comma-separated `fields` value
+def build_projection(fields: Optional[str]) -> dict:
+    if not fields:
+        return {name: 1 for name in CARD_FIELDS}
+
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in ARTICLE_FIELDS and n != "_id"]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return {name: 1 for name in names if name != "_id"} or {name: 1 for name in CARD_FIELDS}
+
+# Helper: category / tag / date filters shared by the feed and search
+def build_filters(category: Optional[str], tag: Optional[str], date_filter: Optional[str]) -> dict:
     query = {}
 
     # Category / tag filters
@@ -44,47 +70,136 @@ def get_articles(
     elif date_filter == "last_hour":
         query["created_at"] = {"$gte": now - timedelta(hours=1)}
 
-    # Cursor-based pagination
-    if cursor:
-        query["created_at"] = {**query.get("created_at", {}), "$lt": cursor}
+    return query
+
+# Article endpoints return MongoJSONResponse: documents are encoded straight
+# to JSON (ObjectId/datetime included) and response_model only documents them.
+
+# ---------------------
+# List Articles (with optional category/tag filter & keyset pagination)
+# ---------------------
+@router.get("/", response_model=dict)
+async def get_articles(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page"),
+    limit: int = 20,
+    category: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None),
+    sort_by: Optional[str] = Query("new"),  # new | old | top | hot (time-decayed score)
+    date_filter: Optional[str] = Query(None),  # e.g. 'today', 'last_hour'
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; defaults to the card shape (no content)")
+):
+    # Sorting logic (unknown values fall back to newest first)
+    sort_key = sort_by if sort_by in ARTICLE_SORTS else "new"
+    projection = build_projection(fields)
+    if date_filter not in ("today", "last_hour"):
+        date_filter = None
+    decoded_cursor = decode_cursor(cursor, sort_key) if cursor else None
+
+    # Normalized parameters: equivalent requests share one cache entry
+    params = {
+        "cursor": cursor,
+        "limit": limit,
+        "category": category,
+        "tag": tag,
+        "sort_by": sort_key,
+        "date_filter": date_filter,
+        "fields": sorted(projection),
+    }
+    entry = await article_list_cache.get_or_compute_entry(
+        params,
+        article_list_tags(category, tag),
+        lambda: fetch_article_page(decoded_cursor, limit, category, tag, sort_key, date_filter, projection),
+    )
+    payload = entry["payload"]
+
+    # ETag: the page's id set plus the cache watermark (entry key + compute time)
+    etag = make_etag(
+        ",".join(str(a.get("_id")) for a in payload["articles"]),
+        payload.get("next_cursor"),
+        entry["key"],
+        entry.get("computed_at"),
+    )
+    headers = cache_headers(etag, PUBLIC_LIST_CACHE)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    return MongoJSONResponse(payload, headers=headers)
+
+async def fetch_article_page(decoded_cursor, limit, category, tag, sort_key, date_filter, projection) -> dict:
+    sort_field, sort_order = ARTICLE_SORTS[sort_key]
+    # next_cursor is built from the sort key, so always fetch it
+    projection = {**projection, sort_field: 1}
 
-    # Sorting logic
-    sort_field = "created_at"
-    sort_order = -1  # descending by default
+    query = build_filters(category, tag, date_filter)
 
-    if sort_by == "new":
-        sort_field = "created_at"
-        sort_order = -1
-    elif sort_by == "old":
-        sort_field = "created_at"
-        sort_order = 1
-    elif sort_by == "top":
-        sort_field = "upvotes"
-        sort_order = -1
+    # Keyset pagination on (sort key, _id)
+    if decoded_cursor:
+        value, last_id = decoded_cursor
+        query.update(keyset_filter(sort_field, sort_order, value, last_id))
 
     # Query MongoDB
-    articles = list(
-        articles_collection.find(query)
-        .sort(sort_field, sort_order)
+    articles = await (
+        async_articles_collection.find(query, projection)
+        .sort(keyset_sort(sort_field, sort_order))
         .limit(limit)
+        .to_list(length=limit)
     )
 
-    next_cursor = articles[-1]["created_at"] if articles else None
+    next_cursor = None
+    if len(articles) == limit:
+        last = articles[-1]
+        next_cursor = encode_cursor(sort_key, last.get(sort_field), last["_id"])
 
     return {
-        "articles": [serialize_article(a) for a in articles],
+        "articles": articles,
         "next_cursor": next_cursor
     }
 
+# ---------------------
+# Search Articles (declared before /{article_id} so "search" isn't read as an id)
+# ---------------------
+@router.get("/search", response_model=dict)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: str = Query("full", pattern="^(full|prefix)$", description="'full' for ranked search, 'prefix' for title autocomplete"),
+    category: Optional[str] = Query(None),
+    date_filter: Optional[str] = Query(None),  # e.g. 'today', 'last_hour'
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=500),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return; defaults to the card shape (no content)")
+):
+    filters = build_filters(category, None, date_filter)
+
+    if mode == "prefix":
+        return MongoJSONResponse({"suggestions": await autocomplete_titles(q, filters, limit=min(limit, 10))})
+
+    return MongoJSONResponse(await search_articles(q, filters, build_projection(fields), limit=limit, offset=offset))
+
+# ---------------------
+# Personalized Feed (declared before /{article_id} so "for-you" isn't read as an id)
+# ---------------------
+@router.get("/for-you", response_model=dict)
+async def for_you(
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=300),
+    user=Depends(get_current_user)
+):
+    feed = await get_for_you_feed(user, limit=limit, offset=offset)
+    return MongoJSONResponse(feed, headers={"Cache-Control": PRIVATE_CACHE})
+
 # ---------------------
 # Get Single Article
 # ---------------------
 @router.get("/{article_id}", response_model=ArticleDB)
 async def get_article(article_id: str, request: Request, x_reading_duration: Optional[int] = Header(None, alias="X-Reading-Duration")):
-    article = articles_collection.find_one({"_id": ObjectId(article_id)})
+    article = await async_articles_collection.find_one({"_id": ObjectId(article_id)}, DETAIL_PROJECTION)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
+    # ETag changes when the article is edited or its counters are flushed
+    etag = make_etag(article["_id"], article.get("updated_at"), article.pop("counters_version", 0))
+    article = {**DETAIL_DEFAULTS, **article}
+
     # Try to extract user id from Bearer JWT (optional)
     user_id = None
     try:
@@ -92,40 +207,55 @@ async def get_article(article_id: str, request: Request, x_reading_duration: Opt
         if auth:
             scheme, token = get_authorization_scheme_param(auth)
             if scheme and scheme.lower() == "bearer" and token:
-                payload = verify_token(token)
+                payload = get_token_payload(request, token)
                 if payload and isinstance(payload, dict):
                     user_id = payload.get("id") or payload.get("sub")
     except Exception:
         user_id = None
 
-    # increment views (will track per-user read if user_id present)
-    # pass optional reading duration (seconds) if provided via header
-    increment_article_view(article_id, user_id, reading_time_seconds=x_reading_duration)
+    # count the view (and the per-user read if user_id present) in the
+    # in-process buffer; it reaches Redis in the next batched flush
+    # Logged-out readers are counted for unique readers by a hashed fingerprint.
+    # client.host is the real client only behind proxies uvicorn trusts
+    # (FORWARDED_ALLOW_IPS); a raw X-Forwarded-For could be set by anyone.
+    reader_id = None
+    if not user_id:
+        client_ip = request.client.host if request.client else None
+        reader_id = anonymous_reader_id(client_ip, request.headers.get("user-agent"))
+    view_buffer.record(article_id, user_id, reading_time_seconds=x_reading_duration, reader_id=reader_id)
 
-    return serialize_article(article)
+    # Anonymous reads are CDN-cacheable; authenticated ones always revalidate
+    cache_control = PRIVATE_CACHE if request.headers.get("Authorization") else PUBLIC_DETAIL_CACHE
+    headers = cache_headers(etag, cache_control, vary="Authorization")
+    if etag_matches(request, etag):
+        return not_modified(headers)
+    return MongoJSONResponse(article, headers=headers)
+
+# ---------------------
+# Vote on Article (per-user, toggles; counts are flushed to Mongo in bulk)
+# ---------------------
+async def _vote_article(article_id: str, user: dict, vote: int) -> int:
+    exists = await async_articles_collection.find_one({"_id": ObjectId(article_id)}, {"_id": 1})
+    if not exists:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    result = await record_vote("article", article_id, user["sub"], vote)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Voting is temporarily unavailable")
+    return result
 
 # ---------------------
 # Upvote Article
 # ---------------------
 @router.post("/{article_id}/upvote")
-def upvote_article(article_id: str, user=Depends(get_current_user)):
-    result = articles_collection.update_one(
-        {"_id": ObjectId(article_id)},
-        {"$inc": {"upvotes": 1}}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Article not found")
-    return {"detail": "Upvoted successfully"}
+async def upvote_article(article_id: str, user=Depends(get_current_user)):
+    vote = await _vote_article(article_id, user, 1)
+    return {"detail": "Upvoted successfully" if vote == 1 else "Upvote removed", "vote": vote}
 
 # ---------------------
 # Downvote Article
 # ---------------------
 @router.post("/{article_id}/downvote")
-def downvote_article(article_id: str, user=Depends(get_current_user)):
-    result = articles_collection.update_one(
-        {"_id": ObjectId(article_id)},
-        {"$inc": {"downvotes": 1}}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Article not found")
-    return {"detail": "Downvoted successfully"}
\ No newline at end of file
+async def downvote_article(article_id: str, user=Depends(get_current_user)):
+    vote = await _vote_article(article_id, user, -1)
+    return {"detail": "Downvoted successfully" if vote == -1 else "Downvote removed", "vote": vote}
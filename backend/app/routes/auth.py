@@ -10,6 +10,7 @@ from app.utils.supabase_auth import (
     create_refresh_token,
 )
 from app.utils.dependencies import get_current_user
+from app.utils.auth_cache import remember_profile, invalidate_user
 import json
 
 router = APIRouter()
@@ -48,6 +49,8 @@ def register(user: UserCreate):
 
     if not result.data:
         raise HTTPException(status_code=500, detail="Registration failed")
+    invalidate_user(user.username)
+    remember_profile(result.data[0])
 
     # Create JWT tokens
     token_data = {"sub": user.username, "role": UserRole.USER.value}
@@ -77,6 +80,9 @@ def login(user: UserLogin):
     if not verify_password(user.password, db_user["password"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
+    # Later authenticated requests resolve the user from this cache
+    remember_profile(db_user)
+
     # Prepare token payload
     user_role = db_user.get("role", UserRole.USER.value)
     token_data = {"sub": db_user["username"], "role": user_role, "id": db_user["id"]}
@@ -1,9 +1,11 @@
 # app/routes/bookmarks.py
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.utils.dependencies import get_current_user
 from app.utils.supabase_auth import supabase
-from app.config.mongo import articles_collection
+from app.utils.auth_cache import get_user_profile, invalidate_user
+from app.config.mongo import async_articles_collection
 from bson import ObjectId
 
 USERS_TABLE = "users"
@@ -12,72 +14,73 @@ router = APIRouter()
 # ---------------- Helper ----------------
 def get_user_id_from_sub(sub: str):
     """
-    Fetch the user's UUID from Supabase using the JWT 'sub' claim (username/email).
+    Resolve the user's UUID from the JWT 'sub' claim (username), via the
+    cached slim profile.
     """
-    res = supabase.table(USERS_TABLE).select("id").eq("username", sub).single().execute()
-    if not res.data:
+    profile = get_user_profile(sub)
+    if not profile:
         raise HTTPException(status_code=404, detail="User not found")
-    return res.data["id"]
+    return profile["id"]
+
+def get_user_bookmarks(user_id: str):
+    """
+    Fetch the user's bookmarks array from Supabase.
+    """
+    user_data = supabase.table(USERS_TABLE).select("bookmarks").eq("id", user_id).single().execute()
+    if not user_data.data:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_data.data.get("bookmarks") or []
+
+def save_user_bookmarks(user_id: str, bookmarks: list):
+    supabase.table(USERS_TABLE).update({"bookmarks": bookmarks}).eq("id", user_id).execute()
 
 # ---------------- Routes ----------------
 
 @router.post("/{article_id}")
-def add_user_bookmark(article_id: str, user=Depends(get_current_user)):
+async def add_user_bookmark(article_id: str, user=Depends(get_current_user)):
     """
     Add an article ID to the current user's bookmarks array in Supabase.
     """
     user_sub = user.get("sub")
-    user_id = get_user_id_from_sub(user_sub)
-
-    user_data = supabase.table(USERS_TABLE).select("bookmarks").eq("id", user_id).single().execute()
-    if not user_data.data:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    bookmarks = user_data.data.get("bookmarks") or []
+    user_id = await run_in_threadpool(get_user_id_from_sub, user_sub)
+    bookmarks = await run_in_threadpool(get_user_bookmarks, user_id)
     if article_id in bookmarks:
         raise HTTPException(status_code=400, detail="Bookmark already exists")
 
     bookmarks.append(article_id)
-    supabase.table(USERS_TABLE).update({"bookmarks": bookmarks}).eq("id", user_id).execute()
+    await run_in_threadpool(save_user_bookmarks, user_id, bookmarks)
+    invalidate_user(user_sub)
 
     return {"message": "Bookmark added", "bookmarks": bookmarks}
 
 
 @router.delete("/{article_id}")
-def remove_user_bookmark(article_id: str, user=Depends(get_current_user)):
+async def remove_user_bookmark(article_id: str, user=Depends(get_current_user)):
     """
     Remove an article ID from the current user's bookmarks array in Supabase.
     """
     user_sub = user.get("sub")
-    user_id = get_user_id_from_sub(user_sub)
-
-    user_data = supabase.table(USERS_TABLE).select("bookmarks").eq("id", user_id).single().execute()
-    if not user_data.data:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    bookmarks = user_data.data.get("bookmarks") or []
+    user_id = await run_in_threadpool(get_user_id_from_sub, user_sub)
+    bookmarks = await run_in_threadpool(get_user_bookmarks, user_id)
     if article_id not in bookmarks:
         raise HTTPException(status_code=404, detail="Bookmark not found")
 
     bookmarks.remove(article_id)
-    supabase.table(USERS_TABLE).update({"bookmarks": bookmarks}).eq("id", user_id).execute()
+    await run_in_threadpool(save_user_bookmarks, user_id, bookmarks)
+    invalidate_user(user_sub)
 
     return {"message": "Bookmark removed", "bookmarks": bookmarks}
 
 
 @router.get("/")
-def get_user_bookmarks_route(user=Depends(get_current_user)):
+async def get_user_bookmarks_route(user=Depends(get_current_user)):
     """
     Retrieve full articles for the current user's bookmarks.
     """
     user_sub = user.get("sub")
-    user_id = get_user_id_from_sub(user_sub)
-
-    user_data = supabase.table(USERS_TABLE).select("bookmarks").eq("id", user_id).single().execute()
-    if not user_data.data:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    article_ids = user_data.data.get("bookmarks") or []
+    user_id = await run_in_threadpool(get_user_id_from_sub, user_sub)
+    bookmarks = await run_in_threadpool(get_user_bookmarks, user_id)
+    article_ids = bookmarks
     if not article_ids:
         return []
 
@@ -86,7 +89,7 @@ def get_user_bookmarks_route(user=Depends(get_current_user)):
     except Exception:
         object_ids = []
 
-    articles = list(articles_collection.find({"_id": {"$in": object_ids}}))
+    articles = await async_articles_collection.find({"_id": {"$in": object_ids}}).to_list(length=None)
 
     # ✅ Serialize MongoDB ObjectIds to strings
     for article in articles:
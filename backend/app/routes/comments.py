@@ -2,9 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import List
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.models.comment_model import CommentCreate, CommentDB
-from app.config.mongo import comments_collection, articles_collection
+from app.config.mongo import async_comments_collection, async_articles_collection
 from app.utils.dependencies import get_current_user
+from app.services.votes_service import record_vote
+from app.services.trending_service import refresh_card_counters_async, COUNTER_FIELDS
 
 router = APIRouter()
 
@@ -17,12 +20,12 @@ def serialize_comment(comment) -> dict:
 # Create Comment
 # ---------------------
 @router.post("/", response_model=CommentDB)
-def create_comment(comment: CommentCreate, user=Depends(get_current_user)):
+async def create_comment(comment: CommentCreate, user=Depends(get_current_user)):
     """
     Create a comment or reply
     """
     # Check if article exists
-    article = articles_collection.find_one({"_id": ObjectId(comment.article_id)})
+    article = await async_articles_collection.find_one({"_id": ObjectId(comment.article_id)})
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
@@ -33,14 +36,18 @@ def create_comment(comment: CommentCreate, user=Depends(get_current_user)):
     doc["created_at"] = datetime.utcnow()
     doc["updated_at"] = datetime.utcnow()
 
-    result = comments_collection.insert_one(doc)
+    result = await async_comments_collection.insert_one(doc)
     doc["_id"] = str(result.inserted_id)
 
     # Increment article's comments_count
-    articles_collection.update_one(
+    counters = await async_articles_collection.find_one_and_update(
         {"_id": ObjectId(comment.article_id)},
-        {"$inc": {"comments_count": 1}}
+        {"$inc": {"comments_count": 1, "counters_version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        projection=COUNTER_FIELDS,
+        return_document=ReturnDocument.AFTER
     )
+    if counters:
+        await refresh_card_counters_async(comment.article_id, counters)
 
     return doc
 
@@ -48,53 +55,60 @@ def create_comment(comment: CommentCreate, user=Depends(get_current_user)):
 # Get Comments for an Article
 # ---------------------
 @router.get("/{article_id}", response_model=List[CommentDB])
-def get_comments(article_id: str):
-    comments = list(comments_collection.find({"article_id": article_id}).sort("created_at", 1))
+async def get_comments(article_id: str):
+    comments = await async_comments_collection.find({"article_id": article_id}).sort("created_at", 1).to_list(length=None)
     return [serialize_comment(c) for c in comments]
 
 # ---------------------
 # Delete Comment
 # ---------------------
 @router.delete("/{comment_id}")
-def delete_comment(comment_id: str, user=Depends(get_current_user)):
-    comment = comments_collection.find_one({"_id": ObjectId(comment_id)})
+async def delete_comment(comment_id: str, user=Depends(get_current_user)):
+    comment = await async_comments_collection.find_one({"_id": ObjectId(comment_id)})
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     if comment["author_email"] != user["sub"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
 
-    comments_collection.delete_one({"_id": ObjectId(comment_id)})
+    await async_comments_collection.delete_one({"_id": ObjectId(comment_id)})
 
     # Decrement comments_count in parent article
-    articles_collection.update_one(
+    counters = await async_articles_collection.find_one_and_update(
         {"_id": ObjectId(comment["article_id"])},
-        {"$inc": {"comments_count": -1}}
+        {"$inc": {"comments_count": -1, "counters_version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        projection=COUNTER_FIELDS,
+        return_document=ReturnDocument.AFTER
     )
+    if counters:
+        await refresh_card_counters_async(comment["article_id"], counters)
 
     return {"detail": "Comment deleted successfully"}
 
+# ---------------------
+# Vote on Comment (per-user, toggles; counts are flushed to Mongo in bulk)
+# ---------------------
+async def _vote_comment(comment_id: str, user: dict, vote: int) -> int:
+    exists = await async_comments_collection.find_one({"_id": ObjectId(comment_id)}, {"_id": 1})
+    if not exists:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    result = await record_vote("comment", comment_id, user["sub"], vote)
+    if result is None:
+        raise HTTPException(status_code=503, detail="Voting is temporarily unavailable")
+    return result
+
 # ---------------------
 # Upvote Comment
 # ---------------------
 @router.post("/{comment_id}/upvote")
-def upvote_comment(comment_id: str, user=Depends(get_current_user)):
-    result = comments_collection.update_one(
-        {"_id": ObjectId(comment_id)},
-        {"$inc": {"upvotes": 1}}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    return {"detail": "Upvoted successfully"}
+async def upvote_comment(comment_id: str, user=Depends(get_current_user)):
+    vote = await _vote_comment(comment_id, user, 1)
+    return {"detail": "Upvoted successfully" if vote == 1 else "Upvote removed", "vote": vote}
 
 # ---------------------
 # Downvote Comment
 # ---------------------
 @router.post("/{comment_id}/downvote")
-def downvote_comment(comment_id: str, user=Depends(get_current_user)):
-    result = comments_collection.update_one(
-        {"_id": ObjectId(comment_id)},
-        {"$inc": {"downvotes": 1}}
-    )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    return {"detail": "Downvoted successfully"}
+async def downvote_comment(comment_id: str, user=Depends(get_current_user)):
+    vote = await _vote_comment(comment_id, user, -1)
+    return {"detail": "Downvoted successfully" if vote == -1 else "Downvote removed", "vote": vote}
@@ -0,0 +1,34 @@
+# app/routes/tags.py
+from fastapi import APIRouter, Query
+from app.services.tag_index import popular_tags, related_tags, recent_article_ids, tag_count, autocomplete_tags
+
+router = APIRouter()
+
+# Handlers are plain `def`: the tag index is read through the sync Redis
+# adapter, so FastAPI runs them in its threadpool.
+
+# ---------------------
+# Most used tags
+# ---------------------
+@router.get("/popular")
+def get_popular_tags(limit: int = Query(20, ge=1, le=100)):
+    return {"tags": popular_tags(limit)}
+
+# ---------------------
+# Tag autocomplete
+# ---------------------
+@router.get("/autocomplete")
+def get_tag_suggestions(q: str = Query(..., min_length=1, max_length=50), limit: int = Query(10, ge=1, le=25)):
+    return {"suggestions": autocomplete_tags(q, limit)}
+
+# ---------------------
+# Related tags + newest articles for a tag page
+# ---------------------
+@router.get("/{tag}/related")
+def get_related_tags(tag: str, limit: int = Query(10, ge=1, le=50), articles: int = Query(20, ge=0, le=50)):
+    return {
+        "tag": tag,
+        "count": tag_count(tag),
+        "related": related_tags(tag, limit),
+        "recent_article_ids": recent_article_ids(tag, articles) if articles else [],
+    }
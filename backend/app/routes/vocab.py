@@ -3,6 +3,7 @@ from datetime import datetime, timedelta, date
 from app.utils.supabase_auth import supabase
 from app.models.user_model import VocabProficiency
 from app.utils.dependencies import get_current_user
+from app.utils.auth_cache import invalidate_user
 import random, json, os
 
 router = APIRouter()
@@ -82,6 +83,7 @@ async def get_daily_vocab(user=Depends(get_current_user)):
 
         # Save back updated vocab_cards
         supabase.table("users").update({"vocab_cards": vocab_cards}).eq("id", user["id"]).execute()
+        invalidate_user(user.get("sub"))
 
     return {"today_cards": available, "daily_target": daily_target}
 
@@ -126,6 +128,7 @@ async def mark_practice_done(payload: dict, user=Depends(get_current_user)):
         "vocab_cards": vocab_cards,
         "gamification": gamification
     }).eq("id", user["id"]).execute()
+    invalidate_user(user.get("sub"))
 
     return {"message": "Practice progress updated successfully"}
 
@@ -2,12 +2,13 @@
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.services.views_service import flush_views_to_db
+from app.services.votes_service import flush_votes_to_db
 from app.services.analytics_service import analytics_service
 
 def start_flusher_scheduler():
     """
     Starts the background scheduler to periodically flush
-    article views and user read data from Redis to MongoDB.
+    article views, votes and user read data from Redis to MongoDB.
     """
     scheduler = BackgroundScheduler()
 
@@ -16,6 +17,10 @@ def start_flusher_scheduler():
     # --------------------------
     scheduler.add_job(flush_views_to_db, "interval", minutes=5, id="flush_views_job")
     # --------------------------
+    # Flush article/comment vote deltas every minute
+    # --------------------------
+    scheduler.add_job(flush_votes_to_db, "interval", minutes=1, id="flush_votes_job")
+    # --------------------------
     # Flush user reads every 10 minutes
     # --------------------------
     scheduler.add_job(analytics_service.flush_user_reads, "interval", minutes=10, id="flush_user_reads_job")
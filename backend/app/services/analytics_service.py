@@ -1,6 +1,8 @@
 from bson import ObjectId
 from app.utils.supabase_auth import supabase
-from app.config.mongo import articles_collection, analytics_collection
+from app.config.mongo import articles_collection, analytics_collection, async_articles_collection, async_analytics_collection, reading_stats_collection
+import asyncio
+import time
 import redis
 import json, os
 from dotenv import load_dotenv
@@ -8,32 +10,92 @@ from dotenv import load_dotenv
 # Ensure environment variables from a .env file are loaded at import time
 load_dotenv()
 from app.utils.redis_client import get_redis_client
+from app.services.trending_service import get_trending
+from app.services.unique_readers_service import unique_readers_report
+from app.services.timeseries_service import get_article_series, get_category_series
+from app.services.reading_service import (
+    get_reading_stats, count_reads_since, current_streak, backfill_complete, backfill_complete_async, RECENT_HISTORY
+)
 from datetime import datetime, timedelta, date
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Redis client (may be Upstash REST-based)
 r = get_redis_client()
 
 USER_VIEW_KEY_PREFIX = "user_views:"
+USER_FLUSH_BATCH_SIZE = 500
+# Supabase function that merges a batch of gamification snapshots (sql/sync_reading_gamification.sql)
+GAMIFICATION_SYNC_RPC = "sync_reading_gamification"
+
+# Remove flushed reads from a user's queue, but only fields whose value is
+# still the one that was flushed; a re-read queued meanwhile stays.
+# KEYS: user read queue. ARGV: field, value pairs. Returns fields removed.
+CLEAR_FLUSHED_SCRIPT = """
+local removed = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        removed = removed + redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+return removed
+"""
+
+
+def gamification_snapshot(stats: dict) -> dict:
+    """Reading fields of the Supabase gamification column, from a reading_stats document."""
+    last_read_at = stats.get("last_read_at")
+    last_read = last_read_at.isoformat() if isinstance(last_read_at, datetime) else None
+    return {
+        "total_articles_read": stats.get("articles_read", 0),
+        "streak": current_streak(stats),
+        "last_read_date": last_read,
+        "last_read_at": last_read,
+    }
 
 class AnalyticsService:
 
     # -------------------------
     # Site-wide analytics
     # -------------------------
-    def get_trending_articles(self, limit: int = 10):
+    async def get_trending_articles(self, limit: int = 10, window: str = "24h"):
         """
-        Returns top articles by views and upvotes combined.
+        Returns the articles trending over `window` (1h, 24h or 7d) from the
+        live Redis leaderboard (see trending_service). Falls back to the
+        hot_score index when Redis has nothing for the window.
         """
-        articles = list(
-            articles_collection.find()
-            .sort([("views", -1), ("upvotes", -1)])
+        trending = await get_trending(window, limit)
+        if trending:
+            return trending
+
+        articles = await (
+            async_articles_collection.find()
+            .sort([("hot_score", -1), ("_id", -1)])
             .limit(limit)
+            .to_list(length=limit)
         )
         for a in articles:
             a["_id"] = str(a["_id"])
         return articles
 
-    def get_top_categories(self, limit: int = 5):
+    async def get_unique_readers(self, article_id: str, days: int = 7):
+        """
+        Unique readers of an article (HyperLogLog estimates): all-time,
+        over the last `days` days, and per day. Served from Redis.
+        """
+        return await unique_readers_report(article_id, days)
+
+    async def get_engagement_series(self, article_id: str | None = None, category: str | None = None,
+                                    days: int = 7, resolution: str = "hour", metrics: list | None = None):
+        """
+        Hourly views/votes for an article, a category, or the whole site,
+        served from the pre-aggregated hourly buckets (see timeseries_service).
+        """
+        if article_id:
+            return await get_article_series(article_id, days, resolution, metrics)
+        return await get_category_series(category, days, resolution, metrics)
+
+    async def get_top_categories(self, limit: int = 5):
         """
         Returns top categories based on number of articles.
         """
@@ -42,10 +104,10 @@ class AnalyticsService:
             {"$sort": {"count": -1}},
             {"$limit": limit}
         ]
-        result = list(articles_collection.aggregate(pipeline))
+        result = await async_articles_collection.aggregate(pipeline).to_list(length=limit)
         return [{"category": r["_id"], "count": r["count"]} for r in result]
 
-    def get_daily_article_counts(self, days: int = 7):
+    async def get_daily_article_counts(self, days: int = 7):
         """
         Returns number of articles published per day for the last N days.
         """
@@ -59,283 +121,275 @@ class AnalyticsService:
             }},
             {"$sort": {"_id": 1}}
         ]
-        result = list(articles_collection.aggregate(pipeline))
+        result = await async_articles_collection.aggregate(pipeline).to_list(length=None)
         return result
 
     # -------------------------
     # User-specific analytics
     # -------------------------
-    def track_article_read(self, user_id: str, article_id: str, reading_time_seconds: int | None = None):
+    def queue_user_reads(self, reads: list):
         """
-        Tracks that a user has read an article.
-        - stores a per-user read in Redis for batching
-        - updates the user's gamification column in Supabase with:
-            - reading_history (no duplicates, stores article_id + timestamp + reading_time)
-            - total_articles_read (unique)
-            - last_read_date / last_read_at
-            - streak (simple day-based logic)
+        Remember (user_id, article_id, reading_time_seconds) reads in Redis
+        for flush_user_reads, which syncs them to the analytics documents and
+        the Supabase gamification snapshot. One pipelined round trip per batch.
+        The reads themselves are logged by reading_service.
         """
-        if not user_id:
+        now_iso = datetime.utcnow().isoformat()
+        pipe = r.pipeline()
+        for user_id, article_id, reading_time_seconds in reads:
+            if not user_id:
+                continue
+            key = f"{USER_VIEW_KEY_PREFIX}{user_id}"
+            # reading timestamp (ISO) and optional reading_time as JSON string for this article id
+            pipe.hset(key, str(article_id), json.dumps({"ts": now_iso, "reading_time": reading_time_seconds}))
+            pipe.expire(key, 3600 * 24)
+        if pipe.execute() is None:
+            print(f"[Analytics] Failed to queue {len(reads)} user reads in Redis")
             return False
+        return True
 
-        now = datetime.utcnow()
-        now_iso = now.isoformat()
-        key = f"{USER_VIEW_KEY_PREFIX}{user_id}"
+    def _parse_user_reads(self, article_views: dict) -> list:
+        updates = []
+        for a_id, payload in article_views.items():
+            try:
+                data = json.loads(payload)
+                ts = data.get("ts")
+                reading_time = data.get("reading_time")
+            except Exception:
+                ts = None
+                reading_time = None
+            try:
+                ts_dt = datetime.fromisoformat(ts) if ts else datetime.utcnow()
+            except Exception:
+                ts_dt = datetime.utcnow()
+            updates.append({"article_id_str": str(a_id), "timestamp": ts_dt, "reading_time": reading_time})
+        return updates
 
-        # store read in Redis for batching/analytics (store as string id)
+    def _sync_gamification(self, user_ids: list) -> set:
+        """
+        Write the reading snapshot of each user into Supabase. One RPC call
+        for the whole batch; per-user select + update if the function is
+        missing or fails. Returns the ids that were handled. Nothing is
+        written before the reading backfill has finished, or for users
+        without reading_stats, so legacy values are never reset.
+        """
+        if not backfill_complete():
+            print(f"[Analytics] Reading backfill not run yet; left gamification of {len(user_ids)} users untouched")
+            return set(user_ids)
+        stats = {doc["_id"]: doc for doc in reading_stats_collection.find({"_id": {"$in": user_ids}})}
+        snapshots = [{"id": u, "gamification": gamification_snapshot(stats[u])} for u in user_ids if u in stats]
+        # Users without stats have nothing to mirror; they count as handled
+        skipped = set(user_ids) - set(stats)
+        if not snapshots:
+            return skipped
         try:
-            # store reading timestamp (ISO) and optional reading_time as JSON string for this article id
-            payload = json.dumps({"ts": now_iso, "reading_time": reading_time_seconds})
-            r.hset(key, str(article_id), payload)
-            r.expire(key, 3600 * 24)
+            supabase.rpc(GAMIFICATION_SYNC_RPC, {"updates": snapshots}).execute()
+            return set(user_ids)
         except Exception as e:
-            print(f"[Analytics] Redis HSET failed for user {user_id}: {e}")
+            print(f"[Analytics] {GAMIFICATION_SYNC_RPC} RPC failed, updating users one by one: {e}")
 
-        # Update Supabase gamification immediately (merge reading_history + streak)
-        try:
-            resp = supabase.table("users").select("gamification").eq("id", user_id).single().execute()
-            gam = {}
-            if resp and resp.data:
-                gam = resp.data.get("gamification") or {}
-                if isinstance(gam, str):
+        synced = skipped
+        for item in snapshots:
+            try:
+                resp = supabase.table("users").select("gamification").eq("id", item["id"]).single().execute()
+                current_gam = (resp.data or {}).get("gamification") if resp else {}
+                if isinstance(current_gam, str):
                     try:
-                        gam = json.loads(gam)
+                        current_gam = json.loads(current_gam)
                     except Exception:
-                        gam = {}
-            if not isinstance(gam, dict):
-                gam = {}
-
-            # reading_history: list of dicts {"article_id": "<id>", "timestamp": "<iso>", "reading_time": <int|null>}
-            reading_history = gam.get("reading_history", [])
-            if not isinstance(reading_history, list):
-                reading_history = []
-
-            # Avoid duplicates: check by article_id string
-            article_id_str = str(article_id)
-            already_read = any(entry.get("article_id") == article_id_str for entry in reading_history)
-            if not already_read:
-                entry = {"article_id": article_id_str, "timestamp": now_iso}
-                if reading_time_seconds is not None:
-                    entry["reading_time_seconds"] = int(reading_time_seconds)
-                else:
-                    entry["reading_time_seconds"] = None
-                reading_history.append(entry)
-
-            # total articles read (unique)
-            total_articles_read = len({entry.get("article_id") for entry in reading_history})
-
-            # streak logic (day-based)
-            last_read_date_str = gam.get("last_read_date")
-            streak = gam.get("streak", 0) or 0
-            try:
-                last_read_date = datetime.fromisoformat(last_read_date_str).date() if last_read_date_str else None
-            except Exception:
-                last_read_date = None
-
-            today = now.date()
-            yesterday = today - timedelta(days=1)
-
-            if last_read_date == today:
-                # already read today — do not increment streak
-                pass
-            elif last_read_date == yesterday:
-                streak = streak + 1
-            else:
-                # new streak start
-                streak = 1
-
-            # update gam fields
-            gam["reading_history"] = reading_history
-            gam["total_articles_read"] = total_articles_read
-            gam["last_read_date"] = now_iso
-            gam["last_read_at"] = now_iso
-            gam["streak"] = streak
-
-            # push update to Supabase
-            supabase.table("users").update({"gamification": gam}).eq("id", user_id).execute()
+                        current_gam = {}
+                if not isinstance(current_gam, dict):
+                    current_gam = {}
+                current_gam.update(item["gamification"])
+                supabase.table("users").update({"gamification": current_gam}).eq("id", item["id"]).execute()
+                synced.add(item["id"])
+            except Exception as e:
+                print(f"[Analytics] Failed to flush gamification for user {item['id']}: {e}")
+        return synced
+
+    def _flush_user_batch(self, keys: list) -> dict:
+        timings = {}
+        started = time.perf_counter()
+
+        # One round trip for every user's pending reads
+        pipe = r.pipeline()
+        for key in keys:
+            pipe.hgetall(key)
+        results = pipe.execute()
+        timings["redis_read_ms"] = (time.perf_counter() - started) * 1000
+        if results is None:
+            print(f"[Analytics] Failed to read {len(keys)} user read queues; will retry")
+            return {"users": 0, "reads": 0, "failed": len(keys), "timings": timings}
+
+        pending = {}
+        for key, article_views in zip(keys, results):
+            if isinstance(article_views, dict) and article_views:
+                pending[key[len(USER_VIEW_KEY_PREFIX):]] = article_views
+        if not pending:
+            return {"users": 0, "reads": 0, "failed": 0, "timings": timings}
+
+        # Mongo: one bulk_write for the batch (idempotent, safe to repeat)
+        t = time.perf_counter()
+        user_ids = list(pending)
+        ops = [
+            UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$addToSet": {"articles_read_ids": {"$each": [u["article_id_str"] for u in self._parse_user_reads(views)]}},
+                    "$set": {"last_updated": datetime.utcnow()}
+                },
+                upsert=True
+            )
+            for user_id, views in pending.items()
+        ]
+        persisted = set(user_ids)
+        try:
+            analytics_collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed = {user_ids[err["index"]] for err in e.details.get("writeErrors", [])}
+            print(f"[Analytics] Mongo analytics update failed for {len(failed)} users; will retry")
+            persisted -= failed
         except Exception as e:
-            print(f"[Analytics] Failed to update gamification for user {user_id}: {e}")
+            print(f"[Analytics] Failed to update Mongo analytics for {len(user_ids)} users: {e}")
+            persisted = set()
+        timings["mongo_ms"] = (time.perf_counter() - t) * 1000
+
+        # Supabase: gamification snapshot for the users Mongo accepted
+        t = time.perf_counter()
+        synced = self._sync_gamification([u for u in user_ids if u in persisted]) if persisted else set()
+        timings["supabase_ms"] = (time.perf_counter() - t) * 1000
+
+        # Remove only the reads that were flushed, and only for users both stores
+        # accepted; anything else, including a newer read of the same article,
+        # stays queued for the next run (at-least-once)
+        t = time.perf_counter()
+        pipe = r.pipeline()
+        for user_id in synced:
+            pairs = [x for field, value in pending[user_id].items() for x in (field, value)]
+            pipe.eval(CLEAR_FLUSHED_SCRIPT, 1, f"{USER_VIEW_KEY_PREFIX}{user_id}", *pairs)
+        if synced and pipe.execute() is None:
+            print(f"[Analytics] Failed to clear {len(synced)} flushed user read queues; they will be re-applied")
+        timings["redis_clear_ms"] = (time.perf_counter() - t) * 1000
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
 
-        return True
+        return {
+            "users": len(synced),
+            "reads": sum(len(pending[u]) for u in synced),
+            "failed": len(pending) - len(synced),
+            "timings": timings,
+        }
 
     def flush_user_reads(self):
         """
-        Flush per-user article reads from Redis to MongoDB and update gamification in Supabase.
+        Flush per-user article reads from Redis to MongoDB and sync the
+        gamification snapshot to Supabase, USER_FLUSH_BATCH_SIZE users at a
+        time: SCAN, pipelined HGETALL, one Mongo bulk_write, one Supabase RPC.
+        Reads are removed from Redis only once both stores have them.
         """
-        keys = r.keys(f"{USER_VIEW_KEY_PREFIX}*") or []
-        for key in list(keys):
-            try:
-                # normalize
-                if isinstance(key, bytes):
-                    key = key.decode('utf-8')
-                if not key.startswith(USER_VIEW_KEY_PREFIX):
-                    continue
-
-                user_id = key[len(USER_VIEW_KEY_PREFIX):]
-                article_views = r.hgetall(key) or {}
-                if not article_views:
-                    # nothing to flush; drop stale key
-                    try:
-                        r.delete(key)
-                    except Exception:
-                        pass
-                    continue
-
-                # Convert article IDs to string ids and timestamps to datetime
-                updates = []
-                for a_id, payload in article_views.items():
-                    try:
-                        data = json.loads(payload)
-                        ts = data.get("ts")
-                        reading_time = data.get("reading_time")
-                    except Exception:
-                        ts = None
-                        reading_time = None
-                    try:
-                        ts_dt = datetime.fromisoformat(ts) if ts else datetime.utcnow()
-                    except Exception:
-                        ts_dt = datetime.utcnow()
-                    updates.append({"article_id_str": str(a_id), "timestamp": ts_dt, "reading_time": reading_time})
-
-                if not updates:
-                    # nothing to persist
-                    continue
-
-                # Persist to MongoDB; do not delete Redis key until persistence succeeds
-                try:
-                    articles_ids = [u["article_id_str"] for u in updates if u.get("article_id_str")]
-                    reading_history_push = [{"article_id": u["article_id_str"], "timestamp": u["timestamp"], "reading_time_seconds": u.get("reading_time")} for u in updates]
-                    analytics_collection.update_one(
-                        {"user_id": user_id},
-                        {
-                            "$addToSet": {"articles_read_ids": {"$each": articles_ids}},
-                            "$push": {"reading_history": {"$each": reading_history_push}},
-                            "$set": {"last_updated": datetime.utcnow()}
-                        },
-                        upsert=True
-                    )
-                except Exception as e:
-                    print(f"[Analytics] Failed to update Mongo analytics for user {user_id}: {e}")
-                    # do not remove key so the scheduler can retry
-                    continue
-
-                # ----------------------
-                # Update gamification in Supabase (merge reading_history without duplicates)
-                # ----------------------
+        report = {"batches": 0, "users": 0, "reads": 0, "failed": 0}
+        seen = set()
+        started = time.perf_counter()
+        for keys in r.scan_batches(match=f"{USER_VIEW_KEY_PREFIX}*", count=USER_FLUSH_BATCH_SIZE):
+            # SCAN may return a key more than once
+            keys = [k for k in keys if k.startswith(USER_VIEW_KEY_PREFIX) and k not in seen]
+            seen.update(keys)
+            for i in range(0, len(keys), USER_FLUSH_BATCH_SIZE):
                 try:
-                    resp = supabase.table("users").select("gamification").eq("id", user_id).single().execute()
-                    if resp.data:
-                        current_gam = resp.data.get("gamification") or {}
-                        if isinstance(current_gam, str):
-                            try:
-                                current_gam = json.loads(current_gam)
-                            except Exception:
-                                current_gam = {}
-                    else:
-                        current_gam = {}
-
-                    if not isinstance(current_gam, dict):
-                        current_gam = {}
-
-                    existing_history = current_gam.get("reading_history", [])
-                    if not isinstance(existing_history, list):
-                        existing_history = []
-
-                    # Merge without duplicates, preserve timestamps (prefer existing)
-                    existing_ids = {str(entry.get("article_id")) for entry in existing_history if entry.get("article_id")}
-                    new_added = 0
-                    for u in updates:
-                        a_id = u["article_id_str"]
-                        if a_id not in existing_ids:
-                            existing_history.append({"article_id": a_id, "timestamp": u["timestamp"].isoformat(), "reading_time_seconds": u.get("reading_time")})
-                            existing_ids.add(a_id)
-                            new_added += 1
-
-                    current_gam["reading_history"] = existing_history
-                    current_gam["total_articles_read"] = len(existing_ids)
-
-                    # streak: simple update based on distinct new reads
-                    current_gam["streak"] = current_gam.get("streak", 0) + new_added
-                    current_gam["last_read_date"] = datetime.utcnow().isoformat()
-
-                    supabase.table("users").update({"gamification": current_gam}).eq("id", user_id).execute()
+                    result = self._flush_user_batch(keys[i:i + USER_FLUSH_BATCH_SIZE])
                 except Exception as e:
-                    print(f"[Analytics] Failed to flush gamification for user {user_id}: {e}")
-                    # We already updated Mongo; avoid deleting Redis key so it can be retried
+                    print(f"[Analytics] Unexpected error while flushing user reads: {e}")
                     continue
-
-                # Clear Redis key only after successful Mongo + Supabase updates
-                try:
-                    r.delete(key)
-                except Exception as e:
-                    print(f"[Analytics] Failed to delete Redis key {key} after flushing: {e}")
-                    # Not critical; data persisted
-            except Exception as e:
-                print(f"[Analytics] Unexpected error while flushing key {key}: {e}")
-
-    def get_user_dashboard_data(self, user_id: str):
+                report["batches"] += 1
+                for field in ("users", "reads", "failed"):
+                    report[field] += result[field]
+                timings = ", ".join(f"{k} {v:.0f}" for k, v in result["timings"].items())
+                print(f"[Analytics] Batch {report['batches']}: {result['users']} users, "
+                      f"{result['reads']} reads, {result['failed']} failed ({timings})")
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        if report["batches"]:
+            print(f"[Analytics] Flushed {report['reads']} reads for {report['users']} users "
+                  f"in {report['batches']} batches ({report['seconds']}s)")
+        return report
+
+    async def get_user_dashboard_data(self, user_id: str):
         """
         Retrieves analytics data for a user's dashboard.
-        Combines Supabase gamification data with reading history from MongoDB.
+        Combines Supabase gamification data with the reading aggregates in MongoDB.
         """
-        # Fetch user gamification and username from Supabase
-        user_resp = supabase.table("users").select("username, gamification").eq("id", user_id).single().execute()
+        # Supabase profile (sync client, kept off the loop), reading aggregates,
+        # last-week reads from the reading log and vocab counts, all at once
+        user_resp, stats, recent_count, analytics_doc, backfilled = await asyncio.gather(
+            asyncio.to_thread(
+                lambda: supabase.table("users").select("username, gamification").eq("id", user_id).single().execute()
+            ),
+            get_reading_stats(user_id),
+            count_reads_since(user_id, datetime.utcnow() - timedelta(days=7)),
+            async_analytics_collection.find_one({"user_id": user_id}, {"vocab_added_count": 1}),
+            backfill_complete_async(),
+        )
         if not user_resp.data:
             raise ValueError("User not found")
 
         user_data = user_resp.data
+        analytics_doc = analytics_doc or {}
 
         # Ensure gamification is a dict, not a JSON string
-        gamification = user_data.get("gamification", {})
+        gamification = user_data.get("gamification") or {}
         if isinstance(gamification, str):
             try:
                 gamification = json.loads(gamification)
             except Exception:
                 gamification = {}
 
-        # Fetch analytics from MongoDB (user_id stored as string)
-        analytics_doc = analytics_collection.find_one({"user_id": user_id}) or {}
-
-        # Normalize reading_history and article ids to JSON-safe types
-        raw_history = analytics_doc.get("reading_history", [])
-        reading_history = []
-        one_week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_count = 0
-        for entry in raw_history:
-            art_id = entry.get("article_id")
-            ts = entry.get("timestamp")
-            # convert ObjectId or other types to string
-            art_id_str = str(art_id) if art_id is not None else None
-            # normalize timestamp to ISO
-            ts_iso = None
-            if isinstance(ts, datetime):
-                ts_iso = ts.isoformat()
-            else:
-                try:
-                    ts_dt = datetime.fromisoformat(str(ts))
-                    ts_iso = ts_dt.isoformat()
-                except Exception:
-                    ts_iso = None
-            reading_history.append({"article_id": art_id_str, "timestamp": ts_iso, "reading_time_seconds": entry.get("reading_time_seconds")})
-            if ts_iso:
-                try:
-                    ts_dt = datetime.fromisoformat(ts_iso)
-                    if ts_dt >= one_week_ago:
-                        recent_count += 1
-                except Exception:
-                    pass
-
-        articles_read_ids = analytics_doc.get("articles_read_ids", [])
-        articles_read_ids = [str(a) for a in articles_read_ids]
+        if backfilled and stats:
+            reading_history = [
+                {
+                    "article_id": entry.get("article_id"),
+                    "timestamp": entry["ts"].isoformat() if isinstance(entry.get("ts"), datetime) else None,
+                    "reading_time_seconds": entry.get("reading_time_seconds"),
+                }
+                for entry in stats["recent"]
+            ]
+            streak, articles_read = stats["streak"], stats["articles_read"]
+        else:
+            # Before the backfill (or for a user without stats) the reading_stats
+            # document would undercount; show the legacy gamification values
+            reading_history, recent_count = self._legacy_history(gamification)
+            streak = gamification.get("streak", 0)
+            articles_read = gamification.get("total_articles_read", 0)
 
         return {
             "username": user_data.get("username"),
             "points": gamification.get("points", 0),
-            "streak": gamification.get("streak", 0),
-            "articles_read_total": len(articles_read_ids),
+            "streak": streak,
+            "articles_read_total": articles_read,
             "articles_read_last_week": recent_count,
             "vocab_words_added": analytics_doc.get("vocab_added_count", 0),
             "reading_history": reading_history
         }
 
+    def _legacy_history(self, gamification: dict) -> tuple:
+        # (newest RECENT_HISTORY entries of gamification.reading_history, reads in the last week)
+        history = gamification.get("reading_history")
+        if not isinstance(history, list):
+            return [], 0
+        one_week_ago = datetime.utcnow() - timedelta(days=7)
+        entries = []
+        recent_count = 0
+        for entry in history:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                ts = datetime.fromisoformat(str(entry.get("timestamp")))
+            except ValueError:
+                ts = None
+            if ts and ts >= one_week_ago:
+                recent_count += 1
+            entries.append({
+                "article_id": str(entry["article_id"]) if entry.get("article_id") is not None else None,
+                "timestamp": ts.isoformat() if ts else None,
+                "reading_time_seconds": entry.get("reading_time_seconds"),
+            })
+        return list(reversed(entries[-RECENT_HISTORY:])), recent_count
+
 analytics_service = AnalyticsService()
\ No newline at end of file
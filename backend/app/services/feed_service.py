@@ -0,0 +1,236 @@
+# app/services/feed_service.py
+
+"""
+Personalized "For You" feed.
+
+After each ingest, `rebuild_candidate_pools` stores a small pool of recent
+articles per category, plus one pool of the hottest articles overall, in
+Redis and in a process-local LRU. A request loads the pools for the user's
+preferred categories, then scores a few hundred candidates in memory. The
+score combines category preference, tag affinity learned from recent reads,
+and recency. No query is run per preference.
+"""
+import asyncio
+import json
+import math
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.config.mongo import articles_collection, async_articles_collection
+from app.utils.redis_client import get_redis_client
+from app.utils.async_redis_client import get_async_redis_client
+from app.utils.supabase_auth import supabase
+from app.utils.response_cache import LocalLRU
+from app.services.reading_service import recent_article_ids
+from app.utils import fast_json
+
+# Redis clients (may be Upstash REST-based): sync for pool rebuilds, async for requests
+r = get_redis_client()
+ar = get_async_redis_client()
+
+POOL_KEY_PREFIX = "foryou:pool:"
+HOT_POOL = "__hot__"
+POOL_SIZE = 100
+# Only recent articles are worth recommending
+POOL_MAX_AGE = timedelta(days=3)
+# Pools outlive a couple of missed ingests; the local copy is re-read from
+# Redis every minute so pools rebuilt by another worker show up quickly
+POOL_REDIS_TTL = 6 * 3600
+POOL_LOCAL_TTL = 60
+SIGNALS_TTL = 300
+
+# Scoring weights
+PREFERENCE_WEIGHT = 1.0
+TAG_WEIGHT = 1.5
+RECENCY_WEIGHT = 1.0
+RECENCY_HALF_LIFE_HOURS = 12
+# How much reading history feeds tag affinity / read-article exclusion
+AFFINITY_HISTORY = 50
+EXCLUDE_HISTORY = 500
+
+POOL_FIELDS = {
+    "title": 1, "url": 1, "summary": 1, "image_url": 1, "category": 1, "tags": 1,
+    "sentiment": 1, "source_url": 1, "upvotes": 1, "downvotes": 1,
+    "comments_count": 1, "views": 1, "hot_score": 1, "created_at": 1, "updated_at": 1
+}
+
+_local_pools = LocalLRU(64)
+_local_signals = LocalLRU(2048)
+
+
+# -----------------------------
+# Candidate pools
+# -----------------------------
+def _pool_key(name: str) -> str:
+    return f"{POOL_KEY_PREFIX}{name}"
+
+
+def _store_pool(name: str, docs: list):
+    # Round-trip through JSON so local and Redis pools look the same
+    data = fast_json.dumps(docs).decode("utf-8")
+    r.set(_pool_key(name), data, ex=POOL_REDIS_TTL)
+    _local_pools.set(name, fast_json.loads(data), POOL_LOCAL_TTL)
+
+
+def rebuild_candidate_pools() -> int:
+    """
+    Recompute every category pool and the hot pool. Called after each
+    ingest; each pool is one indexed query (category, created_at, _id).
+    """
+    cutoff = datetime.utcnow() - POOL_MAX_AGE
+    categories = [c for c in articles_collection.distinct("category", {"created_at": {"$gte": cutoff}}) if c]
+
+    for category in categories:
+        docs = list(
+            articles_collection.find({"category": category, "created_at": {"$gte": cutoff}}, POOL_FIELDS)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(POOL_SIZE)
+        )
+        _store_pool(category, docs)
+
+    hot = list(
+        articles_collection.find({"created_at": {"$gte": cutoff}}, POOL_FIELDS)
+        .sort([("hot_score", -1), ("_id", -1)])
+        .limit(POOL_SIZE)
+    )
+    _store_pool(HOT_POOL, hot)
+
+    print(f"[ForYou] Rebuilt candidate pools for {len(categories)} categories")
+    return len(categories)
+
+
+async def _pool_from_db(name: str) -> list:
+    # Cold start (no pool published yet): build just this one pool locally
+    cutoff = datetime.utcnow() - POOL_MAX_AGE
+    query = {"created_at": {"$gte": cutoff}}
+    sort = [("hot_score", -1), ("_id", -1)]
+    if name != HOT_POOL:
+        query["category"] = name
+        sort = [("created_at", -1), ("_id", -1)]
+    docs = await async_articles_collection.find(query, POOL_FIELDS).sort(sort).limit(POOL_SIZE).to_list(length=POOL_SIZE)
+    docs = fast_json.loads(fast_json.dumps(docs))
+    _local_pools.set(name, docs, POOL_LOCAL_TTL)
+    return docs
+
+
+async def load_pools(names: list) -> dict:
+    """Pools by name: local LRU first, then one Redis MGET, then Mongo."""
+    pools = {}
+    missing = []
+    for name in names:
+        docs = _local_pools.get(name)
+        if docs is None:
+            missing.append(name)
+        else:
+            pools[name] = docs
+
+    if missing:
+        raw = await ar.mget([_pool_key(n) for n in missing])
+        raw = raw if isinstance(raw, list) and len(raw) == len(missing) else [None] * len(missing)
+        for name, data in zip(missing, raw):
+            if data:
+                try:
+                    docs = fast_json.loads(data)
+                    _local_pools.set(name, docs, POOL_LOCAL_TTL)
+                    pools[name] = docs
+                    continue
+                except Exception:
+                    pass
+            pools[name] = await _pool_from_db(name)
+
+    return pools
+
+
+# -----------------------------
+# User signals
+# -----------------------------
+def _preferred_categories(raw) -> list:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except Exception:
+            raw = {}
+    if isinstance(raw, dict):
+        return [c for c, enabled in raw.items() if enabled]
+    if isinstance(raw, list):
+        return [c for c in raw if isinstance(c, str)]
+    return []
+
+
+async def load_user_signals(user: dict) -> dict:
+    """
+    Preferred categories, tag affinity (0..1) from recent reads and the
+    set of already-read ids. Cached per user for a few minutes.
+    """
+    username = user.get("sub")
+    cached = _local_signals.get(username)
+    if cached is not None:
+        return cached
+
+    resp = await asyncio.to_thread(
+        lambda: supabase.table("users").select("id, news_preferences").eq("username", username).execute()
+    )
+    row = resp.data[0] if resp and resp.data else {}
+    preferred = _preferred_categories(row.get("news_preferences"))
+
+    # Reads are recorded under the token's id (login) or sub (register)
+    user_keys = [k for k in {user.get("id"), row.get("id"), username} if k]
+    read_ids = await recent_article_ids(user_keys, EXCLUDE_HISTORY)
+
+    affinity = {}
+    recent = read_ids[:AFFINITY_HISTORY]
+    if recent:
+        oids = [ObjectId(a) for a in recent if ObjectId.is_valid(a)]
+        docs = await async_articles_collection.find({"_id": {"$in": oids}}, {"tags": 1}).to_list(length=len(oids))
+        for d in docs:
+            for tag in d.get("tags") or []:
+                affinity[tag] = affinity.get(tag, 0) + 1
+        if affinity:
+            top = max(affinity.values())
+            affinity = {t: c / top for t, c in affinity.items()}
+
+    signals = {"preferred": preferred, "affinity": affinity, "read_ids": set(read_ids)}
+    _local_signals.set(username, signals, SIGNALS_TTL)
+    return signals
+
+
+# -----------------------------
+# Ranking
+# -----------------------------
+def _age_hours(created_at, now: datetime) -> float:
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            return float("inf")
+    if not isinstance(created_at, datetime):
+        return float("inf")
+    return max(0.0, (now - created_at).total_seconds() / 3600)
+
+
+def score_candidate(doc: dict, signals: dict, now: datetime) -> float:
+    preference = 1.0 if doc.get("category") in signals["preferred"] else 0.0
+    affinity = signals["affinity"]
+    tag_score = min(1.0, sum(affinity.get(t, 0) for t in doc.get("tags") or []))
+    recency = math.pow(0.5, _age_hours(doc.get("created_at"), now) / RECENCY_HALF_LIFE_HOURS)
+    return PREFERENCE_WEIGHT * preference + TAG_WEIGHT * tag_score + RECENCY_WEIGHT * recency
+
+
+async def get_for_you_feed(user: dict, limit: int = 20, offset: int = 0) -> dict:
+    signals = await load_user_signals(user)
+    pools = await load_pools(signals["preferred"] + [HOT_POOL])
+
+    # Merge pools, dropping duplicates and articles the user already read
+    candidates = {}
+    for docs in pools.values():
+        for doc in docs:
+            doc_id = doc.get("_id")
+            if doc_id not in candidates and doc_id not in signals["read_ids"]:
+                candidates[doc_id] = doc
+
+    now = datetime.utcnow()
+    ranked = sorted(candidates.values(), key=lambda d: score_candidate(d, signals, now), reverse=True)
+    page = ranked[offset:offset + limit]
+    return {
+        "articles": page,
+        "next_offset": offset + limit if offset + limit < len(ranked) else None
+    }
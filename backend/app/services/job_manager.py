@@ -0,0 +1,134 @@
+# app/services/job_manager.py
+
+import asyncio
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# How many finished jobs we keep around for status polling
+MAX_TRACKED_JOBS = 50
+
+
+class Job:
+    """
+    A background job tracked in-process. Progress counters are bumped
+    from the worker thread and read by the status endpoints.
+    """
+
+    def __init__(self, kind: str, params: dict | None = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def bump(self, field: str, amount: int = 1):
+        with self._lock:
+            self.progress[field] = self.progress.get(field, 0) + amount
+
+    def set_progress(self, **fields):
+        with self._lock:
+            self.progress.update(fields)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "params": self.params,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            }
+
+
+class JobManager:
+    """
+    Runs long pipeline jobs on their own thread + event loop (same approach
+    as the APScheduler jobs) so they never hold an HTTP request open.
+    Jobs submitted with the same coalesce_key while one is still running
+    are folded into the running job.
+    """
+
+    def __init__(self, max_jobs: int = MAX_TRACKED_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, coro_factory, params: dict | None = None, coalesce_key: str | None = None):
+        """
+        Queue `coro_factory(job)` to run in the background.
+        Returns (job, created) — created is False when coalesced into a running job.
+        """
+        with self._lock:
+            if coalesce_key:
+                running = self._active.get(coalesce_key)
+                if running and running.is_active:
+                    return running, False
+
+            job = Job(kind, params)
+            self._jobs[job.id] = job
+            if coalesce_key:
+                self._active[coalesce_key] = job
+            self._trim()
+
+        thread = threading.Thread(
+            target=self._run,
+            args=(job, coro_factory, coalesce_key),
+            name=f"job-{kind}-{job.id[:8]}",
+            daemon=True,
+        )
+        thread.start()
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j.snapshot() for j in reversed(jobs)]
+
+    def _run(self, job: Job, coro_factory, coalesce_key: str | None):
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = asyncio.run(coro_factory(job))
+            job.status = "completed"
+        except Exception as e:
+            print(f"[Jobs] {job.kind} job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                if coalesce_key and self._active.get(coalesce_key) is job:
+                    del self._active[coalesce_key]
+
+    def _trim(self):
+        # Drop the oldest finished jobs; never evict a running one
+        for job_id in list(self._jobs.keys()):
+            if len(self._jobs) <= self.max_jobs:
+                break
+            if not self._jobs[job_id].is_active:
+                del self._jobs[job_id]
+
+
+job_manager = JobManager()
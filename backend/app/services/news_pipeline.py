@@ -3,14 +3,21 @@ from datetime import datetime
 # from app.services.news_service import scrape_article
 from app.utils.scraper import scrape_article
 from app.utils.rss_parser import parse_rss_feed
-from app.services.nlp_local import analyze_sentiment, process_article_nlp
+from app.services.nlp_local import analyze_sentiment, process_article_nlp, NLP_VERSION
 from app.config.mongo import (
     raw_articles_collection,
     articles_collection,
     pipeline_logs_collection,
     feeds_metadata_collection
 )
+from app.utils.response_cache import invalidate_article_lists
+from app.services.ranking_service import hot_score
+from app.services.search_service import title_terms
+from app.services.feed_service import rebuild_candidate_pools
+from app.services.tag_index import index_article_tags
+from app.services.trending_service import store_card
 from asyncio import Semaphore
+from pymongo.errors import DuplicateKeyError
 
 MAX_CONCURRENT = 5
 semaphore = Semaphore(MAX_CONCURRENT)
@@ -21,13 +28,39 @@ BATCH_SIZE = 10
 BATCH_THROTTLE = 6
 
 
-async def process_raw_article(raw_article):
+def _store_raw_article(article: dict) -> bool:
+    """
+    Store a raw article unless its URL is already there; True if it was new.
+    One upsert instead of find-then-insert, so a URL repeated within a feed
+    or inserted by a concurrent run (scheduler vs admin refresh) is skipped
+    rather than failing the rest of the feed.
+    """
+    try:
+        result = raw_articles_collection.update_one(
+            {"url": article["url"]}, {"$setOnInsert": article}, upsert=True
+        )
+    except DuplicateKeyError:
+        # Lost the race to a concurrent upsert of the same URL
+        return False
+    if result.upserted_id is None:
+        return False
+    article["_id"] = result.upserted_id
+    return True
+
+
+async def process_raw_article(raw_article, job=None):
+    """
+    Scrape, run NLP on and store a single raw article.
+    `job` is an optional job_manager.Job used to report progress.
+    """
     if articles_collection.find_one({"url": raw_article["url"]}):
         return None
 
     scraped = await asyncio.to_thread(scrape_article, raw_article["url"])
     if not scraped or not scraped.get("content"):
         return None
+    if job:
+        job.bump("items_scraped")
 
     raw_article["content"] = scraped["content"]
     # Prioritize RSS image, fallback to scraped image
@@ -36,15 +69,19 @@ async def process_raw_article(raw_article):
 
     # Process locally instead of Gemini
     processed = await asyncio.to_thread(process_article_nlp, raw_article["content"])
+    if job:
+        job.bump("nlp_completed")
 
     structured_article = {
         "title": raw_article["title"],
+        "title_terms": title_terms(raw_article["title"]),
         "url": raw_article["url"],
         "summary": processed["summary"],
         "content": processed["synthesized_content"],
         "category": processed["category"],
         "tags": processed["tags"],
         "sentiment": processed["sentiment"],
+        "nlp_version": NLP_VERSION,
         "author_email": "system",
         "image_url": raw_article.get("image_url"),
         "source_url": raw_article.get("source_url"),
@@ -52,22 +89,34 @@ async def process_raw_article(raw_article):
         "downvotes": 0,
         "comments_count": 0,
         "views": 0,
+        "counters_version": 0,
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
+    structured_article["hot_score"] = hot_score(0, 0, 0, structured_article["created_at"])
 
     try:
-        articles_collection.insert_one(structured_article)
+        result = articles_collection.insert_one(structured_article)
         print(f"Processed article: {raw_article['title']}")
+        invalidate_article_lists(structured_article["category"], structured_article["tags"])
+        index_article_tags(result.inserted_id, structured_article["tags"])
+        store_card(structured_article)
     except Exception as e:
         print(f"Failed to insert article {raw_article['url']}: {e}")
 
     return structured_article
 
-async def fetch_and_process_feeds(feeds: list):
+def _refresh_candidate_pools():
+    try:
+        rebuild_candidate_pools()
+    except Exception as e:
+        print(f"[ForYou] Failed to rebuild candidate pools: {e}")
+
+async def fetch_and_process_feeds(feeds: list, job=None):
     """
     Always refetch all RSS feed items, but process only new ones.
     Updates feed metadata with latest fetched timestamp every run.
+    Progress is reported on `job` when run through the job manager.
     """
     total_fetched = 0
     total_processed = 0
@@ -75,6 +124,9 @@ async def fetch_and_process_feeds(feeds: list):
     nlp_fail = 0
 
     tasks = []
+    if job:
+        job.set_progress(feeds_total=len(feeds), feeds_done=0, items_fetched=0, items_queued=0,
+                         items_scraped=0, nlp_completed=0, nlp_failed=0)
 
     for feed_url in feeds:
         try:
@@ -87,14 +139,11 @@ async def fetch_and_process_feeds(feeds: list):
             new_articles = []
 
             for article in raw_articles:
-                # Skip if article already exists (by URL)
-                if raw_articles_collection.find_one({"url": article["url"]}):
-                    continue
-
                 article["created_at"] = datetime.utcnow()
-                raw_articles_collection.insert_one(article)
+                if not _store_raw_article(article):
+                    continue
                 new_articles.append(article)
-                tasks.append(process_raw_article(article))
+                tasks.append(process_raw_article(article, job=job))
 
             # ✅ Always update last_fetched, even if no new articles
             feeds_metadata_collection.update_one(
@@ -108,6 +157,10 @@ async def fetch_and_process_feeds(feeds: list):
         except Exception as e:
             print(f"❌ Error processing feed {feed_url}: {e}")
 
+        if job:
+            job.bump("feeds_done")
+            job.set_progress(items_fetched=total_fetched, items_queued=len(tasks))
+
     # Run all NLP processing tasks concurrently
     if tasks:
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -121,6 +174,9 @@ async def fetch_and_process_feeds(feeds: list):
     else:
         results = []
 
+    if job:
+        job.set_progress(nlp_failed=nlp_fail)
+
     # Log this pipeline run
     pipeline_logs_collection.insert_one({
         "timestamp": datetime.utcnow(),
@@ -135,6 +191,10 @@ async def fetch_and_process_feeds(feeds: list):
         f"processed={total_processed}, nlp_success={nlp_success}, nlp_fail={nlp_fail}"
     )
 
+    # Refresh "For You" candidate pools with the new articles
+    if nlp_success:
+        _refresh_candidate_pools()
+
     return results
 
 from app.clients.newsdata_client import NewsDataClient
@@ -160,23 +220,23 @@ async def fetch_and_process_newsdata(api_key: str):
     new_count = 0
     
     for article in all_articles:
-        # Skip if article already exists (by URL)
-        if raw_articles_collection.find_one({"url": article["url"]}):
-            continue
-
         # Ensure created_at is datetime
         if isinstance(article.get("created_at"), str):
             try:
                 article["created_at"] = datetime.fromisoformat(article["created_at"])
             except:
                 article["created_at"] = datetime.utcnow()
-                
-        raw_articles_collection.insert_one(article)
+
+        # Skip if article already exists (by URL)
+        if not _store_raw_article(article):
+            continue
         tasks.append(process_raw_article(article))
         new_count += 1
         
     print(f"✅ {new_count} new NewsData articles queued for processing")
 
     if tasks:
-        await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if any(r and not isinstance(r, Exception) for r in results):
+            _refresh_candidate_pools()
 
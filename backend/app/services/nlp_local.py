@@ -76,15 +76,19 @@ CATEGORY_MAPPING = {
 # HELPER FUNCTIONS
 # ==============================
 
+def _sentiment_label(result: dict) -> str:
+    label = result['label'].lower()
+    score = result.get('score', 0.0)
+    if score < 0.65:
+        return "neutral"
+    return "positive" if "pos" in label else "negative"
+
+
 def analyze_sentiment(text: str) -> str:
     """Perform sentiment analysis using BERT model."""
     try:
         result = sentiment_analyzer(text[:512])[0]
-        label = result['label'].lower()
-        score = result.get('score', 0.0)
-        if score < 0.65:
-            return "neutral"
-        return "positive" if "pos" in label else "negative"
+        return _sentiment_label(result)
     except Exception as e:
         print(f"Sentiment analysis failed: {e}")
         return "neutral"
@@ -270,6 +274,61 @@ def fix_summary_truncation(text: str, min_length: int = 30) -> str:
 # MAIN NLP PROCESSING
 # ==============================
 
+# Bump whenever the summarizer, category rules or keyword settings change.
+# Stored on every article as `nlp_version` so outdated ones can be reprocessed.
+NLP_VERSION = 1
+
+SUMMARY_KWARGS = dict(
+    do_sample=False,
+    truncation=True,
+    num_beams=3,  # Reduced for speed
+    early_stopping=True,
+    no_repeat_ngram_size=2,
+    length_penalty=0.8
+)
+
+KEYWORD_KWARGS = dict(
+    keyphrase_ngram_range=(1, 2),
+    stop_words='english',
+    top_n=5,
+    use_maxsum=True,
+    nr_candidates=20
+)
+
+
+def _summary_target_words(input_text: str) -> int:
+    # Calculate dynamic length based on input word count
+    word_count = len(input_text.split())
+    return max(60, min(150, word_count // 4))
+
+
+def _format_summary(summary_text: str) -> str:
+    summary = summary_text.strip()
+
+    # Fix any truncation issues
+    summary = fix_summary_truncation(summary, min_length=40)
+
+    # Format into readable paragraphs (optional)
+    sentences = split_into_sentences(summary)
+    if len(sentences) > 2:
+        paragraphs = []
+        for i in range(0, len(sentences), 2):
+            para = " ".join(sentences[i:i+2])
+            if para:
+                paragraphs.append(para)
+        summary = "\n\n".join(paragraphs)
+    return summary
+
+
+def _fallback_summary(content: str) -> str:
+    sentences = split_into_sentences(content[:500])
+    return " ".join(sentences[:3]) if sentences else content[:200]
+
+
+def _keyword_text(content: str, summary: str) -> str:
+    return summary if len(content) > 2000 else content[:1000]
+
+
 def process_article_nlp(content: str) -> dict:
     """
     Process article content with optimized models:
@@ -290,42 +349,20 @@ def process_article_nlp(content: str) -> dict:
         else:
             # Use more aggressive truncation for efficiency
             input_text = content_clean[:1500]  # Limit input
-            
-            # Calculate dynamic length based on input word count
-            word_count = len(input_text.split())
-            target_words = max(60, min(150, word_count // 4))
+            target_words = _summary_target_words(input_text)
             
             result = summarizer(
                 input_text,
                 max_length=target_words,
                 min_length=max(40, target_words - 30),
-                do_sample=False,
-                truncation=True,
-                num_beams=3,  # Reduced for speed
-                early_stopping=True,
-                no_repeat_ngram_size=2,
-                length_penalty=0.8
+                **SUMMARY_KWARGS
             )
             
-            summary = result[0]["summary_text"].strip()
-            
-            # Fix any truncation issues
-            summary = fix_summary_truncation(summary, min_length=40)
-            
-            # Format into readable paragraphs (optional)
-            sentences = split_into_sentences(summary)
-            if len(sentences) > 2:
-                paragraphs = []
-                for i in range(0, len(sentences), 2):
-                    para = " ".join(sentences[i:i+2])
-                    if para:
-                        paragraphs.append(para)
-                summary = "\n\n".join(paragraphs)
+            summary = _format_summary(result[0]["summary_text"])
     
     except Exception as e:
         print(f"Summarization failed: {e}")
-        sentences = split_into_sentences(content[:500])
-        summary = " ".join(sentences[:3]) if sentences else content[:200]
+        summary = _fallback_summary(content)
     
     # --------------------------
     # SENTIMENT
@@ -341,15 +378,7 @@ def process_article_nlp(content: str) -> dict:
     # KEYWORDS
     # --------------------------
     try:
-        keyword_text = summary if len(content) > 2000 else content[:1000]
-        tags = kw_model.extract_keywords(
-            keyword_text,
-            keyphrase_ngram_range=(1, 2),
-            stop_words='english',
-            top_n=5,
-            use_maxsum=True,
-            nr_candidates=20
-        )
+        tags = kw_model.extract_keywords(_keyword_text(content, summary), **KEYWORD_KWARGS)
         tags = [t[0] for t in tags]
     except Exception as e:
         print(f"Keyword extraction failed: {e}")
@@ -364,4 +393,83 @@ def process_article_nlp(content: str) -> dict:
         "category": category,
         "tags": tags,
         "synthesized_content": content
-    }
\ No newline at end of file
+    }
+
+
+def process_articles_nlp_batch(contents: list, batch_size: int = 8) -> list:
+    """
+    Batched variant of process_article_nlp for bulk jobs.
+    Each model runs once per batch instead of once per article.
+    Returns one result dict per input, in the same order.
+    """
+    contents = [c or "" for c in contents]
+    cleaned = [re.sub(r'\s+', ' ', c).strip() for c in contents]
+    summaries = [None] * len(contents)
+
+    # --------------------------
+    # SUMMARIZATION
+    # --------------------------
+    # The pipeline takes one max/min length per call, so group inputs by target length
+    groups = {}
+    for i, text in enumerate(cleaned):
+        if len(text.split()) < 50:
+            summaries[i] = text
+        else:
+            input_text = text[:1500]
+            groups.setdefault(_summary_target_words(input_text), []).append((i, input_text))
+
+    for target_words, items in groups.items():
+        try:
+            results = summarizer(
+                [text for _, text in items],
+                max_length=target_words,
+                min_length=max(40, target_words - 30),
+                batch_size=batch_size,
+                **SUMMARY_KWARGS
+            )
+            for (i, _), result in zip(items, results):
+                summaries[i] = _format_summary(result["summary_text"])
+        except Exception as e:
+            print(f"Batch summarization failed: {e}")
+            for i, _ in items:
+                summaries[i] = _fallback_summary(contents[i])
+
+    # --------------------------
+    # SENTIMENT
+    # --------------------------
+    try:
+        sentiment_inputs = [(s if s else c)[:512] for s, c in zip(summaries, contents)]
+        sentiments = [_sentiment_label(r) for r in sentiment_analyzer(sentiment_inputs, batch_size=batch_size)]
+    except Exception as e:
+        print(f"Batch sentiment analysis failed: {e}")
+        sentiments = ["neutral"] * len(contents)
+
+    # --------------------------
+    # CATEGORY
+    # --------------------------
+    categories = [classify_category(c) for c in contents]
+
+    # --------------------------
+    # KEYWORDS
+    # --------------------------
+    try:
+        keyword_inputs = [_keyword_text(c, s) for c, s in zip(contents, summaries)]
+        keywords = kw_model.extract_keywords(keyword_inputs, **KEYWORD_KWARGS)
+        # KeyBERT returns a flat list when given a single document
+        if len(keyword_inputs) == 1:
+            keywords = [keywords]
+        tags = [[t[0] for t in kws] for kws in keywords]
+    except Exception as e:
+        print(f"Batch keyword extraction failed: {e}")
+        tags = [[] for _ in contents]
+
+    return [
+        {
+            "summary": summaries[i],
+            "sentiment": sentiments[i],
+            "category": categories[i],
+            "tags": tags[i],
+            "synthesized_content": contents[i]
+        }
+        for i in range(len(contents))
+    ]
@@ -0,0 +1,70 @@
+# app/services/ranking_service.py
+
+import argparse
+import math
+from datetime import datetime
+from app.config.mongo import articles_collection
+
+# "Hot" score: log-scaled engagement plus a term that grows with publish time.
+# Newer articles outrank older ones with similar engagement, so the ranking
+# decays with age without ever rescoring old documents — the score only has
+# to be recomputed when an article's own counters change.
+HOT_EPOCH = datetime(2024, 1, 1)
+# Every HOT_GRAVITY_SECONDS of recency is worth 10x the engagement
+HOT_GRAVITY_SECONDS = 45000
+VIEW_WEIGHT = 0.1
+UPVOTE_WEIGHT = 1.0
+DOWNVOTE_WEIGHT = 1.0
+
+
+def hot_score(views: int, upvotes: int, downvotes: int, created_at: datetime) -> float:
+    """Python twin of hot_score_expr(), used when inserting new articles."""
+    engagement = 1 + views * VIEW_WEIGHT + upvotes * UPVOTE_WEIGHT - downvotes * DOWNVOTE_WEIGHT
+    age_term = (created_at - HOT_EPOCH).total_seconds() / HOT_GRAVITY_SECONDS
+    return math.log10(max(1.0, engagement)) + age_term
+
+
+def hot_score_expr() -> dict:
+    """Aggregation expression computing hot_score from a document's fields."""
+    engagement = {"$add": [
+        1,
+        {"$multiply": [{"$ifNull": ["$views", 0]}, VIEW_WEIGHT]},
+        {"$multiply": [{"$ifNull": ["$upvotes", 0]}, UPVOTE_WEIGHT]},
+        {"$multiply": [{"$ifNull": ["$downvotes", 0]}, -DOWNVOTE_WEIGHT]},
+    ]}
+    # date - date yields milliseconds
+    age_term = {"$divide": [{"$subtract": ["$created_at", HOT_EPOCH]}, HOT_GRAVITY_SECONDS * 1000]}
+    return {"$add": [{"$log10": {"$max": [1, engagement]}}, age_term]}
+
+
+def counter_update(inc: dict) -> list:
+    """
+    Update pipeline that applies $inc-style counter deltas and recomputes
+    hot_score in the same atomic write, e.g. counter_update({"views": 5}).
+    updated_at moves too, so the incremental export picks up new counts.
+    """
+    counters = {field: {"$add": [{"$ifNull": [f"${field}", 0]}, delta]} for field, delta in inc.items()}
+    return [
+        {"$set": {**counters, "updated_at": "$$NOW"}},
+        {"$set": {"hot_score": hot_score_expr()}},
+    ]
+
+
+def backfill_hot_scores() -> int:
+    """Compute hot_score for articles stored before the field existed."""
+    result = articles_collection.update_many(
+        {"hot_score": {"$exists": False}},
+        [{"$set": {"hot_score": hot_score_expr()}}]
+    )
+    print(f"[Ranking] Backfilled hot_score on {result.modified_count} articles")
+    return result.modified_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the article hot ranking.")
+    parser.add_argument("--backfill", action="store_true", help="Score articles missing hot_score")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill_hot_scores()
+    else:
+        parser.print_help()
@@ -0,0 +1,321 @@
+# app/services/reading_service.py
+
+"""
+Per-user reading history as an append-only event log plus small aggregates.
+
+- reading_events: one document per read
+      {_id: "<batch>:<n>", batch, user_id, article_id, ts, reading_time_seconds}
+- reading_stats: one document per user, updated incrementally
+      {_id: user_id, total_reads, articles_read, reading_seconds, streak,
+       last_read_day, last_read_at, recent: [last RECENT_HISTORY reads],
+       batches: [last APPLIED_BATCHES batch ids]}
+
+The view buffer hands over batches of reads, each with its own id. A batch
+costs one indexed "already read?" query, one insert_many and one bulk_write
+of per-user pipeline updates, however long a user's history is. The streak
+and the bounded recent list are computed inside the update, so concurrent
+writers never overwrite each other. Event ids and the applied-batch list
+make a retried batch a no-op for whatever part of it already landed.
+
+Rollout: run `python -m app.services.reading_service --backfill` to merge
+the reading history stored in the legacy analytics documents. It rebuilds
+those users' aggregates from the event log and then writes a marker;
+until the marker exists the Supabase snapshot and the dashboard keep using
+the legacy gamification values.
+"""
+import argparse
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config.mongo import (
+    analytics_collection,
+    reading_events_collection,
+    reading_stats_collection,
+    async_reading_events_collection,
+    async_reading_stats_collection,
+)
+
+# Reads kept inline in reading_stats for the dashboard
+RECENT_HISTORY = 50
+# Batch ids remembered per user, so a retried batch is applied once
+APPLIED_BATCHES = 50
+# reading_stats document written when the legacy backfill has finished
+BACKFILL_MARKER = "__backfill__"
+DUPLICATE_KEY = 11000
+
+
+def _day_start(ts: datetime) -> datetime:
+    return datetime(ts.year, ts.month, ts.day)
+
+
+def _only_duplicates(e: BulkWriteError) -> bool:
+    errors = e.details.get("writeErrors") or []
+    return all(err.get("code") == DUPLICATE_KEY for err in errors)
+
+
+def _stats_update(reads: int, new_articles: int, seconds: int, last_at: datetime, recent: list, batch_id: str) -> list:
+    # Update pipeline: the streak depends on the stored last_read_day
+    day = _day_start(last_at)
+    last_day = {"$ifNull": ["$last_read_day", None]}
+    streak = {"$ifNull": ["$streak", 0]}
+    return [{"$set": {
+        "streak": {"$switch": {
+            "branches": [
+                # already read that day, or this batch is older than the last read
+                {"case": {"$gte": [last_day, day]}, "then": {"$max": [streak, 1]}},
+                {"case": {"$eq": [last_day, day - timedelta(days=1)]}, "then": {"$add": [streak, 1]}},
+            ],
+            "default": 1,
+        }},
+        "last_read_day": {"$max": [last_day, day]},
+        "last_read_at": {"$max": [{"$ifNull": ["$last_read_at", None]}, last_at]},
+        "total_reads": {"$add": [{"$ifNull": ["$total_reads", 0]}, reads]},
+        "articles_read": {"$add": [{"$ifNull": ["$articles_read", 0]}, new_articles]},
+        "reading_seconds": {"$add": [{"$ifNull": ["$reading_seconds", 0]}, seconds]},
+        "recent": {"$slice": [
+            {"$concatArrays": [{"$ifNull": ["$recent", []]}, {"$literal": recent}]},
+            -RECENT_HISTORY,
+        ]},
+        "batches": {"$slice": [
+            {"$concatArrays": [{"$ifNull": ["$batches", []]}, {"$literal": [batch_id]}]},
+            -APPLIED_BATCHES,
+        ]},
+    }}]
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def record_reads(reads: list, batch_id: str, ts: datetime | None = None) -> bool:
+    """
+    Append (user_id, article_id, reading_time_seconds) reads to the log and
+    fold them into each user's aggregates. Returns False if Mongo failed;
+    calling again with the same batch_id and ts finishes the batch without
+    counting any part of it twice.
+    """
+    reads = [(str(u), str(a), t) for u, a, t in reads if u and a]
+    if not reads:
+        return True
+    ts = ts or datetime.utcnow()
+
+    try:
+        # Which (user, article) pairs were read before, for the unique count.
+        # Events of this batch stored by an earlier attempt don't count.
+        users = list({u for u, _, _ in reads})
+        articles = list({a for _, a, _ in reads})
+        seen = {
+            (doc["user_id"], doc["article_id"])
+            for doc in reading_events_collection.find(
+                {"user_id": {"$in": users}, "article_id": {"$in": articles}, "batch": {"$ne": batch_id}},
+                {"_id": 0, "user_id": 1, "article_id": 1}
+            )
+        }
+
+        events = []
+        per_user = {}
+        for i, (user_id, article_id, seconds) in enumerate(reads):
+            seconds = int(seconds) if seconds is not None else None
+            events.append({
+                "_id": f"{batch_id}:{i}", "batch": batch_id, "user_id": user_id, "article_id": article_id,
+                "ts": ts, "reading_time_seconds": seconds,
+            })
+            agg = per_user.setdefault(user_id, {"reads": 0, "new": 0, "seconds": 0, "recent": []})
+            agg["reads"] += 1
+            agg["seconds"] += seconds or 0
+            agg["recent"].append({"article_id": article_id, "ts": ts, "reading_time_seconds": seconds})
+            if (user_id, article_id) not in seen:
+                seen.add((user_id, article_id))
+                agg["new"] += 1
+
+        try:
+            reading_events_collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate ids are events stored by an earlier attempt
+            if not _only_duplicates(e):
+                raise
+
+        # A user whose batches already include this one doesn't match, and the
+        # upsert then fails with a duplicate _id: the batch was applied before.
+        try:
+            reading_stats_collection.bulk_write([
+                UpdateOne(
+                    {"_id": user_id, "batches": {"$ne": batch_id}},
+                    _stats_update(agg["reads"], agg["new"], agg["seconds"], ts, agg["recent"][-RECENT_HISTORY:], batch_id),
+                    upsert=True,
+                )
+                for user_id, agg in per_user.items()
+            ], ordered=False)
+        except BulkWriteError as e:
+            if not _only_duplicates(e):
+                raise
+        return True
+    except BulkWriteError as e:
+        print(f"[Reading] Partial failure recording {len(reads)} reads: {e.details.get('writeErrors', [])[:3]}")
+        return False
+    except Exception as e:
+        print(f"[Reading] Failed to record {len(reads)} reads: {e}")
+        return False
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+async def get_reading_stats(user_id: str) -> dict | None:
+    """Aggregates for one user, or None if there is no reading_stats document."""
+    doc = await async_reading_stats_collection.find_one({"_id": str(user_id)})
+    if not doc:
+        return None
+    return {
+        "total_reads": doc.get("total_reads", 0),
+        "articles_read": doc.get("articles_read", 0),
+        "reading_seconds": doc.get("reading_seconds", 0),
+        "streak": current_streak(doc),
+        "last_read_at": doc.get("last_read_at"),
+        "recent": list(reversed(doc.get("recent", []))),
+    }
+
+
+def current_streak(doc: dict) -> int:
+    """The stored streak, or 0 if the user hasn't read since yesterday."""
+    last_day = doc.get("last_read_day")
+    if not last_day or last_day < _day_start(datetime.utcnow()) - timedelta(days=1):
+        return 0
+    return doc.get("streak", 0)
+
+
+async def count_reads_since(user_id: str, since: datetime) -> int:
+    return await async_reading_events_collection.count_documents({"user_id": str(user_id), "ts": {"$gte": since}})
+
+
+async def recent_article_ids(user_ids: list, limit: int) -> list:
+    """Most recently read article ids (newest first, distinct) across a user's ids."""
+    cursor = async_reading_events_collection.find(
+        {"user_id": {"$in": [str(u) for u in user_ids]}}, {"_id": 0, "article_id": 1}
+    ).sort("ts", -1).limit(limit)
+    ids = []
+    seen = set()
+    async for doc in cursor:
+        if doc["article_id"] not in seen:
+            seen.add(doc["article_id"])
+            ids.append(doc["article_id"])
+    return ids
+
+
+# -----------------------------
+# Backfill from legacy analytics documents
+# -----------------------------
+_backfilled = False
+
+
+def backfill_complete() -> bool:
+    """True once backfill_from_analytics has run to the end."""
+    global _backfilled
+    if not _backfilled:
+        _backfilled = reading_stats_collection.count_documents({"_id": BACKFILL_MARKER}, limit=1) > 0
+    return _backfilled
+
+
+async def backfill_complete_async() -> bool:
+    global _backfilled
+    if not _backfilled:
+        _backfilled = await async_reading_stats_collection.count_documents({"_id": BACKFILL_MARKER}, limit=1) > 0
+    return _backfilled
+
+
+def _streak_from_days(days: list) -> tuple:
+    # (streak ending on the last day, last day)
+    days = sorted(set(days))
+    streak = 1
+    for prev, cur in zip(days, days[1:]):
+        streak = streak + 1 if cur - prev == timedelta(days=1) else 1
+    return streak, days[-1]
+
+
+def _legacy_events(user_id: str, history: list) -> list:
+    # Deterministic ids, so running the backfill again inserts nothing twice
+    events = []
+    for entry in history or []:
+        ts = entry.get("timestamp")
+        if isinstance(ts, str):
+            try:
+                ts = datetime.fromisoformat(ts)
+            except ValueError:
+                ts = None
+        if not isinstance(ts, datetime) or not entry.get("article_id"):
+            continue
+        seconds = entry.get("reading_time_seconds")
+        article_id = str(entry["article_id"])
+        events.append({
+            "_id": f"legacy:{user_id}:{article_id}:{ts.isoformat()}",
+            "batch": "legacy",
+            "user_id": user_id,
+            "article_id": article_id,
+            "ts": ts,
+            "reading_time_seconds": int(seconds) if seconds is not None else None,
+        })
+    return events
+
+
+def rebuild_stats(user_id: str) -> bool:
+    """Recompute a user's aggregates from their whole event log."""
+    events = list(reading_events_collection.find(
+        {"user_id": user_id}, {"_id": 0, "article_id": 1, "ts": 1, "reading_time_seconds": 1}
+    ).sort("ts", 1))
+    if not events:
+        return False
+    streak, last_day = _streak_from_days([_day_start(e["ts"]) for e in events])
+    # batches is left alone: it still guards retries of batches counted here
+    reading_stats_collection.update_one({"_id": user_id}, {"$set": {
+        "total_reads": len(events),
+        "articles_read": len({e["article_id"] for e in events}),
+        "reading_seconds": sum(e.get("reading_time_seconds") or 0 for e in events),
+        "streak": streak,
+        "last_read_day": last_day,
+        "last_read_at": events[-1]["ts"],
+        "recent": [{k: e.get(k) for k in ("article_id", "ts", "reading_time_seconds")} for e in events[-RECENT_HISTORY:]],
+    }}, upsert=True)
+    return True
+
+
+def backfill_from_analytics() -> int:
+    """
+    Merge analytics.reading_history of every user into reading_events and
+    rebuild those users' aggregates from the full log, including reads
+    recorded since the event log went live. Safe to run again. Writes the
+    backfill marker once every user imported cleanly and returns the
+    number of users rebuilt.
+    """
+    rebuilt = 0
+    failed = 0
+    for doc in analytics_collection.find({"reading_history.0": {"$exists": True}}, {"user_id": 1, "reading_history": 1}):
+        user_id = str(doc.get("user_id"))
+        events = _legacy_events(user_id, doc.get("reading_history"))
+        if not events:
+            continue
+        try:
+            reading_events_collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            if not _only_duplicates(e):
+                print(f"[Reading] Failed to import history for user {user_id}: {e.details.get('writeErrors', [])[:3]}")
+                failed += 1
+                continue
+        rebuilt += rebuild_stats(user_id)
+
+    if failed:
+        print(f"[Reading] Backfilled {rebuilt} users, {failed} failed; run again before relying on reading_stats")
+        return rebuilt
+    reading_stats_collection.update_one(
+        {"_id": BACKFILL_MARKER}, {"$set": {"completed_at": datetime.utcnow(), "users": rebuilt}}, upsert=True
+    )
+    print(f"[Reading] Backfilled reading history for {rebuilt} users")
+    return rebuilt
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the reading event log.")
+    parser.add_argument("--backfill", action="store_true", help="Merge reading history from analytics documents")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill_from_analytics()
+    else:
+        parser.print_help()
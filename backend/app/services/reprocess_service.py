@@ -0,0 +1,228 @@
+# app/services/reprocess_service.py
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config.mongo import articles_collection, reprocess_checkpoints_collection
+from app.services.nlp_local import NLP_VERSION, process_articles_nlp_batch
+from app.services.tag_index import retag_article
+from app.utils.response_cache import invalidate_all_article_lists
+
+DEFAULT_BATCH_SIZE = 32
+# Fraction of wall time the job may spend inside the NLP models.
+# 0.5 means every second of model time is followed by a second of sleep.
+DEFAULT_CPU_BUDGET = 0.5
+
+
+def build_reprocess_filter(
+    category: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    model_version: int | None = None,
+    outdated_only: bool = True
+) -> dict:
+    """
+    Build the Mongo filter for the subset of articles to reprocess.
+    model_version targets articles produced by one specific NLP version;
+    otherwise outdated_only picks everything not on the current NLP_VERSION.
+    """
+    query = {}
+    if category:
+        query["category"] = category
+    if since or until:
+        query["created_at"] = {}
+        if since:
+            query["created_at"]["$gte"] = since
+        if until:
+            query["created_at"]["$lt"] = until
+    if model_version is not None:
+        query["nlp_version"] = model_version
+    elif outdated_only:
+        query["nlp_version"] = {"$ne": NLP_VERSION}
+    return query
+
+
+def _checkpoint_id(query: dict) -> str:
+    raw = json.dumps({"filter": query, "nlp_version": NLP_VERSION}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def reprocess_articles(
+    category: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    model_version: int | None = None,
+    outdated_only: bool = True,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    cpu_budget: float = DEFAULT_CPU_BUDGET,
+    limit: int | None = None,
+    resume: bool = True,
+    job=None
+) -> dict:
+    """
+    Re-run the NLP models over stored articles, walking `articles` in
+    ascending _id order one batch at a time. Results are written with one
+    bulk_write per batch and the last _id is checkpointed, so an interrupted
+    run picks up where it stopped when started again with the same filter.
+    `limit` caps the articles handled by this invocation; a run that stops
+    at the limit stays resumable and is only marked complete once the
+    filter has been walked to the end.
+    """
+    cpu_budget = min(max(cpu_budget, 0.05), 1.0)
+    query = build_reprocess_filter(category, since, until, model_version, outdated_only)
+    checkpoint_id = _checkpoint_id(query)
+
+    checkpoint = reprocess_checkpoints_collection.find_one({"_id": checkpoint_id}) if resume else None
+    if checkpoint and checkpoint.get("completed_at"):
+        checkpoint = None
+
+    last_id = checkpoint.get("last_id") if checkpoint else None
+    stats = {
+        "processed": checkpoint.get("processed", 0) if checkpoint else 0,
+        "failed": checkpoint.get("failed", 0) if checkpoint else 0,
+        "skipped": checkpoint.get("skipped", 0) if checkpoint else 0,
+        "batches": 0,
+    }
+    # Articles handled by this invocation (stats above are cumulative across resumes)
+    handled = 0
+    exhausted = False
+
+    fields = {"filter": json.dumps(query, default=str), "nlp_version": NLP_VERSION,
+              "updated_at": datetime.utcnow(), "completed_at": None}
+    if checkpoint is None:
+        # Fresh run (restart, or the last run completed): drop the stored
+        # position too, or an interrupted run would resume past the end
+        fields.update({"last_id": None, "processed": 0, "failed": 0, "skipped": 0,
+                       "started_at": datetime.utcnow()})
+    reprocess_checkpoints_collection.update_one({"_id": checkpoint_id}, {"$set": fields}, upsert=True)
+    print(f"[Reprocess] Starting (resume_from={last_id}) with filter {query}")
+
+    while True:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+
+        size = batch_size
+        if limit is not None:
+            size = min(size, limit - handled)
+            if size <= 0:
+                break
+
+        docs = list(
+            articles_collection.find(batch_query, {"content": 1, "tags": 1})
+            .sort("_id", 1)
+            .limit(size)
+        )
+        if not docs:
+            exhausted = True
+            break
+        handled += len(docs)
+
+        to_process = [d for d in docs if d.get("content")]
+        stats["skipped"] += len(docs) - len(to_process)
+
+        if to_process:
+            started = time.monotonic()
+            results = process_articles_nlp_batch([d["content"] for d in to_process])
+            nlp_seconds = time.monotonic() - started
+
+            now = datetime.utcnow()
+            ops = [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {
+                        "summary": res["summary"],
+                        "sentiment": res["sentiment"],
+                        "category": res["category"],
+                        "tags": res["tags"],
+                        "nlp_version": NLP_VERSION,
+                        "reprocessed_at": now,
+                        "updated_at": now
+                    }}
+                )
+                for doc, res in zip(to_process, results)
+            ]
+            try:
+                articles_collection.bulk_write(ops, ordered=False)
+                failed = set()
+            except BulkWriteError as e:
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                print(f"[Reprocess] bulk_write failed for {len(failed)} articles in batch ending {docs[-1]['_id']}")
+            except Exception as e:
+                print(f"[Reprocess] bulk_write failed for batch ending {docs[-1]['_id']}: {e}")
+                failed = set(range(len(ops)))
+            stats["processed"] += len(ops) - len(failed)
+            stats["failed"] += len(failed)
+
+            # Move rewritten articles to their new tags in the Redis tag index
+            for i, (doc, res) in enumerate(zip(to_process, results)):
+                if i not in failed:
+                    retag_article(doc["_id"], doc.get("tags") or [], res["tags"])
+        else:
+            nlp_seconds = 0.0
+
+        last_id = docs[-1]["_id"]
+        stats["batches"] += 1
+        reprocess_checkpoints_collection.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {
+                "last_id": last_id,
+                "processed": stats["processed"],
+                "failed": stats["failed"],
+                "skipped": stats["skipped"],
+                "updated_at": datetime.utcnow()
+            }}
+        )
+        if job:
+            job.set_progress(last_id=str(last_id), **stats)
+
+        # Stay within the CPU budget so ingest keeps its share of the box
+        if nlp_seconds and cpu_budget < 1.0:
+            time.sleep(nlp_seconds * (1 - cpu_budget) / cpu_budget)
+
+    if exhausted:
+        reprocess_checkpoints_collection.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"completed_at": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+        )
+    else:
+        print(f"[Reprocess] Stopped at limit after {handled} articles; rerun to continue from {last_id}")
+    # Summaries, categories and tags changed under every cached list page
+    if stats["processed"]:
+        invalidate_all_article_lists()
+    print(f"[Reprocess] Done: {stats}")
+    return stats
+
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run NLP over stored articles.")
+    parser.add_argument("--category", help="Only reprocess this category")
+    parser.add_argument("--since", type=_parse_date, help="Only articles created at/after this ISO date")
+    parser.add_argument("--until", type=_parse_date, help="Only articles created before this ISO date")
+    parser.add_argument("--model-version", type=int, help="Only articles produced by this nlp_version")
+    parser.add_argument("--all", action="store_true", help="Include articles already on the current NLP version")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--cpu-budget", type=float, default=DEFAULT_CPU_BUDGET)
+    parser.add_argument("--limit", type=int, help="Stop after this many articles in this run")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint")
+    args = parser.parse_args()
+
+    reprocess_articles(
+        category=args.category,
+        since=args.since,
+        until=args.until,
+        model_version=args.model_version,
+        outdated_only=not args.all,
+        batch_size=args.batch_size,
+        cpu_budget=args.cpu_budget,
+        limit=args.limit,
+        resume=not args.restart,
+    )
@@ -0,0 +1,93 @@
+# app/services/search_service.py
+
+import argparse
+import re
+from pymongo import UpdateOne
+from app.config.mongo import articles_collection, async_articles_collection
+
+TERM_PATTERN = re.compile(r"[a-z0-9]+")
+# Prefix queries shorter than this match too much of the index to be useful
+MIN_PREFIX_LENGTH = 2
+
+
+def title_terms(title: str | None) -> list:
+    """Lower-cased, de-duplicated title words, stored for prefix autocomplete."""
+    terms = []
+    for term in TERM_PATTERN.findall((title or "").lower()):
+        if len(term) > 1 and term not in terms:
+            terms.append(term)
+    return terms
+
+
+async def search_articles(q: str, filters: dict, projection: dict, limit: int = 20, offset: int = 0) -> dict:
+    """
+    Ranked full-text search over title, summary, tags and content using the
+    `article_text` index. `filters` narrows by category/date like the feed.
+    """
+    query = {"$text": {"$search": q}, **filters}
+    projection = {**projection, "score": {"$meta": "textScore"}}
+
+    docs = await (
+        async_articles_collection.find(query, projection)
+        .sort([("score", {"$meta": "textScore"}), ("_id", -1)])
+        .skip(offset)
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    return {
+        "results": docs,
+        "next_offset": offset + limit if len(docs) == limit else None
+    }
+
+
+async def autocomplete_titles(q: str, filters: dict, limit: int = 10) -> list:
+    """
+    Title suggestions for a partially typed query: earlier words must match
+    exactly, the last word is matched as a prefix. Served by the
+    `title_terms` multikey index via an anchored regex.
+    """
+    terms = TERM_PATTERN.findall(q.lower())
+    if not terms or len(terms[-1]) < MIN_PREFIX_LENGTH:
+        return []
+
+    *complete, partial = terms
+    # Only words title_terms() would have stored can be required
+    complete = title_terms(" ".join(complete))
+    conditions = [{"title_terms": {"$regex": f"^{re.escape(partial)}"}}]
+    if complete:
+        conditions.append({"title_terms": {"$all": complete}})
+    query = {"$and": conditions, **filters}
+
+    docs = await (
+        async_articles_collection.find(query, {"title": 1, "category": 1})
+        .limit(limit)
+        .to_list(length=limit)
+    )
+    return [{"_id": str(d["_id"]), "title": d.get("title"), "category": d.get("category")} for d in docs]
+
+
+def backfill_title_terms(batch_size: int = 1000) -> int:
+    """Populate title_terms on articles stored before the field existed."""
+    updated = 0
+    ops = []
+    for doc in articles_collection.find({"title_terms": {"$exists": False}}, {"title": 1}):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"title_terms": title_terms(doc.get("title"))}}))
+        if len(ops) >= batch_size:
+            articles_collection.bulk_write(ops, ordered=False)
+            updated += len(ops)
+            ops = []
+    if ops:
+        articles_collection.bulk_write(ops, ordered=False)
+        updated += len(ops)
+    print(f"[Search] Backfilled title_terms on {updated} articles")
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain article search fields.")
+    parser.add_argument("--backfill", action="store_true", help="Populate title_terms for autocomplete")
+    args = parser.parse_args()
+    if args.backfill:
+        backfill_title_terms()
+    else:
+        parser.print_help()
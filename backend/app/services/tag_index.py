@@ -0,0 +1,246 @@
+# app/services/tag_index.py
+
+"""
+Tag index kept in Redis and updated incrementally when an article is stored
+or retagged by a reprocess:
+- tags:df            ZSET  tag -> number of articles carrying it
+- tags:co:<tag>      ZSET  other tag -> number of articles carrying both
+- tags:recent:<tag>  LIST  newest article ids first (capped)
+- tags:lex           ZSET  "<lowercased>|<tag>", all scored 0, for prefix lookups
+
+Reads never touch Mongo except to load the cards of a tag's recent articles.
+Run `python -m app.services.tag_index --rebuild` to rebuild it from Mongo.
+"""
+import argparse
+import math
+from collections import Counter, defaultdict, deque
+from app.config.mongo import articles_collection
+from app.utils.redis_client import get_redis_client
+from app.utils.response_cache import LocalLRU
+
+# Redis client (may be Upstash REST-based)
+r = get_redis_client()
+
+DF_KEY = "tags:df"
+LEX_KEY = "tags:lex"
+CO_PREFIX = "tags:co:"
+RECENT_PREFIX = "tags:recent:"
+RECENT_LIMIT = 50
+# Candidates read from a co-occurrence set before re-ranking them
+RELATED_CANDIDATES = 50
+AUTOCOMPLETE_CANDIDATES = 50
+READ_CACHE_TTL = 30
+
+_read_cache = LocalLRU(512)
+
+# One round trip per article: removes the article's old tag set and adds the
+# new one, so storing an article (no old tags) and retagging it on reprocess
+# go through the same script. A retagged article is old news, so it joins a
+# recent list at the tail (when there is room) instead of the head.
+# KEYS: df, lex, co:<old..new>, recent:<old..new>.
+# ARGV: article id, recent limit, push to head (1/0), n old, n new, old tags, new tags.
+TAG_DELTA_SCRIPT = """
+local id, limit, head = ARGV[1], tonumber(ARGV[2]), ARGV[3] == '1'
+local n_old, n_new = tonumber(ARGV[4]), tonumber(ARGV[5])
+local n = n_old + n_new
+local in_old, in_new = {}, {}
+for i = 1, n_old do in_old[ARGV[5 + i]] = true end
+for i = n_old + 1, n do in_new[ARGV[5 + i]] = true end
+
+local function decr(key, member)
+    if tonumber(redis.call('ZINCRBY', key, -1, member)) <= 0 then
+        redis.call('ZREM', key, member)
+        return true
+    end
+    return false
+end
+
+for i = 1, n_old do
+    local tag = ARGV[5 + i]
+    for j = 1, n_old do
+        if i ~= j then decr(KEYS[2 + i], ARGV[5 + j]) end
+    end
+    if not in_new[tag] then
+        redis.call('LREM', KEYS[2 + n + i], 0, id)
+        if decr(KEYS[1], tag) then redis.call('ZREM', KEYS[2], string.lower(tag) .. '|' .. tag) end
+    end
+end
+for i = n_old + 1, n do
+    local tag = ARGV[5 + i]
+    for j = n_old + 1, n do
+        if i ~= j then redis.call('ZINCRBY', KEYS[2 + i], 1, ARGV[5 + j]) end
+    end
+    if not in_old[tag] then
+        redis.call('ZINCRBY', KEYS[1], 1, tag)
+        redis.call('ZADD', KEYS[2], 0, string.lower(tag) .. '|' .. tag)
+        if head then
+            redis.call('LPUSH', KEYS[2 + n + i], id)
+            redis.call('LTRIM', KEYS[2 + n + i], 0, limit - 1)
+        elseif redis.call('LLEN', KEYS[2 + n + i]) < limit then
+            redis.call('RPUSH', KEYS[2 + n + i], id)
+        end
+    end
+end
+return n_new
+"""
+
+
+def _clean_tags(tags) -> list:
+    seen = []
+    for tag in tags or []:
+        tag = (tag or "").strip()
+        if tag and "|" not in tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+
+def _pairs(res) -> list:
+    # redis-py returns [(member, score)], Upstash a flat [member, score, ...]
+    if not res:
+        return []
+    if isinstance(res[0], (list, tuple)):
+        return [(m, float(s)) for m, s in res]
+    return [(res[i], float(res[i + 1])) for i in range(0, len(res) - 1, 2)]
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def _apply_tag_delta(article_id: str, old: list, new: list, head: bool) -> bool:
+    tags = old + new
+    keys = [DF_KEY, LEX_KEY] + [f"{CO_PREFIX}{t}" for t in tags] + [f"{RECENT_PREFIX}{t}" for t in tags]
+    args = [str(article_id), RECENT_LIMIT, 1 if head else 0, len(old), len(new)] + tags
+    return r.eval(TAG_DELTA_SCRIPT, len(keys), *keys, *args) is not None
+
+
+def index_article_tags(article_id: str, tags: list):
+    """Add one newly stored article to the tag index."""
+    tags = _clean_tags(tags)
+    if not tags:
+        return
+    if not _apply_tag_delta(article_id, [], tags, head=True):
+        print(f"[Tags] Failed to index tags for article {article_id}")
+
+
+def retag_article(article_id: str, old_tags: list, new_tags: list) -> bool:
+    """Move an already indexed article from its old tags to its new ones."""
+    old, new = _clean_tags(old_tags), _clean_tags(new_tags)
+    if old == new:
+        return True
+    if not _apply_tag_delta(article_id, old, new, head=False):
+        print(f"[Tags] Failed to retag article {article_id}")
+        return False
+    return True
+
+
+def rebuild_tag_index(batch_size: int = 1000) -> int:
+    """Recompute the whole index from Mongo (e.g. after restoring a backup)."""
+    df = Counter()
+    co = defaultdict(Counter)
+    recent = defaultdict(lambda: deque(maxlen=RECENT_LIMIT))
+
+    cursor = articles_collection.find({}, {"tags": 1}).sort([("created_at", 1), ("_id", 1)]).batch_size(batch_size)
+    for doc in cursor:
+        tags = _clean_tags(doc.get("tags"))
+        for tag in tags:
+            df[tag] += 1
+            recent[tag].appendleft(str(doc["_id"]))
+            for other in tags:
+                if other != tag:
+                    co[tag][other] += 1
+
+    # Drop the previous index, tag by tag (no KEYS scan)
+    old_tags = [m for m, _ in _pairs(r.zrevrange(DF_KEY, 0, -1, withscores=True))]
+    for tag in old_tags:
+        r.delete(f"{CO_PREFIX}{tag}", f"{RECENT_PREFIX}{tag}")
+    r.delete(DF_KEY, LEX_KEY)
+
+    items = list(df.items())
+    for i in range(0, len(items), batch_size):
+        chunk = items[i:i + batch_size]
+        r.zadd(DF_KEY, dict(chunk))
+        r.zadd(LEX_KEY, {f"{t.lower()}|{t}": 0 for t, _ in chunk})
+    for tag, counts in co.items():
+        r.zadd(f"{CO_PREFIX}{tag}", dict(counts))
+    for tag, ids in recent.items():
+        r.rpush(f"{RECENT_PREFIX}{tag}", *ids)
+
+    print(f"[Tags] Rebuilt tag index for {len(df)} tags")
+    return len(df)
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def _cached(key: str, compute):
+    value = _read_cache.get(key)
+    if value is None:
+        value = compute()
+        _read_cache.set(key, value, READ_CACHE_TTL)
+    return value
+
+
+def popular_tags(limit: int = 20) -> list:
+    def compute():
+        res = r.zrevrange(DF_KEY, 0, limit - 1, withscores=True)
+        return [{"tag": t, "count": int(c)} for t, c in _pairs(res)]
+    return _cached(f"popular:{limit}", compute)
+
+
+def related_tags(tag: str, limit: int = 10) -> list:
+    """
+    Tags that most often appear with `tag`, ranked by cosine similarity
+    (co-count / sqrt(df(tag) * df(other))) so very common tags don't
+    dominate every list.
+    """
+    def compute():
+        candidates = _pairs(r.zrevrange(f"{CO_PREFIX}{tag}", 0, RELATED_CANDIDATES - 1, withscores=True))
+        if not candidates:
+            return []
+        dfs = r.zmscore(DF_KEY, [tag] + [m for m, _ in candidates]) or []
+        if len(dfs) != len(candidates) + 1 or not dfs[0]:
+            return [{"tag": m, "count": int(c)} for m, c in candidates[:limit]]
+        base = float(dfs[0])
+        scored = []
+        for (other, count), other_df in zip(candidates, dfs[1:]):
+            score = count / math.sqrt(base * float(other_df or count))
+            scored.append({"tag": other, "count": int(count), "score": round(score, 4)})
+        scored.sort(key=lambda x: x["score"], reverse=True)
+        return scored[:limit]
+    return _cached(f"related:{tag}:{limit}", compute)
+
+
+def recent_article_ids(tag: str, limit: int = 20) -> list:
+    return r.lrange(f"{RECENT_PREFIX}{tag}", 0, limit - 1) or []
+
+
+def tag_count(tag: str) -> int:
+    res = r.zmscore(DF_KEY, [tag]) or [None]
+    return int(float(res[0])) if res[0] is not None else 0
+
+
+def autocomplete_tags(prefix: str, limit: int = 10) -> list:
+    """Tags starting with `prefix` (case-insensitive), most used first."""
+    prefix = prefix.strip().lower()
+    if not prefix or "|" in prefix:
+        return []
+
+    def compute():
+        members = r.zrangebylex(LEX_KEY, f"[{prefix}", f"[{prefix}\xff", start=0, num=AUTOCOMPLETE_CANDIDATES) or []
+        tags = [m.split("|", 1)[1] for m in members if "|" in m]
+        if not tags:
+            return []
+        dfs = r.zmscore(DF_KEY, tags) or [None] * len(tags)
+        ranked = sorted(zip(tags, dfs), key=lambda x: float(x[1] or 0), reverse=True)
+        return [{"tag": t, "count": int(float(c or 0))} for t, c in ranked[:limit]]
+    return _cached(f"prefix:{prefix}:{limit}", compute)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the Redis tag index.")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from all stored articles")
+    args = parser.parse_args()
+    if args.rebuild:
+        rebuild_tag_index()
+    else:
+        parser.print_help()
@@ -0,0 +1,165 @@
+# app/services/timeseries_service.py
+
+"""
+Hourly engagement time series in bucketed documents.
+
+One document per article per UTC day, and one per category per day:
+
+    {_id: "<article_id>:20261019", article_id, category, day,
+     views: [24 ints], upvotes: [24 ints], downvotes: [24 ints]}
+
+Category documents use `_id: "<category>:<day>"`. The category ALL_CATEGORIES
+holds site-wide totals. The counter flushers call `record_counts` after each
+successful flush. The arrays are preallocated on insert, so every later
+write is an in-place $inc of a single slot. Charts read a few small
+documents and downsample them in memory.
+"""
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config.mongo import (
+    articles_collection,
+    article_stats_collection,
+    category_stats_collection,
+    async_article_stats_collection,
+    async_category_stats_collection,
+)
+
+METRICS = ("views", "upvotes", "downvotes")
+ALL_CATEGORIES = "_all"
+MAX_SERIES_DAYS = 90
+# resolution -> hours per point
+RESOLUTIONS = {"hour": 1, "6h": 6, "day": 24}
+
+
+def _day_start(ts: datetime) -> datetime:
+    return datetime(ts.year, ts.month, ts.day)
+
+
+def _bucket_ops(doc_id: str, identity: dict, hour: int, inc: dict) -> list:
+    # Two steps per document: preallocate the arrays on first write, then
+    # bump one slot. They touch the same paths, so they can't share an update.
+    zeros = [0] * 24
+    return [
+        UpdateOne({"_id": doc_id}, {"$setOnInsert": {**identity, **{m: zeros for m in METRICS}}}, upsert=True),
+        UpdateOne({"_id": doc_id}, {"$inc": {f"{m}.{hour}": n for m, n in inc.items()}}),
+    ]
+
+
+def _write_buckets(collection, ops: list):
+    # ordered: each document's preallocation must run before its $inc.
+    # Two flushers can race to create the same document; the losing upsert
+    # fails with a duplicate key, which only means the arrays exist, so the
+    # batch resumes after it instead of dropping the remaining $incs.
+    while ops:
+        try:
+            collection.bulk_write(ops, ordered=True)
+            return
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors") or []
+            if not errors or errors[0].get("code") != 11000:
+                raise
+            ops = ops[errors[0]["index"] + 1:]
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def record_counts(deltas: dict, ts: datetime | None = None):
+    """
+    Add {article_id: {"views": n, "upvotes": n, "downvotes": n}} to the
+    hour containing `ts` (default now) for each article, its category and
+    the site-wide series. Only positive deltas are counted: a flush that
+    nets out vote removals adds nothing rather than subtracting from the
+    hour. Best effort: failures are logged, never raised.
+    """
+    deltas = {
+        a: {m: int(n) for m, n in d.items() if m in METRICS and n and int(n) > 0}
+        for a, d in deltas.items()
+    }
+    deltas = {a: d for a, d in deltas.items() if d and ObjectId.is_valid(a)}
+    if not deltas:
+        return
+
+    ts = ts or datetime.utcnow()
+    day = _day_start(ts)
+    day_key = f"{ts:%Y%m%d}"
+
+    try:
+        categories = {
+            str(doc["_id"]): doc.get("category") or "General"
+            for doc in articles_collection.find({"_id": {"$in": [ObjectId(a) for a in deltas]}}, {"category": 1})
+        }
+
+        article_ops = []
+        category_totals = {}
+        for article_id, inc in deltas.items():
+            category = categories.get(article_id)
+            if category is None:
+                continue
+            identity = {"article_id": article_id, "category": category, "day": day}
+            article_ops += _bucket_ops(f"{article_id}:{day_key}", identity, ts.hour, inc)
+            for name in (category, ALL_CATEGORIES):
+                totals = category_totals.setdefault(name, {})
+                for m, n in inc.items():
+                    totals[m] = totals.get(m, 0) + n
+
+        category_ops = []
+        for category, inc in category_totals.items():
+            category_ops += _bucket_ops(f"{category}:{day_key}", {"category": category, "day": day}, ts.hour, inc)
+
+        if article_ops:
+            _write_buckets(article_stats_collection, article_ops)
+        if category_ops:
+            _write_buckets(category_stats_collection, category_ops)
+    except Exception as e:
+        print(f"[TimeSeries] Failed to record hourly counts: {e}")
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def _series(docs: list, start: datetime, days: int, resolution: str, metrics: list) -> list:
+    by_day = {doc["day"]: doc for doc in docs}
+    step = RESOLUTIONS[resolution]
+    points = []
+    for d in range(days):
+        day = start + timedelta(days=d)
+        doc = by_day.get(day, {})
+        for hour in range(0, 24, step):
+            point = {"ts": day + timedelta(hours=hour)}
+            for m in metrics:
+                slots = doc.get(m) or [0] * 24
+                point[m] = sum(slots[hour:hour + step])
+            points.append(point)
+    return points
+
+
+def _window(days: int) -> tuple:
+    days = max(1, min(days, MAX_SERIES_DAYS))
+    start = _day_start(datetime.utcnow()) - timedelta(days=days - 1)
+    return start, days
+
+
+async def get_article_series(article_id: str, days: int = 7, resolution: str = "hour", metrics: list | None = None) -> dict:
+    """Per-article series over the last `days` days, downsampled to `resolution`."""
+    metrics = metrics or list(METRICS)
+    start, days = _window(days)
+    docs = await async_article_stats_collection.find(
+        {"article_id": article_id, "day": {"$gte": start}},
+        {"day": 1, **{m: 1 for m in metrics}}
+    ).to_list(length=days)
+    return {"article_id": article_id, "resolution": resolution, "points": _series(docs, start, days, resolution, metrics)}
+
+
+async def get_category_series(category: str | None, days: int = 7, resolution: str = "hour", metrics: list | None = None) -> dict:
+    """Per-category (or site-wide when `category` is None) series."""
+    metrics = metrics or list(METRICS)
+    category = category or ALL_CATEGORIES
+    start, days = _window(days)
+    docs = await async_category_stats_collection.find(
+        {"category": category, "day": {"$gte": start}},
+        {"day": 1, **{m: 1 for m in metrics}}
+    ).to_list(length=days)
+    return {"category": category, "resolution": resolution, "points": _series(docs, start, days, resolution, metrics)}
@@ -0,0 +1,242 @@
+# app/services/trending_service.py
+
+"""
+Real-time trending leaderboard in Redis.
+
+Every view (batched by the view buffer) and vote adds points to an hourly and a daily sorted set
+(trending:h:<YYYYMMDDHH>, trending:d:<YYYYMMDD>). A window is served by
+merging its buckets with ZUNIONSTORE and per-bucket weights, with older
+buckets counting less. The merged set is kept for MERGE_TTL seconds, so
+most reads are a single ZREVRANGE. Card snapshots live in
+trending:card:<id>; the view and vote flushers (and comment writes) copy
+the new counters into existing cards, so serving the leaderboard never
+touches Mongo. Request-path reads and writes go through the async Redis
+adapter.
+"""
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.config.mongo import articles_collection, async_articles_collection
+from app.utils.redis_client import get_redis_client
+from app.utils.async_redis_client import get_async_redis_client
+from app.utils import fast_json
+
+# Redis clients (may be Upstash REST-based): sync for ingest, async for requests
+r = get_redis_client()
+ar = get_async_redis_client()
+
+HOUR_PREFIX = "trending:h:"
+DAY_PREFIX = "trending:d:"
+MERGED_PREFIX = "trending:w:"
+CARD_PREFIX = "trending:card:"
+HOUR_TTL = 26 * 3600
+DAY_TTL = 8 * 86400
+CARD_TTL = 8 * 86400
+MERGE_TTL = 60
+
+# Points per event
+VIEW_POINTS = 1
+UPVOTE_POINTS = 5
+DOWNVOTE_POINTS = -2
+
+# Oldest bucket of a window counts this much relative to the newest
+OLDEST_BUCKET_WEIGHT = 0.5
+# window -> (bucket granularity, number of full buckets)
+WINDOWS = {
+    "1h": ("hour", 1),
+    "24h": ("hour", 24),
+    "7d": ("day", 7),
+}
+
+CARD_FIELDS = {
+    "title": 1, "url": 1, "summary": 1, "image_url": 1, "category": 1, "tags": 1,
+    "sentiment": 1, "source_url": 1, "created_at": 1,
+    "upvotes": 1, "downvotes": 1, "views": 1, "comments_count": 1
+}
+# Card fields that keep changing after the snapshot; refreshed by the flushers
+COUNTER_FIELDS = {"upvotes": 1, "downvotes": 1, "views": 1, "comments_count": 1}
+
+# KEYS: hour bucket, day bucket. ARGV: article id, points, hour ttl, day ttl.
+RECORD_SCRIPT = """
+redis.call('ZINCRBY', KEYS[1], ARGV[2], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('ZINCRBY', KEYS[2], ARGV[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+# KEYS: merged key, buckets... ARGV: ttl, limit, weights...
+MERGE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    local args = {'ZUNIONSTORE', KEYS[1], #KEYS - 1}
+    for i = 2, #KEYS do table.insert(args, KEYS[i]) end
+    table.insert(args, 'WEIGHTS')
+    for i = 3, #ARGV do table.insert(args, ARGV[i]) end
+    redis.call(unpack(args))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return redis.call('ZREVRANGE', KEYS[1], 0, tonumber(ARGV[2]) - 1, 'WITHSCORES')
+"""
+
+
+def _hour_key(ts: datetime) -> str:
+    return f"{HOUR_PREFIX}{ts:%Y%m%d%H}"
+
+
+def _day_key(ts: datetime) -> str:
+    return f"{DAY_PREFIX}{ts:%Y%m%d}"
+
+
+def bucket_keys(ts: datetime) -> tuple:
+    """(hour bucket, day bucket) that events at `ts` are added to."""
+    return _hour_key(ts), _day_key(ts)
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+async def record_event(article_id: str, points: float):
+    if not points:
+        return
+    hour_key, day_key = bucket_keys(datetime.utcnow())
+    await ar.eval(RECORD_SCRIPT, 2, hour_key, day_key, str(article_id), points, HOUR_TTL, DAY_TTL)
+
+
+async def record_vote_change(article_id: str, upvotes: int, downvotes: int):
+    """Points for a vote change (deltas may be negative when a vote is removed)."""
+    await record_event(article_id, UPVOTE_POINTS * upvotes + DOWNVOTE_POINTS * downvotes)
+
+
+def _card(article: dict) -> tuple:
+    card = {k: article.get(k) for k in CARD_FIELDS}
+    card["_id"] = str(article["_id"])
+    return f"{CARD_PREFIX}{card['_id']}", fast_json.dumps(card).decode("utf-8")
+
+
+def store_card(article: dict):
+    """Snapshot of the fields trending responses show, written at insert."""
+    key, data = _card(article)
+    r.set(key, data, ex=CARD_TTL)
+
+
+def _with_counters(data, counters: dict) -> str:
+    card = fast_json.loads(data)
+    card.update({k: counters[k] for k in COUNTER_FIELDS if k in counters})
+    return fast_json.dumps(card).decode("utf-8")
+
+
+def refresh_card_counters(ids: list) -> int:
+    """
+    Copy the current Mongo counters of `ids` into their cards. Called by
+    the view and vote flushers after each bulk_write; ids without a card
+    are skipped (get_trending builds it, counters included, on first use).
+    """
+    ids = [i for i in ids if ObjectId.is_valid(i)]
+    if not ids:
+        return 0
+    raw = r.mget([f"{CARD_PREFIX}{i}" for i in ids])
+    if not isinstance(raw, list) or len(raw) != len(ids):
+        return 0
+    cards = {i: data for i, data in zip(ids, raw) if data}
+    if not cards:
+        return 0
+
+    pipe = r.pipeline()
+    docs = articles_collection.find({"_id": {"$in": [ObjectId(i) for i in cards]}}, COUNTER_FIELDS)
+    for doc in docs:
+        article_id = str(doc.pop("_id"))
+        pipe.set(f"{CARD_PREFIX}{article_id}", _with_counters(cards[article_id], doc), ex=CARD_TTL)
+    if pipe.execute() is None:
+        print(f"[Trending] Failed to refresh counters on {len(cards)} cards")
+        return 0
+    return len(cards)
+
+
+async def refresh_card_counters_async(article_id: str, counters: dict):
+    """refresh_card_counters for one article whose counters the caller already has."""
+    key = f"{CARD_PREFIX}{article_id}"
+    data = await ar.get(key)
+    if data:
+        await ar.set(key, _with_counters(data, counters), ex=CARD_TTL)
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def window_buckets(window: str, now: datetime) -> list:
+    """
+    (key, weight) pairs for a window: the current partial bucket, the full
+    buckets before it, and the part of the oldest bucket that still falls
+    inside the window, so the window slides instead of jumping each hour.
+    """
+    unit, count = WINDOWS[window]
+    step = timedelta(hours=1) if unit == "hour" else timedelta(days=1)
+    key_of = _hour_key if unit == "hour" else _day_key
+    if unit == "hour":
+        elapsed = now.minute / 60 + now.second / 3600
+    else:
+        elapsed = now.hour / 24 + now.minute / 1440
+
+    buckets = []
+    for i in range(count + 1):
+        age = i / count if count else 0
+        weight = 1 - (1 - OLDEST_BUCKET_WEIGHT) * min(1.0, age)
+        if i == count:
+            # Oldest bucket only partially overlaps the window
+            weight *= 1 - elapsed
+        if weight > 0:
+            buckets.append((key_of(now - step * i), round(weight, 4)))
+    return buckets
+
+
+def _pairs(res) -> list:
+    res = res or []
+    if res and isinstance(res[0], (list, tuple)):
+        return [(m, float(s)) for m, s in res]
+    return [(res[i], float(res[i + 1])) for i in range(0, len(res) - 1, 2)]
+
+
+async def _load_cards(ids: list) -> dict:
+    raw = await ar.mget([f"{CARD_PREFIX}{i}" for i in ids])
+    raw = raw if isinstance(raw, list) and len(raw) == len(ids) else [None] * len(ids)
+    cards = {}
+    missing = []
+    for article_id, data in zip(ids, raw):
+        if data:
+            cards[article_id] = fast_json.loads(data)
+        else:
+            missing.append(article_id)
+
+    # Articles stored before cards existed: load once, then cache
+    oids = [ObjectId(i) for i in missing if ObjectId.is_valid(i)]
+    if oids:
+        pipe = ar.pipeline()
+        for doc in await async_articles_collection.find({"_id": {"$in": oids}}, CARD_FIELDS).to_list(length=len(oids)):
+            key, data = _card(doc)
+            pipe.set(key, data, ex=CARD_TTL)
+            cards[str(doc["_id"])] = fast_json.loads(data)
+        await pipe.execute()
+    return cards
+
+
+async def get_trending(window: str = "24h", limit: int = 10):
+    """
+    Top articles for the window, or None if Redis is unavailable.
+    Each item is the article card plus its trending `score`.
+    """
+    now = datetime.utcnow()
+    buckets = window_buckets(window, now)
+    # One merged set per window and minute; later readers reuse it
+    merged_key = f"{MERGED_PREFIX}{window}:{now:%Y%m%d%H%M}"
+    keys = [merged_key] + [k for k, _ in buckets]
+    res = await ar.eval(MERGE_SCRIPT, len(keys), *keys, MERGE_TTL, limit, *[w for _, w in buckets])
+    if res is None:
+        return None
+
+    ranked = [(m, s) for m, s in _pairs(res) if s > 0]
+    ids = [m for m, _ in ranked]
+    cards = await _load_cards(ids)
+    return [
+        {**cards[article_id], "score": round(score, 2)}
+        for article_id, score in ranked
+        if article_id in cards
+    ]
@@ -0,0 +1,103 @@
+# app/services/unique_readers_service.py
+
+"""
+Unique readers per article as Redis HyperLogLogs, one per UTC day
+(article_readers:<id>:<YYYYMMDD>, kept UNIQUE_DAY_TTL) plus an all-time one
+(article_readers:<id>:all). The view buffer adds readers in batches, the
+view flusher copies the all-time estimate into Mongo, and the analytics
+routes read the per-day report.
+"""
+import hashlib
+from datetime import datetime, timedelta
+from app.utils.redis_client import get_redis_client
+from app.utils.async_redis_client import get_async_redis_client
+
+# Redis clients (may be Upstash REST-based): sync for the flushers, async for requests
+r = get_redis_client()
+ar = get_async_redis_client()
+
+UNIQUE_KEY_PREFIX = "article_readers:"
+UNIQUE_DAY_TTL = 8 * 86400
+UNIQUE_MAX_DAYS = 7
+
+# KEYS: (day HLL, all-time HLL) per article. ARGV: day ttl, then per
+# article the number of readers followed by the readers themselves.
+ADD_READERS_SCRIPT = """
+local pos = 2
+for i = 1, #KEYS, 2 do
+    local n = tonumber(ARGV[pos])
+    local readers = {}
+    for j = 1, n do readers[j] = ARGV[pos + j] end
+    redis.call('PFADD', KEYS[i], unpack(readers))
+    redis.call('EXPIRE', KEYS[i], ARGV[1])
+    redis.call('PFADD', KEYS[i + 1], unpack(readers))
+    pos = pos + n + 1
+end
+return #KEYS / 2
+"""
+
+# KEYS: HLLs. Returns PFCOUNT of each.
+COUNT_READERS_SCRIPT = """
+local out = {}
+for i, key in ipairs(KEYS) do out[i] = redis.call('PFCOUNT', key) end
+return out
+"""
+
+
+def _unique_key(article_id: str, day: str = "all") -> str:
+    return f"{UNIQUE_KEY_PREFIX}{article_id}:{day}"
+
+
+def anonymous_reader_id(client_ip: str | None, user_agent: str | None) -> str:
+    """
+    Stable pseudonymous id for a logged-out reader. Only a hash of the
+    client address and user agent is ever stored.
+    """
+    raw = f"{client_ip or ''}|{user_agent or ''}"
+    return "anon:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def add_unique_readers(readers: dict) -> bool:
+    """PFADD {article_id: {reader ids}} into today's and the all-time HLLs."""
+    readers = {a: ids for a, ids in readers.items() if ids}
+    if not readers:
+        return True
+    day = datetime.utcnow().strftime("%Y%m%d")
+    keys, args = [], [UNIQUE_DAY_TTL]
+    for article_id, ids in readers.items():
+        keys += [_unique_key(article_id, day), _unique_key(article_id)]
+        args += [len(ids), *ids]
+    return r.eval(ADD_READERS_SCRIPT, len(keys), *keys, *args) is not None
+
+
+def count_unique_readers(article_ids: list) -> dict:
+    """All-time unique readers per article (HLL estimate, ~0.81% error)."""
+    if not article_ids:
+        return {}
+    res = r.eval(COUNT_READERS_SCRIPT, len(article_ids), *[_unique_key(a) for a in article_ids])
+    if not isinstance(res, list) or len(res) != len(article_ids):
+        return {}
+    return {a: int(c) for a, c in zip(article_ids, res)}
+
+
+async def unique_readers_report(article_id: str, days: int = UNIQUE_MAX_DAYS) -> dict:
+    """All-time, last-`days` (merged) and per-day unique readers for one article."""
+    days = max(1, min(days, UNIQUE_MAX_DAYS))
+    today = datetime.utcnow()
+    day_names = [(today - timedelta(days=i)).strftime("%Y%m%d") for i in range(days)]
+    day_keys = [_unique_key(article_id, d) for d in day_names]
+
+    # One round trip; PFCOUNT over several keys counts the union without merging them
+    pipe = ar.pipeline()
+    pipe.eval(COUNT_READERS_SCRIPT, len(day_keys), *day_keys)
+    pipe.pfcount(*day_keys)
+    pipe.pfcount(_unique_key(article_id))
+    per_day, window, total = await pipe.execute() or (None, None, None)
+    per_day = per_day if isinstance(per_day, list) else [0] * days
+    return {
+        "article_id": article_id,
+        "unique_readers": int(total or 0),
+        "unique_readers_window": int(window or 0),
+        "days": days,
+        "daily": [{"date": d, "unique_readers": int(c)} for d, c in zip(day_names, per_day)],
+    }
@@ -0,0 +1,142 @@
+# app/services/view_buffer.py
+
+"""
+In-process view coalescer.
+
+Article reads call `view_buffer.record(...)`, which only touches a dict under
+a lock. A background thread drains the buffer every FLUSH_INTERVAL seconds
+and writes the summed counts to Redis in one round trip
+(views_service.increment_article_views). Per-user reads go to the reading
+event log (reading_service) in one batch from the same thread; a batch that
+fails is retried on later ticks under the same batch id. Reads therefore
+carry no Redis latency, and Redis sees one command per flush instead of
+two per view.
+Unique readers that fail to reach Redis are merged into the next tick.
+`stop()` drains whatever is left (unless the thread is still stuck in a
+flush), and the app lifespan calls it on shutdown.
+"""
+import threading
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime
+from app.services.views_service import increment_article_views, track_reads
+from app.services.unique_readers_service import add_unique_readers
+
+FLUSH_INTERVAL = 0.25
+# Stop re-queueing counts after Redis has been down this long (in flushes)
+# so the buffer can't grow without bound
+MAX_FAILED_FLUSHES = 240
+
+
+class ViewBuffer:
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        self._counts = Counter()
+        self._readers = defaultdict(set)
+        self._reads = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._failed_flushes = 0
+        self._failed_reader_flushes = 0
+        # (batch id, ts, reads) not yet recorded, oldest first; flusher thread only
+        self._read_batches = []
+
+    def record(self, article_id: str, user_id: str | None = None, reading_time_seconds: int | None = None,
+               reader_id: str | None = None):
+        """Count one view; `reader_id` (user id or anonymous fingerprint) feeds unique readers."""
+        with self._lock:
+            self._counts[str(article_id)] += 1
+            if user_id or reader_id:
+                self._readers[str(article_id)].add(str(user_id or reader_id))
+            if user_id:
+                self._reads.append((user_id, str(article_id), reading_time_seconds))
+
+    def _take(self):
+        with self._lock:
+            counts, readers, reads = self._counts, self._readers, self._reads
+            self._counts, self._readers, self._reads = Counter(), defaultdict(set), []
+        return counts, readers, reads
+
+    def flush(self) -> int:
+        """Write buffered counts to Redis; returns the number of views written."""
+        counts, readers, reads = self._take()
+        written = 0
+        if counts:
+            if increment_article_views(counts):
+                self._failed_flushes = 0
+                written = sum(counts.values())
+            else:
+                self._failed_flushes += 1
+                if self._failed_flushes <= MAX_FAILED_FLUSHES:
+                    # Redis unreachable: keep the counts for the next tick
+                    with self._lock:
+                        self._counts.update(counts)
+                        for article_id, ids in readers.items():
+                            self._readers[article_id].update(ids)
+                else:
+                    print(f"[ViewBuffer] Redis unavailable; dropped {sum(counts.values())} views")
+                readers = {}
+        if readers:
+            self._flush_readers(readers)
+        # Per-user reads go after the counts so slow user tracking never delays them
+        if reads:
+            self._read_batches.append((uuid.uuid4().hex, datetime.utcnow(), reads))
+        self._flush_reads()
+        return written
+
+    def _flush_readers(self, readers: dict):
+        # PFADD is idempotent, so a failed batch is simply merged into the next one
+        if add_unique_readers(readers):
+            self._failed_reader_flushes = 0
+            return
+        self._failed_reader_flushes += 1
+        if self._failed_reader_flushes <= MAX_FAILED_FLUSHES:
+            with self._lock:
+                for article_id, ids in readers.items():
+                    self._readers[article_id].update(ids)
+        else:
+            print(f"[ViewBuffer] Redis unavailable; dropped unique readers for {len(readers)} articles")
+
+    def _flush_reads(self):
+        # Oldest first; stop at the first failure and retry from there next tick
+        while self._read_batches:
+            batch_id, ts, reads = self._read_batches[0]
+            if not track_reads(reads, batch_id, ts):
+                break
+            self._read_batches.pop(0)
+        # Same bound as the counts: one batch per tick while the stores are down
+        while len(self._read_batches) > MAX_FAILED_FLUSHES:
+            _, _, dropped = self._read_batches.pop(0)
+            print(f"[ViewBuffer] Reading log unavailable; dropped {len(dropped)} user reads")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[ViewBuffer] Flush failed: {e}")
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="view-buffer", daemon=True)
+        self._thread.start()
+        print(f"[ViewBuffer] Started: flushing views every {self.interval * 1000:.0f} ms")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the flusher thread and drain the buffer."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                # Still inside a flush; a second one would race it on the read batches
+                print(f"[ViewBuffer] Flusher still busy after {timeout}s; skipping the final flush")
+                return 0
+        written = self.flush()
+        print(f"[ViewBuffer] Stopped: flushed {written} remaining views")
+        return written
+
+
+view_buffer = ViewBuffer()
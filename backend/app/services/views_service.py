@@ -6,90 +6,185 @@ load_dotenv()
 from app.utils.redis_client import get_redis_client
 from app.config.mongo import articles_collection
 from app.services.analytics_service import analytics_service
+from app.utils.response_cache import invalidate_article_counters
+from app.services.ranking_service import counter_update
+from app.services.trending_service import bucket_keys, refresh_card_counters, HOUR_TTL, DAY_TTL, VIEW_POINTS
+from app.services.timeseries_service import record_counts
+from app.services.reading_service import record_reads
+from app.services.unique_readers_service import count_unique_readers
+import time
 from datetime import datetime
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Redis client (may be Upstash REST-based)
 r = get_redis_client()
 
 VIEW_KEY_PREFIX = "article_views:"       # global article views
 
+VIEW_TTL = 3600 * 24
+
+# Apply a batch of view counts in one round trip: the per-article counters
+# flushed to Mongo plus the live trending buckets.
+# KEYS: hour bucket, day bucket, counters... ARGV: counter ttl, hour ttl,
+# day ttl, points per view, then (article id, count) per counter.
+INCREMENT_VIEWS_SCRIPT = """
+local n = #KEYS - 2
+for i = 1, n do
+    local id = ARGV[4 + i * 2 - 1]
+    local count = tonumber(ARGV[4 + i * 2])
+    redis.call('INCRBY', KEYS[2 + i], count)
+    redis.call('EXPIRE', KEYS[2 + i], ARGV[1])
+    redis.call('ZINCRBY', KEYS[1], count * tonumber(ARGV[4]), id)
+    redis.call('ZINCRBY', KEYS[2], count * tonumber(ARGV[4]), id)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return n
+"""
+
 # -----------------------------
 # Increment view counts
 # -----------------------------
-def increment_article_view(article_id: str, user_id: str | None = None, reading_time_seconds: int | None = None):
+def increment_article_views(counts: dict) -> bool:
     """
-    Increment global article view count in Redis.
-    If user_id provided, delegate to analytics_service.track_article_read
-    and pass optional reading_time_seconds.
+    Add {article_id: views} to the Redis counters and trending buckets.
+    Called by the in-process view buffer (see view_buffer), not per request.
+    Returns False if Redis could not be reached.
     """
-    print("Incrementing view for article:", article_id, "by user:", user_id, "reading_time:", reading_time_seconds)
-    article_key = f"{VIEW_KEY_PREFIX}{article_id}"
-    try:
-        r.incr(article_key)
-        r.expire(article_key, 3600 * 24)
-    except Exception as e:
-        print(f"[Views] Redis INCR failed for {article_id}: {e}")
+    if not counts:
+        return True
+    hour_key, day_key = bucket_keys(datetime.utcnow())
+    keys = [hour_key, day_key] + [f"{VIEW_KEY_PREFIX}{a}" for a in counts]
+    args = []
+    for article_id, count in counts.items():
+        args += [str(article_id), int(count)]
+    res = r.eval(INCREMENT_VIEWS_SCRIPT, len(keys), *keys, VIEW_TTL, HOUR_TTL, DAY_TTL, VIEW_POINTS, *args)
+    return res is not None
 
-    # Delegate user read tracking to analytics_service
-    if user_id:
-        try:
-            analytics_service.track_article_read(user_id, article_id, reading_time_seconds=reading_time_seconds)
-        except Exception as e:
-            print(f"[Views] analytics_service.track_article_read failed: {e}")
+
+def track_reads(reads: list, batch_id: str, ts: datetime | None = None) -> bool:
+    """
+    Log per-user reads (user_id, article_id, reading_time_seconds) in the
+    reading event store, then queue them for the periodic gamification sync.
+    Returns False if either step failed; retrying with the same batch_id
+    and ts is safe.
+    """
+    if not record_reads(reads, batch_id, ts):
+        return False
+    return analytics_service.queue_user_reads(reads)
 
 
 # -----------------------------
 # Flush Redis views to MongoDB
 # -----------------------------
+FLUSH_SCAN_COUNT = 1000
+
+# Read and delete a batch of counters in one atomic round trip, so an INCR
+# landing mid-flush goes to a fresh key instead of being lost.
+# KEYS: view counters. Returns their values (nil for keys already gone).
+TAKE_COUNTS_SCRIPT = """
+local out = {}
+for i, key in ipairs(KEYS) do
+    out[i] = redis.call('GET', key)
+    if out[i] then redis.call('DEL', key) end
+end
+return out
+"""
+
+# Put counts back after a failed write. KEYS: counters. ARGV: counts, ttl.
+RESTORE_COUNTS_SCRIPT = """
+local ttl = ARGV[#ARGV]
+for i, key in ipairs(KEYS) do
+    redis.call('INCRBY', key, ARGV[i])
+    redis.call('EXPIRE', key, ttl)
+end
+return #KEYS
+"""
+
+
+def _restore_counts(counts: dict):
+    keys = [f"{VIEW_KEY_PREFIX}{a}" for a in counts]
+    if keys:
+        r.eval(RESTORE_COUNTS_SCRIPT, len(keys), *keys, *counts.values(), VIEW_TTL)
+
+
+def _flush_batch(keys: list) -> int:
+    """GET+DEL a batch of counters and apply them with one bulk_write."""
+    values = r.eval(TAKE_COUNTS_SCRIPT, len(keys), *keys)
+    if values is None:
+        print(f"[Views] Failed to read {len(keys)} view counters; will retry")
+        return 0
+
+    counts = {}
+    for key, raw in zip(keys, values):
+        try:
+            count = int(raw) if raw is not None else 0
+        except (TypeError, ValueError):
+            count = 0
+        if count > 0:
+            counts[key[len(VIEW_KEY_PREFIX):]] = count
+
+    # Refresh the stored unique-reader estimate alongside the view count
+    uniques = count_unique_readers(list(counts))
+
+    ops, op_ids = [], []
+    for article_id, count in counts.items():
+        if not ObjectId.is_valid(article_id):
+            continue
+        update = counter_update({"views": count, "counters_version": 1})
+        if article_id in uniques:
+            update.append({"$set": {"unique_readers": uniques[article_id]}})
+        ops.append(UpdateOne({"_id": ObjectId(article_id)}, update))
+        op_ids.append(article_id)
+    if not ops:
+        return 0
+
+    try:
+        articles_collection.bulk_write(ops, ordered=False)
+        failed = set()
+    except BulkWriteError as e:
+        # Only the failed updates go back to Redis; the rest were applied
+        failed = {op_ids[err["index"]] for err in e.details.get("writeErrors", [])}
+        print(f"[Views] {len(failed)} of {len(ops)} view updates failed; restoring them")
+        _restore_counts({a: counts[a] for a in failed})
+    except Exception as e:
+        print(f"[Views] Failed to flush {len(ops)} view counters: {e}")
+        _restore_counts({a: counts[a] for a in op_ids})
+        return 0
+
+    applied = [a for a in op_ids if a not in failed]
+    # Hourly series for charts, and the counters shown on trending cards
+    record_counts({a: {"views": counts[a]} for a in applied})
+    refresh_card_counters(applied)
+    return len(applied)
+
+
 def flush_views_to_db():
     """
     Flush global article views to MongoDB.
+    Walks the counters with SCAN (never KEYS), takes each batch atomically
+    and writes it with a single bulk_write; counts are restored on failure.
     """
-    print("Flushing article views from Redis to MongoDB...")
-    keys = r.keys(f"{VIEW_KEY_PREFIX}*") or []
-    # Ensure we only process keys that actually start with the article prefix
-    for key in list(keys):
-        try:
-            # Some clients may return bytes; normalize to str
-            if isinstance(key, bytes):
-                key = key.decode('utf-8')
-            if not key.startswith(VIEW_KEY_PREFIX):
-                continue
-
-            article_id = key[len(VIEW_KEY_PREFIX):]
-
-            # Safely get count (may return None or string)
-            raw = r.get(key)
-            try:
-                count = int(raw) if raw is not None else 0
-            except Exception:
-                count = 0
-
-            if count <= 0:
-                # nothing to flush; remove stale key to avoid future noise
-                try:
-                    r.delete(key)
-                except Exception:
-                    pass
-                continue
-
-            # Persist to MongoDB; only delete Redis key if DB update succeeds
-            try:
-                articles_collection.update_one(
-                    {"_id": ObjectId(article_id)},
-                    {"$inc": {"views": count}}
-                )
-            except Exception as e:
-                print(f"Failed to flush views for {article_id}: {e}")
-                # don't delete the Redis key so the scheduler can retry later
-                continue
-
-            # Delete the Redis key only after successful DB update
-            try:
-                r.delete(key)
-            except Exception as e:
-                print(f"Failed to delete Redis key {key} after flushing: {e}")
-                # Not critical; DB already updated
-        except Exception as e:
-            print(f"Unexpected error while flushing key {key}: {e}")
+    started = time.monotonic()
+    flushed = 0
+    cursor = 0
+    while True:
+        res = r.scan(cursor, match=f"{VIEW_KEY_PREFIX}*", count=FLUSH_SCAN_COUNT)
+        if not res:
+            print("[Views] SCAN failed; will retry on the next run")
+            break
+        cursor, keys = res
+        keys = [k.decode("utf-8") if isinstance(k, bytes) else k for k in keys or []]
+        keys = [k for k in keys if k.startswith(VIEW_KEY_PREFIX)]
+        if keys:
+            flushed += _flush_batch(keys)
+        if int(cursor) == 0:
+            break
+
+    # Counters changed: cached list pages now show stale numbers
+    if flushed:
+        invalidate_article_counters()
+        print(f"[Views] Flushed views for {flushed} articles in {time.monotonic() - started:.2f}s")
+    return flushed
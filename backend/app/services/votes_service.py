@@ -0,0 +1,186 @@
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from app.utils.redis_client import get_redis_client
+from app.utils.async_redis_client import get_async_redis_client
+from app.config.mongo import articles_collection, comments_collection
+from app.services.ranking_service import counter_update
+from app.utils.response_cache import invalidate_article_counters
+from app.services.trending_service import record_vote_change, refresh_card_counters
+from app.services.timeseries_service import record_counts
+
+# Redis clients (may be Upstash REST-based): sync for the flusher, async for requests
+r = get_redis_client()
+ar = get_async_redis_client()
+
+# Per item type: who voted what (hash user -> 1 / -1), pending count deltas
+# (hash upvotes/downvotes -> n) and the set of items with pending deltas.
+VOTE_KINDS = {
+    "article": {"state": "article_votes:", "delta": "article_vote_deltas:", "dirty": "article_votes_dirty"},
+    "comment": {"state": "comment_votes:", "delta": "comment_vote_deltas:", "dirty": "comment_votes_dirty"},
+}
+FLUSH_BATCH_SIZE = 500
+
+# Toggle semantics: voting the same way twice removes the vote, voting the
+# other way switches it. Runs atomically so concurrent clicks can't double count.
+# KEYS: state hash, delta hash, dirty set. ARGV: user, requested vote (1/-1), item id.
+# Returns {new vote, upvotes delta, downvotes delta}.
+RECORD_VOTE_SCRIPT = """
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+local requested = tonumber(ARGV[2])
+local new = requested
+if current == requested then new = 0 end
+local up = 0
+local down = 0
+if current == 1 then up = up - 1 elseif current == -1 then down = down - 1 end
+if new == 1 then up = up + 1 elseif new == -1 then down = down + 1 end
+if new == 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+else
+    redis.call('HSET', KEYS[1], ARGV[1], new)
+end
+if up ~= 0 then redis.call('HINCRBY', KEYS[2], 'upvotes', up) end
+if down ~= 0 then redis.call('HINCRBY', KEYS[2], 'downvotes', down) end
+if up ~= 0 or down ~= 0 then redis.call('SADD', KEYS[3], ARGV[3]) end
+return {new, up, down}
+"""
+
+# Read and clear several delta hashes in one atomic step.
+# KEYS: delta hashes. Returns one flat [field, value, ...] list per key.
+TAKE_DELTAS_SCRIPT = """
+local out = {}
+for i, key in ipairs(KEYS) do
+    out[i] = redis.call('HGETALL', key)
+    redis.call('DEL', key)
+end
+return out
+"""
+
+
+# Undo a take after a failed write.
+# KEYS: dirty set, delta hashes... ARGV: (item id, upvotes, downvotes) per hash.
+RESTORE_DELTAS_SCRIPT = """
+for i = 2, #KEYS do
+    local base = (i - 2) * 3
+    local up = tonumber(ARGV[base + 2])
+    local down = tonumber(ARGV[base + 3])
+    if up ~= 0 then redis.call('HINCRBY', KEYS[i], 'upvotes', up) end
+    if down ~= 0 then redis.call('HINCRBY', KEYS[i], 'downvotes', down) end
+    redis.call('SADD', KEYS[1], ARGV[base + 1])
+end
+return #KEYS - 1
+"""
+
+
+# -----------------------------
+# Record a vote
+# -----------------------------
+async def record_vote(kind: str, item_id: str, user_key: str, vote: int):
+    """
+    Apply a user's up (1) or down (-1) vote with toggle semantics.
+    Returns the user's resulting vote (1, -1 or 0), or None if Redis is unavailable.
+    """
+    keys = VOTE_KINDS[kind]
+    res = await ar.eval(
+        RECORD_VOTE_SCRIPT, 3,
+        f"{keys['state']}{item_id}", f"{keys['delta']}{item_id}", keys["dirty"],
+        user_key, vote, item_id
+    )
+    if not res:
+        return None
+    new, up, down = (int(v) for v in res)
+    if kind == "article":
+        await record_vote_change(item_id, up, down)
+    return new
+
+
+# -----------------------------
+# Flush vote deltas to MongoDB
+# -----------------------------
+def _pairs_to_dict(flat) -> dict:
+    if isinstance(flat, dict):
+        return flat
+    flat = flat or []
+    return {flat[i]: flat[i + 1] for i in range(0, len(flat) - 1, 2)}
+
+
+def _restore(keys: dict, pending: dict):
+    # Put deltas back so the next flush retries them (one round trip)
+    if not pending:
+        return
+    args = []
+    for item_id, delta in pending.items():
+        args += [item_id, delta.get("upvotes", 0), delta.get("downvotes", 0)]
+    delta_keys = [f"{keys['delta']}{i}" for i in pending]
+    res = r.eval(RESTORE_DELTAS_SCRIPT, len(delta_keys) + 1, keys["dirty"], *delta_keys, *args)
+    if res is None:
+        print(f"[Votes] ❌ Failed to restore vote deltas for {len(pending)} items: {pending}")
+
+
+def flush_votes_to_db():
+    """
+    Apply pending vote deltas to MongoDB with one bulk_write per batch.
+    Deltas are taken atomically from Redis and put back if the write fails.
+    """
+    flushed = 0
+    for kind, keys in VOTE_KINDS.items():
+        collection = articles_collection if kind == "article" else comments_collection
+        while True:
+            ids = r.spop(keys["dirty"], FLUSH_BATCH_SIZE) or []
+            if not ids:
+                break
+            ids = [i.decode("utf-8") if isinstance(i, bytes) else i for i in ids]
+
+            taken = r.eval(TAKE_DELTAS_SCRIPT, len(ids), *[f"{keys['delta']}{i}" for i in ids])
+            if taken is None:
+                print(f"[Votes] Failed to read {kind} vote deltas; will retry")
+                r.sadd(keys["dirty"], *ids)
+                break
+
+            pending = {}
+            for item_id, flat in zip(ids, taken):
+                delta = {k: int(v) for k, v in _pairs_to_dict(flat).items() if int(v) != 0}
+                if delta:
+                    pending[item_id] = delta
+
+            ops = []
+            op_ids = []
+            for item_id, delta in pending.items():
+                try:
+                    oid = ObjectId(item_id)
+                except Exception:
+                    continue
+                op_ids.append(item_id)
+                if kind == "article":
+                    ops.append(UpdateOne({"_id": oid}, counter_update({**delta, "counters_version": 1})))
+                else:
+                    ops.append(UpdateOne({"_id": oid}, {"$inc": delta}))
+
+            if not ops:
+                continue
+            try:
+                collection.bulk_write(ops, ordered=False)
+                failed = set()
+            except BulkWriteError as e:
+                # Only the failed updates go back to Redis; the rest were applied
+                failed = {op_ids[err["index"]] for err in e.details.get("writeErrors", [])}
+                print(f"[Votes] {len(failed)} of {len(ops)} {kind} vote updates failed; restoring them")
+                _restore(keys, {i: pending[i] for i in failed})
+            except Exception as e:
+                print(f"[Votes] Failed to flush {kind} votes: {e}")
+                _restore(keys, {i: pending[i] for i in op_ids})
+                break
+
+            flushed += len(ops) - len(failed)
+            if kind == "article":
+                applied = [i for i in op_ids if i not in failed]
+                # Net deltas; record_counts keeps only the positive ones
+                record_counts({i: pending[i] for i in applied})
+                refresh_card_counters(applied)
+            if failed:
+                break
+
+    if flushed:
+        print(f"[Votes] Flushed vote counts for {flushed} items")
+        invalidate_article_counters()
+    return flushed
@@ -0,0 +1,251 @@
+"""Async counterpart of `redis_client` for coroutine request handlers.
+
+- redis:// or rediss:// URLs use `redis.asyncio` with a shared connection pool
+- Upstash REST uses an `httpx.AsyncClient` with keep-alive connections
+
+Both are wrapped in `AsyncFallbackProxy`, which degrades like
+`FallbackProxy`: a failed call is logged and returns a safe default instead
+of raising. Command methods have the same names and arguments as the sync
+adapter; they are awaited. The proxy creates its client on first use and
+again after `aclose()`, so modules can hold the shared proxy at import time.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import os
+import json
+import asyncio
+import httpx
+import redis.asyncio as redis_async
+from typing import Any
+from app.utils.redis_client import (
+    COMMAND_SHAPES,
+    UpstashError,
+    UpstashCommands,
+    UpstashPipeline,
+    FallbackProxy,
+    _UNSET,
+    _arg,
+    _command_result,
+    _pipeline_results,
+)
+
+# Connections shared by all requests on a worker
+MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+
+
+class AsyncUpstashRESTClient(UpstashCommands):
+    """
+    UpstashRESTClient over `httpx.AsyncClient`. The command methods are
+    shared; `_call` is a coroutine here, so each of them returns an
+    awaitable.
+    """
+    def __init__(self, rest_url: str, token: str, timeout: float = 5, pool_size: int = MAX_CONNECTIONS):
+        self.base = rest_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.headers = {
+            'Authorization': f'Bearer {self.token}',
+            'Content-Type': 'application/json'
+        }
+        self.http = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+        self._shape = None
+        self._shape_lock = asyncio.Lock()
+
+    # -------------------------
+    # Transport
+    # -------------------------
+    async def _post(self, path: str, payload):
+        return await self.http.post(f"{self.base}/{path}", content=json.dumps(payload))
+
+    async def _learn_shape(self, cmd: list):
+        last_error = None
+        for index, shape in enumerate(COMMAND_SHAPES):
+            resp = await self._post("command", shape(cmd))
+            if resp.status_code < 400:
+                self._shape = index
+                print(f"[UpstashREST] Using payload shape #{index}")
+                return resp
+            last_error = f"{resp.status_code}: {resp.text[:200]}"
+        raise UpstashError(f"no payload shape accepted ({last_error})")
+
+    async def _execute(self, cmd: list):
+        if self._shape is None:
+            async with self._shape_lock:
+                if self._shape is None:
+                    return _command_result(await self._learn_shape(cmd), cmd)
+        return _command_result(await self._post("command", COMMAND_SHAPES[self._shape](cmd)), cmd)
+
+    async def _execute_pipeline(self, cmds: list) -> list:
+        return _pipeline_results(await self._post("pipeline", cmds), cmds)
+
+    async def _call(self, args: list, parse=None):
+        res = await self._execute([_arg(a) for a in args])
+        return parse(res) if parse else res
+
+    def pipeline(self, transaction: bool = False):
+        return AsyncUpstashPipeline(self)
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+class AsyncUpstashPipeline(UpstashPipeline):
+    """Queues commands synchronously; `await execute()` sends them in one POST."""
+
+    async def execute(self, raise_on_error: bool = True) -> list:
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        results = await self._client._execute_pipeline([cmd for cmd, _ in queue])
+        return self._parse_results(queue, results, raise_on_error)
+
+
+class AsyncFallbackPipeline:
+    """Like FallbackPipeline: queuing never raises, execute() returns None on failure."""
+    def __init__(self, pipe: Any):
+        self._pipe = pipe
+
+    def __getattr__(self, name: str):
+        def _queue(*args, **kwargs):
+            if self._pipe is not None:
+                getattr(self._pipe, name)(*args, **kwargs)
+            return self
+        return _queue
+
+    async def execute(self):
+        if self._pipe is None:
+            return None
+        try:
+            return await self._pipe.execute()
+        except Exception as e:
+            print(f"[AsyncRedisAdapter] pipeline failed: {e}")
+            return None
+
+
+class AsyncFallbackProxy:
+    """
+    Wraps a redis.asyncio client or AsyncUpstashRESTClient, built by
+    `factory` when first needed; every command is awaited.
+    """
+    DEFAULTS = FallbackProxy.DEFAULTS
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name: str):
+        async def _call(*args, on_error=_UNSET, **kwargs):
+            try:
+                attr = getattr(self._get_client(), name)
+                return await attr(*args, **kwargs)
+            except Exception as e:
+                print(f"[AsyncRedisAdapter] {name} failed: {e}")
+                if on_error is not _UNSET:
+                    return on_error
+                default = self.DEFAULTS.get(name)
+                return default() if default else None
+
+        return _call
+
+    async def mget(self, keys, *args, on_error=_UNSET):
+        """MGET; on failure `on_error` if given, else a list of None with one entry per key."""
+        keys = list(keys) if isinstance(keys, (list, tuple)) else [keys, *args]
+        try:
+            return await self._get_client().mget(keys)
+        except Exception as e:
+            print(f"[AsyncRedisAdapter] mget failed: {e}")
+            return on_error if on_error is not _UNSET else [None] * len(keys)
+
+    def pipeline(self, transaction: bool = False):
+        """Non-transactional pipeline; `await execute()` returns None on failure."""
+        try:
+            return AsyncFallbackPipeline(self._get_client().pipeline(transaction=transaction))
+        except Exception as e:
+            print(f"[AsyncRedisAdapter] pipeline failed: {e}")
+            return AsyncFallbackPipeline(None)
+
+    async def scan_batches(self, match: str | None = None, count: int | None = None):
+        """Yield keys batch by batch (lists) using SCAN; stops on failure."""
+        cursor = 0
+        while True:
+            res = await self.scan(cursor, match=match, count=count)
+            if not res:
+                print(f"[AsyncRedisAdapter] SCAN {match} failed at cursor {cursor}; stopping early")
+                return
+            cursor, keys = res
+            keys = [k.decode("utf-8") if isinstance(k, bytes) else k for k in keys or []]
+            if keys:
+                yield keys
+            if int(cursor) == 0:
+                return
+
+    async def aclose(self):
+        """Close the pooled connections; the next command opens a new client."""
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            close = getattr(client, "aclose", None) or getattr(client, "close")
+            await close()
+        except Exception as e:
+            print(f"[AsyncRedisAdapter] close failed: {e}")
+
+
+def _create_client():
+    # Same preference order as get_redis_client
+    redis_url = os.getenv('UPSTASH_REDIS_URL') or os.getenv('REDIS_URL')
+    if redis_url:
+        try:
+            return redis_async.from_url(redis_url, decode_responses=True, max_connections=MAX_CONNECTIONS)
+        except Exception as e:
+            print(f"[AsyncRedisAdapter] redis client creation failed for URL {redis_url}: {e}")
+
+    rest_url = os.getenv('UPSTASH_REDIS_REST_URL')
+    rest_token = os.getenv('UPSTASH_REDIS_REST_TOKEN')
+    if rest_url and rest_token:
+        return AsyncUpstashRESTClient(rest_url, rest_token)
+
+    try:
+        return redis_async.Redis(
+            host=os.getenv('REDIS_HOST', 'localhost'),
+            port=int(os.getenv('REDIS_PORT', 6379)),
+            db=int(os.getenv('REDIS_DB', 0)),
+            decode_responses=True,
+            max_connections=MAX_CONNECTIONS,
+        )
+    except Exception as e:
+        print(f"[AsyncRedisAdapter] redis client creation failed for localhost: {e}")
+        return None
+
+
+_client = None
+
+
+def get_async_redis_client() -> AsyncFallbackProxy:
+    """Shared async adapter for this process (one connection pool)."""
+    global _client
+    if _client is None:
+        _client = AsyncFallbackProxy(_create_client)
+    return _client
+
+
+async def close_async_redis_client():
+    """
+    Release pooled connections; called from the app lifespan on shutdown.
+    The shared proxy stays in place and reconnects if used again.
+    """
+    if _client is not None:
+        await _client.aclose()
+
+
+__all__ = ['get_async_redis_client', 'close_async_redis_client', 'AsyncFallbackProxy']
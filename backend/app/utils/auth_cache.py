@@ -0,0 +1,98 @@
+# app/utils/auth_cache.py
+
+"""
+Per-process cache for authentication work.
+
+- decoded JWTs, kept until the token's own `exp` (at most TOKEN_TTL)
+- slim user profiles (id, username, role) keyed by username, for PROFILE_TTL
+
+Both are also memoized on `request.state`, so one request never decodes or
+looks up the same user twice. Routes that write to a user's row call
+`invalidate_user` so the next request reloads the profile.
+"""
+import time
+from fastapi import Request
+from app.utils.supabase_auth import supabase, verify_token, USERS_TABLE
+from app.utils.response_cache import LocalLRU
+
+TOKEN_TTL = 300
+PROFILE_TTL = 300
+PROFILE_FIELDS = "id, username, role"
+
+_tokens = LocalLRU(4096)
+_profiles = LocalLRU(4096)
+
+
+# -----------------------------
+# Tokens
+# -----------------------------
+def decode_token(token: str):
+    """verify_token with caching; returns the payload or None."""
+    payload = _tokens.get(token)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    if payload:
+        ttl = TOKEN_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(ttl, int(exp - time.time()))
+        if ttl > 0:
+            _tokens.set(token, payload, ttl)
+    return payload
+
+
+def get_token_payload(request: Request, token: str):
+    """decode_token memoized for the lifetime of the request."""
+    cached = getattr(request.state, "auth_payload", None)
+    if cached is not None and getattr(request.state, "auth_token", None) == token:
+        return cached
+    payload = decode_token(token)
+    request.state.auth_token = token
+    request.state.auth_payload = payload
+    return payload
+
+
+# -----------------------------
+# Profiles
+# -----------------------------
+def _slim(row: dict) -> dict:
+    return {"id": row.get("id"), "username": row.get("username"), "role": row.get("role") or "user"}
+
+
+def remember_profile(row: dict):
+    """Prime the cache from a users row the caller already fetched."""
+    if row and row.get("username"):
+        _profiles.set(row["username"], _slim(row), PROFILE_TTL)
+
+
+def get_user_profile(username: str):
+    """Slim profile for `username`, or None if there is no such user."""
+    if not username:
+        return None
+    profile = _profiles.get(username)
+    if profile is not None:
+        return profile
+
+    res = supabase.table(USERS_TABLE).select(PROFILE_FIELDS).eq("username", username).execute()
+    if not res.data:
+        return None
+    profile = _slim(res.data[0])
+    _profiles.set(username, profile, PROFILE_TTL)
+    return profile
+
+
+def get_request_profile(request: Request, username: str):
+    """get_user_profile memoized for the lifetime of the request (sync; run off the loop)."""
+    cached = getattr(request.state, "auth_profile", None)
+    if cached is not None and cached.get("username") == username:
+        return cached
+    profile = get_user_profile(username)
+    request.state.auth_profile = profile
+    return profile
+
+
+def invalidate_user(username: str | None):
+    if username:
+        _profiles.delete(username)
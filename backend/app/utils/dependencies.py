@@ -1,13 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.utils.supabase_auth import verify_token
-from app.utils.supabase_auth import get_current_user_data
+from app.utils.auth_cache import get_token_payload, get_request_profile
 
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
-    payload = verify_token(token)
+    payload = get_token_payload(request, token)
     if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -15,7 +15,12 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     return payload  # You can return email or full user info if stored in JWT
 
-async def get_current_admin(user=Depends(get_current_user_data)):
+async def get_current_admin(request: Request, payload=Depends(get_current_user)):
+    # Role comes from the cached slim profile (id, username, role), not the
+    # full users row, so admin requests skip the Supabase round trip when warm
+    user = await run_in_threadpool(get_request_profile, request, payload.get("sub"))
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
     if not user.get("role") == "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
-    return user
\ No newline at end of file
+    return user
@@ -0,0 +1,38 @@
+# app/utils/fast_json.py
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+
+# Naive datetimes from Mongo are UTC; orjson writes them as ISO 8601 like
+# Pydantic does. NON_STR_KEYS keeps dicts keyed by ints/dates encodable.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    """Encode Mongo documents (ObjectId, datetime) straight to JSON bytes."""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+class MongoJSONResponse(Response):
+    """
+    JSON response that skips FastAPI's jsonable_encoder / response_model
+    validation. Routes return it directly; their response_model is then only
+    used for the OpenAPI schema.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,39 @@
+# app/utils/http_cache.py
+
+import hashlib
+from fastapi import Request, Response
+
+# Anonymous reads can be shared by a CDN; authenticated ones must revalidate
+PUBLIC_DETAIL_CACHE = "public, max-age=60, stale-while-revalidate=300"
+PUBLIC_LIST_CACHE = "public, max-age=15, stale-while-revalidate=60"
+PRIVATE_CACHE = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the given parts (order matters)."""
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: ignore any W/ prefix
+    candidates = [c.strip() for c in header.split(",")]
+    return any(c[2:] == etag if c.startswith("W/") else c == etag for c in candidates)
+
+
+def cache_headers(etag: str, cache_control: str, vary: str | None = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    return headers
+
+
+def not_modified(headers: dict) -> Response:
+    """Empty 304 response; the body is never serialized."""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,65 @@
+# app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+# Sort modes for the article feed: sort_by -> (sort field, direction).
+# Every mode is paginated on the compound key (sort field, _id) so ties are stable.
+ARTICLE_SORTS = {
+    "new": ("created_at", -1),
+    "old": ("created_at", 1),
+    "top": ("upvotes", -1),
+    "hot": ("hot_score", -1),
+}
+
+
+def encode_cursor(sort_by: str, value, doc_id) -> str:
+    """
+    Build an opaque cursor from the last item's sort value and _id.
+    """
+    if isinstance(value, datetime):
+        payload = {"s": sort_by, "t": "dt", "v": value.isoformat(), "id": str(doc_id)}
+    else:
+        payload = {"s": sort_by, "t": "n", "v": value, "id": str(doc_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str):
+    """
+    Decode a cursor produced by encode_cursor. Returns (value, ObjectId).
+    Raises HTTP 400 for malformed cursors or cursors from another sort mode.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if payload.get("t") == "dt":
+            value = datetime.fromisoformat(value)
+        doc_id = ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if payload.get("s") != sort_by:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort_by")
+    return value, doc_id
+
+
+def keyset_filter(field: str, direction: int, value, doc_id) -> dict:
+    """
+    Mongo filter selecting documents strictly after (value, doc_id) in
+    the (field, _id) ordering given by `direction`.
+    """
+    op = "$lt" if direction < 0 else "$gt"
+    return {"$or": [
+        {field: {op: value}},
+        {field: value, "_id": {op: doc_id}},
+    ]}
+
+
+def keyset_sort(field: str, direction: int) -> list:
+    return [(field, direction), ("_id", direction)]
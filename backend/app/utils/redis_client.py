@@ -10,136 +10,404 @@ load_dotenv()
 
 import os
 import json
+import threading
+from abc import ABC, abstractmethod
 import requests
 import redis as redis_lib
 from typing import Any
 
 
-class UpstashRESTClient:
-    def __init__(self, rest_url: str, token: str):
-        self.base = rest_url.rstrip('/')
-        self.token = token
-        self.headers = {
-            'Authorization': f'Bearer {self.token}',
-            'Content-Type': 'application/json'
-        }
+# Payload shapes Upstash-compatible REST endpoints accept for one command.
+# The client learns which one the server takes on first use and sticks to it.
+COMMAND_SHAPES = (
+    lambda cmd: cmd,                    # JSON array like ["INCR","key"]
+    lambda cmd: {"cmd": cmd},           # {"cmd": [..]}
+    lambda cmd: {"command": cmd},       # {"command": [..]}
+    lambda cmd: {"commands": [cmd]},    # {"commands": [[..]]}
+)
 
-    def _command(self, *args):
-        url = f"{self.base}/command"
-        # Try several payload shapes commonly used with Upstash REST
-        attempts = []
-        attempts.append(list(args))                  # JSON array like ["INCR","key"]
-        attempts.append({"cmd": list(args)})       # {"cmd": [..]}
-        attempts.append({"command": list(args)})   # {"command": [..]}
-        attempts.append({"commands": [list(args)]})
-
-        last_resp = None
-        for payload in attempts:
-            try:
-                resp = requests.post(url, json=payload, headers=self.headers, timeout=5)
-                last_resp = resp
-                if resp.status_code >= 400:
-                    # not successful; try next shape
-                    # log the response body for debugging
-                    text = None
-                    try:
-                        text = resp.text
-                    except Exception:
-                        text = '<no body>'
-                    print(f"[UpstashREST] {resp.status_code} for payload {payload}: {text}")
-                    continue
-
-                # success
-                try:
-                    data = resp.json()
-                except Exception:
-                    return resp.text
-
-                # Upstash returns results in different keys sometimes; prefer 'result'
-                if isinstance(data, dict):
-                    if 'result' in data:
-                        return data['result']
-                    if 'output' in data:
-                        return data['output']
-                    return data
-                return data
-            except requests.exceptions.RequestException as e:
-                print(f"[UpstashREST] request failed for payload {payload}: {e}")
-                last_resp = None
-                continue
-
-        # If we reach here, all attempts failed — log last response details
-        if last_resp is not None:
-            try:
-                print(f"[UpstashREST] final response: {last_resp.status_code} {last_resp.text}")
-            except Exception:
-                print("[UpstashREST] final response unreadable")
-        else:
-            print(f"[UpstashREST] no response received for command {args}")
+
+def _arg(value):
+    # JSON carries str/int/float as-is; anything else (bytes, ObjectId) as text
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value if isinstance(value, (str, int, float)) else str(value)
+
+
+def _unwrap(data):
+    # Upstash returns results in different keys sometimes; prefer 'result'
+    if isinstance(data, dict):
+        if 'error' in data and 'result' not in data:
+            raise UpstashError(data['error'])
+        if 'result' in data:
+            return data['result']
+        if 'output' in data:
+            return data['output']
+    return data
+
+
+def _pairs_to_dict(res):
+    # Upstash returns HGETALL as a flat list: [field1, val1, field2, val2]
+    if isinstance(res, dict):
+        return res
+    if isinstance(res, list):
+        return {str(res[i]): res[i + 1] for i in range(0, len(res) - 1, 2)}
+    return {}
+
+
+def _with_scores(res):
+    # same shape as redis-py: [(member, score), ...]
+    res = res or []
+    return [(res[i], float(res[i + 1])) for i in range(0, len(res) - 1, 2)]
+
+
+def _scan_result(res):
+    # same shape as redis-py: (next cursor, keys)
+    if not isinstance(res, list) or len(res) != 2:
         return None
+    return int(res[0]), res[1] or []
+
+
+class UpstashError(Exception):
+    pass
+
+
+def _command_result(resp, cmd: list):
+    if resp.status_code >= 400:
+        raise UpstashError(f"{cmd[0]} failed with {resp.status_code}: {resp.text[:200]}")
+    try:
+        return _unwrap(resp.json())
+    except ValueError:
+        return resp.text
+
+
+def _pipeline_results(resp, cmds: list) -> list:
+    if resp.status_code >= 400:
+        raise UpstashError(f"pipeline failed with {resp.status_code}: {resp.text[:200]}")
+    data = resp.json()
+    if not isinstance(data, list) or len(data) != len(cmds):
+        raise UpstashError("unexpected pipeline response")
+    out = []
+    for item in data:
+        try:
+            out.append(_unwrap(item))
+        except UpstashError as e:
+            # same as redis-py with raise_on_error=False
+            out.append(e)
+    return out
+
+
+class UpstashCommands(ABC):
+    """
+    The Redis commands used by the app, as redis-py-style methods. Each one
+    builds its arguments and hands them to `_call(args, parse)`, which the
+    client sends right away and the pipeline queues.
+    """
+    @abstractmethod
+    def _call(self, args: list, parse=None):
+        """Send or queue one command; `parse` maps the raw reply."""
 
-    # Minimal set of operations used by the app
     def incr(self, key: str):
-        return self._command("INCR", key)
+        return self._call(["INCR", key])
+
+    def incrby(self, key: str, amount: int = 1):
+        return self._call(["INCRBY", key, amount])
 
     def hset(self, key: str, field: str, value: str):
-        return self._command("HSET", key, field, value)
+        return self._call(["HSET", key, field, value])
 
     def expire(self, key: str, seconds: int):
-        return self._command("EXPIRE", key, seconds)
+        return self._call(["EXPIRE", key, seconds])
 
     def hgetall(self, key: str):
-        res = self._command("HGETALL", key)
-        # Upstash returns list: [field1, val1, field2, val2]
-        if isinstance(res, list):
-            it = iter(res)
-            out = {}
-            for i in range(0, len(res), 2):
-                try:
-                    k = res[i]
-                    v = res[i+1]
-                except Exception:
-                    break
-                out[str(k)] = v
-            return out
-        if isinstance(res, dict):
-            return res
-        return {}
+        return self._call(["HGETALL", key], _pairs_to_dict)
+
+    def hget(self, key: str, field: str):
+        return self._call(["HGET", key, field])
+
+    def hdel(self, key: str, *fields):
+        return self._call(["HDEL", key, *fields])
+
+    def hincrby(self, key: str, field: str, amount: int = 1):
+        return self._call(["HINCRBY", key, field, amount])
+
+    def sadd(self, key: str, *members):
+        return self._call(["SADD", key, *members])
+
+    def spop(self, key: str, count: int | None = None):
+        if count is None:
+            return self._call(["SPOP", key])
+        return self._call(["SPOP", key, count])
+
+    def eval(self, script: str, numkeys: int, *keys_and_args):
+        return self._call(["EVAL", script, numkeys, *keys_and_args])
 
     def keys(self, pattern: str):
-        res = self._command("KEYS", pattern)
-        return res or []
+        return self._call(["KEYS", pattern], lambda res: res or [])
 
     def get(self, key: str):
-        return self._command("GET", key)
+        return self._call(["GET", key])
+
+    def getdel(self, key: str):
+        return self._call(["GETDEL", key])
+
+    def scan(self, cursor: int = 0, match: str | None = None, count: int | None = None):
+        args = ["SCAN", cursor]
+        if match:
+            args += ["MATCH", match]
+        if count:
+            args += ["COUNT", count]
+        return self._call(args, _scan_result)
+
+    def set(self, key: str, value: str, ex: int | None = None, nx: bool = False):
+        args = ["SET", key, value]
+        if ex:
+            args += ["EX", ex]
+        if nx:
+            args.append("NX")
+        return self._call(args)
+
+    def mget(self, keys, *args):
+        # same calling convention as redis-py: a list of keys or varargs
+        keys = list(keys) if isinstance(keys, (list, tuple)) else [keys]
+        return self._call(["MGET", *keys, *args])
+
+    def delete(self, *keys: str):
+        return self._call(["DEL", *keys])
+
+    def zadd(self, key: str, mapping: dict):
+        args = []
+        for member, score in mapping.items():
+            args += [score, member]
+        return self._call(["ZADD", key, *args])
+
+    def zrevrange(self, key: str, start: int, end: int, withscores: bool = False):
+        if withscores:
+            return self._call(["ZREVRANGE", key, start, end, "WITHSCORES"], _with_scores)
+        return self._call(["ZREVRANGE", key, start, end])
+
+    def zrangebylex(self, key: str, min: str, max: str, start: int | None = None, num: int | None = None):
+        args = ["ZRANGEBYLEX", key, min, max]
+        if start is not None and num is not None:
+            args += ["LIMIT", start, num]
+        return self._call(args)
+
+    def zmscore(self, key: str, members):
+        return self._call(["ZMSCORE", key, *members])
+
+    def pfcount(self, *keys: str):
+        return self._call(["PFCOUNT", *keys])
+
+    def rpush(self, key: str, *values):
+        return self._call(["RPUSH", key, *values])
+
+    def lrange(self, key: str, start: int, end: int):
+        return self._call(["LRANGE", key, start, end])
+
 
-    def delete(self, key: str):
-        return self._command("DEL", key)
+class UpstashRESTClient(UpstashCommands):
+    """
+    Minimal Upstash REST transport.
+    - one pooled keep-alive `requests.Session` per client
+    - the accepted payload shape is detected once and reused
+    - `pipeline()` batches commands into one POST to /pipeline
+    """
+    def __init__(self, rest_url: str, token: str, timeout: float = 5, pool_size: int = 20):
+        self.base = rest_url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.headers = {
+            'Authorization': f'Bearer {self.token}',
+            'Content-Type': 'application/json'
+        }
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(self.headers)
+        self._shape = None
+        self._shape_lock = threading.Lock()
+
+    # -------------------------
+    # Transport
+    # -------------------------
+    def _post(self, path: str, payload):
+        return self.session.post(f"{self.base}/{path}", data=json.dumps(payload), timeout=self.timeout)
+
+    def _learn_shape(self, cmd: list):
+        # Try each shape once; remember the first one the server accepts
+        last_error = None
+        for index, shape in enumerate(COMMAND_SHAPES):
+            resp = self._post("command", shape(cmd))
+            if resp.status_code < 400:
+                self._shape = index
+                print(f"[UpstashREST] Using payload shape #{index}")
+                return resp
+            last_error = f"{resp.status_code}: {resp.text[:200]}"
+        raise UpstashError(f"no payload shape accepted ({last_error})")
+
+    def _execute(self, cmd: list):
+        if self._shape is None:
+            with self._shape_lock:
+                if self._shape is None:
+                    return _command_result(self._learn_shape(cmd), cmd)
+        return _command_result(self._post("command", COMMAND_SHAPES[self._shape](cmd)), cmd)
+
+    def _execute_pipeline(self, cmds: list) -> list:
+        return _pipeline_results(self._post("pipeline", cmds), cmds)
+
+    def _call(self, args: list, parse=None):
+        res = self._execute([_arg(a) for a in args])
+        return parse(res) if parse else res
+
+    def _command(self, *args):
+        return self._call(list(args))
+
+    def pipeline(self, transaction: bool = False):
+        return UpstashPipeline(self)
+
+
+class UpstashPipeline(UpstashCommands):
+    """
+    Queues commands and sends them in one POST to /pipeline on execute()
+    through the client it was created from. Like redis-py's
+    non-transactional pipeline: each command returns the pipeline itself
+    and execute() returns the results in order.
+    """
+    def __init__(self, client: Any):
+        self._client = client
+        self._queue = []
+
+    def _call(self, args: list, parse=None):
+        self._queue.append(([_arg(a) for a in args], parse))
+        return self
+
+    def _parse_results(self, queue: list, results: list, raise_on_error: bool) -> list:
+        out = []
+        for (cmd, parse), res in zip(queue, results):
+            if isinstance(res, UpstashError):
+                if raise_on_error:
+                    raise res
+                out.append(res)
+            else:
+                out.append(parse(res) if parse else res)
+        return out
+
+    def execute(self, raise_on_error: bool = True) -> list:
+        queue, self._queue = self._queue, []
+        if not queue:
+            return []
+        results = self._client._execute_pipeline([cmd for cmd, _ in queue])
+        return self._parse_results(queue, results, raise_on_error)
+
+    def pipeline(self, transaction: bool = False):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._queue = []
+
+
+class FallbackPipeline:
+    """
+    Pipeline wrapper with the same degradation as FallbackProxy: queuing
+    never raises and execute() returns None if the batch failed.
+    """
+    def __init__(self, pipe: Any):
+        self._pipe = pipe
+
+    def __getattr__(self, name: str):
+        def _queue(*args, **kwargs):
+            if self._pipe is not None:
+                getattr(self._pipe, name)(*args, **kwargs)
+            return self
+        return _queue
+
+    def execute(self):
+        if self._pipe is None:
+            return None
+        try:
+            return self._pipe.execute()
+        except Exception as e:
+            print(f"[RedisAdapter] pipeline failed: {e}")
+            return None
+
+
+# Marks "no on_error given" so None can be passed as a sentinel
+_UNSET = object()
 
 
 class FallbackProxy:
     """Wraps either a redis-py client or UpstashRESTClient and provides
-    the same method names used in the services.
+    the same method names used in the services. A failed call is logged and
+    returns its DEFAULTS entry (or None); pass `on_error=` to any command to
+    get a value the caller can tell apart from a real reply.
     """
+    # Conservative defaults used by services when a call fails
+    # (scan has none: a failed SCAN returns None so callers can stop and retry)
+    DEFAULTS = {
+        'keys': list,
+        'hgetall': dict,
+    }
+
     def __init__(self, client: Any):
         self._client = client
 
     def __getattr__(self, name: str):
-        def _call(*args, **kwargs):
+        def _call(*args, on_error=_UNSET, **kwargs):
             try:
                 attr = getattr(self._client, name)
                 return attr(*args, **kwargs)
             except Exception as e:
                 print(f"[RedisAdapter] {name} failed: {e}")
-                # Conservative defaults used by services
-                if name == 'keys':
-                    return []
-                if name == 'hgetall':
-                    return {}
-                return None
+                if on_error is not _UNSET:
+                    return on_error
+                default = self.DEFAULTS.get(name)
+                return default() if default else None
 
         return _call
 
+    def mget(self, keys, *args, on_error=_UNSET):
+        """MGET; on failure `on_error` if given, else a list of None with one entry per key."""
+        keys = list(keys) if isinstance(keys, (list, tuple)) else [keys, *args]
+        try:
+            return self._client.mget(keys)
+        except Exception as e:
+            print(f"[RedisAdapter] mget failed: {e}")
+            return on_error if on_error is not _UNSET else [None] * len(keys)
+
+    def getdel(self, key: str):
+        try:
+            return self._client.getdel(key)
+        except Exception as e:
+            print(f"[RedisAdapter] getdel failed: {e}")
+            return None
+
+    def pipeline(self, transaction: bool = False):
+        """Non-transactional pipeline; execute() returns None on failure."""
+        try:
+            return FallbackPipeline(self._client.pipeline(transaction=transaction))
+        except Exception as e:
+            print(f"[RedisAdapter] pipeline failed: {e}")
+            return FallbackPipeline(None)
+
+    def scan_batches(self, match: str | None = None, count: int | None = None):
+        """Yield keys batch by batch (lists) using SCAN; stops on failure."""
+        cursor = 0
+        while True:
+            res = self.scan(cursor, match=match, count=count)
+            if not res:
+                print(f"[RedisAdapter] SCAN {match} failed at cursor {cursor}; stopping early")
+                return
+            cursor, keys = res
+            keys = [k.decode("utf-8") if isinstance(k, bytes) else k for k in keys or []]
+            if keys:
+                yield keys
+            if int(cursor) == 0:
+                return
+
 
 def get_redis_client():
     """Return an adapter that implements the minimal Redis operations used
@@ -179,4 +447,4 @@ def get_redis_client():
         return FallbackProxy(None)
 
 
-__all__ = ['get_redis_client']
+__all__ = ['get_redis_client', 'UpstashRESTClient', 'FallbackProxy']
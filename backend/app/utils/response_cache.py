@@ -0,0 +1,218 @@
+"""Response cache for hot list endpoints.
+
+Entries live in Redis and in a small in-process
+LRU that keeps the cache useful when Redis is unreachable.
+
+Invalidation is version based: every entry depends on a few tags (for
+example `category:Technology` or `counters`), each tag has a version
+counter, and the versions are part of the cache key. Bumping a tag's
+version makes every entry that depends on it unreachable at once, without
+scanning for keys.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from app.utils.redis_client import get_redis_client
+from app.utils.async_redis_client import get_async_redis_client
+from app.utils import fast_json
+
+# Every entry depends on these on top of its own tags
+GLOBAL_TAG = "global"
+COUNTERS_TAG = "counters"
+# Returned by Redis calls that failed, as opposed to a real (possibly empty) reply
+REDIS_DOWN = object()
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+class LocalLRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: int):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class ResponseCache:
+    """
+    Versioned response cache with stale-while-revalidate.
+    - fresh_ttl: seconds an entry is served as-is
+    - stale_ttl: seconds a stale entry may still be served while one
+      background refresh recomputes it
+    """
+
+    def __init__(self, namespace: str, fresh_ttl: int = 30, stale_ttl: int = 300, lru_size: int = 512):
+        self.namespace = namespace
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        # sync client for invalidation from jobs, async one for request handlers
+        self.r = get_redis_client()
+        self.ar = get_async_redis_client()
+        self._lru = LocalLRU(lru_size)
+        self._local_versions = {}
+        self._versions_lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+
+    # -------------------------
+    # Versions / invalidation
+    # -------------------------
+    def _version_key(self, tag: str) -> str:
+        return f"{self.namespace}:ver:{tag}"
+
+    async def versions(self, tags: list) -> list:
+        res = await self.ar.mget([self._version_key(t) for t in tags], on_error=REDIS_DOWN)
+        if res is not REDIS_DOWN and isinstance(res, list) and len(res) == len(tags):
+            return [int(v or 0) for v in res]
+        # Redis unavailable: fall back to versions bumped in this process
+        with self._versions_lock:
+            return [self._local_versions.get(t, 0) for t in tags]
+
+    def invalidate(self, *tags: str):
+        """Bump the version of each tag so dependent entries are dropped."""
+        with self._versions_lock:
+            for tag in tags:
+                self._local_versions[tag] = self._local_versions.get(tag, 0) + 1
+        for tag in tags:
+            self.r.incr(self._version_key(tag))
+
+    # -------------------------
+    # Entries
+    # -------------------------
+    def make_key(self, params: dict, tags: list, versions: list) -> str:
+        raw = json.dumps({"p": params, "v": dict(zip(tags, versions))}, sort_keys=True, default=_json_default)
+        return f"{self.namespace}:entry:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    async def _read(self, key: str):
+        raw = await self.ar.get(key)
+        if raw:
+            try:
+                return fast_json.loads(raw)
+            except Exception:
+                pass
+        return self._lru.get(key)
+
+    async def _write(self, key: str, payload) -> dict:
+        now = time.time()
+        entry = {"key": key, "payload": payload, "computed_at": now, "fresh_until": now + self.fresh_ttl}
+        # Round-trip through JSON so cached and fresh responses look the same
+        data = fast_json.dumps(entry).decode("utf-8")
+        ttl = self.fresh_ttl + self.stale_ttl
+        await self.ar.set(key, data, ex=ttl)
+        self._lru.set(key, fast_json.loads(data), ttl)
+        return entry
+
+    async def _lookup(self, params: dict, tags: list):
+        tags = list(tags) + [GLOBAL_TAG, COUNTERS_TAG]
+        key = self.make_key(params, tags, await self.versions(tags))
+        return key, await self._read(key)
+
+    async def get_or_compute_entry(self, params: dict, tags: list, compute) -> dict:
+        """
+        Return the cache entry for `params`, computing it with the `compute`
+        coroutine function on a miss. Stale entries are served immediately
+        while a single background task refreshes them. The entry carries
+        `key` and `computed_at`, which together identify its payload.
+        """
+        key, entry = await self._lookup(params, tags)
+
+        if entry:
+            if entry.get("fresh_until", 0) < time.time():
+                self._schedule_refresh(key, compute)
+            entry.setdefault("key", key)
+            return entry
+
+        payload = await compute()
+        return await self._write(key, payload)
+
+    async def get_or_compute(self, params: dict, tags: list, compute):
+        entry = await self.get_or_compute_entry(params, tags, compute)
+        return entry["payload"]
+
+    def _schedule_refresh(self, key: str, compute):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def _refresh():
+            try:
+                # Only one worker refreshes a given entry (SET NX returns None when
+                # held). Without Redis there is no shared lock; _refreshing keeps
+                # it to one refresh per process.
+                locked = await self.ar.set(f"{key}:lock", "1", ex=self.fresh_ttl, nx=True, on_error=REDIS_DOWN)
+                if not locked:
+                    return
+                payload = await compute()
+                await self._write(key, payload)
+            except Exception as e:
+                print(f"[ResponseCache] refresh failed for {key}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(_refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+# ---------------------
+# Article list cache
+# ---------------------
+article_list_cache = ResponseCache("article_list", fresh_ttl=30, stale_ttl=300)
+
+
+def article_list_tags(category: str | None, tag: str | None) -> list:
+    """Dependency tags for a GET /article/ query."""
+    tags = []
+    if category:
+        tags.append(f"category:{category}")
+    if tag:
+        tags.append(f"tag:{tag}")
+    return tags or ["all"]
+
+
+def invalidate_article_lists(category: str | None, tags: list | None):
+    """Drop cached list pages that a newly inserted article could appear in."""
+    deps = ["all"]
+    if category:
+        deps.append(f"category:{category}")
+    deps += [f"tag:{t}" for t in (tags or [])]
+    article_list_cache.invalidate(*deps)
+
+
+def invalidate_article_counters():
+    """Drop every cached list page after views/votes are flushed to Mongo."""
+    article_list_cache.invalidate(COUNTERS_TAG)
+
+
+def invalidate_all_article_lists():
+    article_list_cache.invalidate(GLOBAL_TAG)
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: article response serialization.
+
+Compares the old paths (Pydantic response_model validation for article
+detail, serialize_article + jsonable_encoder for list pages) with the
+MongoJSONResponse fast path, on a 20-article card page and a 50 KB article.
+
+    python bench_serialization.py [--rounds 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.models.article_model import ArticleDB
+from app.utils.fast_json import MongoJSONResponse
+
+
+def make_article(content_bytes: int, i: int = 0) -> dict:
+    now = datetime.utcnow() - timedelta(minutes=i)
+    return {
+        "_id": ObjectId(),
+        "title": f"Markets rally as central bank holds rates steady ({i})",
+        "url": f"https://example.com/news/{i}",
+        "summary": "Stocks rose on Tuesday after the central bank left rates unchanged. " * 3,
+        "content": ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * (content_bytes // 57 + 1))[:content_bytes],
+        "image_url": f"https://example.com/img/{i}.jpg",
+        "category": "Business",
+        "tags": ["markets", "central bank", "interest rates", "stocks", "economy"],
+        "sentiment": "positive",
+        "source_url": "https://example.com",
+        "author_email": "system@newsapp.com",
+        "upvotes": 12, "downvotes": 1, "comments_count": 4, "views": 1503,
+        "created_at": now, "updated_at": now,
+    }
+
+
+def card(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if k not in ("content", "author_email")}
+
+
+# -------------------------
+# Old paths
+# -------------------------
+def old_detail(doc: dict) -> bytes:
+    # serialize_article + response_model=ArticleDB validation and re-serialization
+    doc = dict(doc)
+    doc["_id"] = str(doc["_id"])
+    return ArticleDB.model_validate(doc).model_dump_json(by_alias=True).encode("utf-8")
+
+
+def old_page(docs: list) -> bytes:
+    # serialize_article mutating each doc, then FastAPI's jsonable_encoder
+    # and JSONResponse rendering
+    articles = []
+    for d in docs:
+        d = dict(d)
+        d["_id"] = str(d["_id"])
+        articles.append(d)
+    return JSONResponse(jsonable_encoder({"articles": articles, "next_cursor": None})).body
+
+
+# -------------------------
+# Fast path
+# -------------------------
+def fast(payload) -> bytes:
+    return MongoJSONResponse(payload).body
+
+
+def bench(label: str, fn, rounds: int) -> float:
+    per_call = min(timeit.repeat(fn, number=rounds, repeat=5)) / rounds
+    print(f"  {label:<28} {per_call * 1e6:9.1f} µs")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark article serialization paths.")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = [card(make_article(2000, i)) for i in range(20)]
+    article = make_article(50 * 1024)
+
+    print("20-article card page")
+    slow = bench("jsonable_encoder + json", lambda: old_page(page), args.rounds)
+    quick = bench("MongoJSONResponse (orjson)", lambda: fast({"articles": page, "next_cursor": None}), args.rounds)
+    print(f"  speedup: {slow / quick:.1f}x\n")
+
+    print("50 KB article detail")
+    slow = bench("ArticleDB response_model", lambda: old_detail(article), args.rounds)
+    quick = bench("MongoJSONResponse (orjson)", lambda: fast(article), args.rounds)
+    print(f"  speedup: {slow / quick:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,4 +19,8 @@ if __name__ == '__main__':
     # For production, a WSGI server like Gunicorn should be used.
     # app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)))
     load_dotenv()
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Trust X-Forwarded-For only from our own proxies (comma-separated IPs)
+    uvicorn.run(
+        "app.main:app", host="0.0.0.0", port=8000, reload=True,
+        proxy_headers=True, forwarded_allow_ips=os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+    )
\ No newline at end of file
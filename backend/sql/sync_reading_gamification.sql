@@ -0,0 +1,28 @@
+-- Batched gamification sync used by analytics_service.flush_user_reads.
+--
+-- `updates` is a JSON array of {"id": "<user id>", "gamification": {...}}.
+-- Each user's reading fields are merged into the gamification JSON
+-- (points and other keys are kept) in a single statement.
+-- Returns the number of users updated.
+create or replace function public.sync_reading_gamification(updates jsonb)
+returns integer
+language sql
+security definer
+set search_path = public
+as $$
+  with patch as (
+    select item->>'id' as id, item->'gamification' as gamification
+    from jsonb_array_elements(updates) as item
+  ), updated as (
+    update public.users u
+    set gamification = coalesce(u.gamification::jsonb, '{}'::jsonb) || patch.gamification
+    from patch
+    where u.id = patch.id::uuid
+    returning 1
+  )
+  select count(*)::integer from updated;
+$$;
+
+-- security definer runs as the owner: only the backend's service role may call it
+revoke all on function public.sync_reading_gamification(jsonb) from public, anon, authenticated;
+grant execute on function public.sync_reading_gamification(jsonb) to service_role;
@@ -0,0 +1,95 @@
+import json
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from pymongo.errors import BulkWriteError
+from app.services import analytics_service as svc
+from app.services.analytics_service import AnalyticsService, CLEAR_FLUSHED_SCRIPT, USER_VIEW_KEY_PREFIX
+from app.utils.redis_client import FallbackProxy
+
+
+class Analytics:
+    """Records bulk_write calls; `fail` lists op indexes to reject."""
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.ops = []
+
+    def bulk_write(self, ops, ordered=True):
+        self.ops += ops
+        if self.fail:
+            raise BulkWriteError({"writeErrors": [{"index": i, "code": 1} for i in sorted(self.fail)]})
+
+
+@pytest.fixture
+def r(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(svc, "r", FallbackProxy(client))
+    return client
+
+
+def read(article_id, ts="2026-10-19T09:00:00"):
+    return article_id, json.dumps({"ts": ts, "reading_time": 30})
+
+
+def queue(r, user, *reads):
+    r.hset(f"{USER_VIEW_KEY_PREFIX}{user}", mapping=dict(reads))
+
+
+def queued(r, user) -> dict:
+    return r.hgetall(f"{USER_VIEW_KEY_PREFIX}{user}")
+
+
+def flush(monkeypatch, users, synced=None, analytics=None, during_sync=None):
+    def sync(user_ids):
+        if during_sync:
+            during_sync()
+        return set(user_ids) if synced is None else set(synced) & set(user_ids)
+    service = AnalyticsService()
+    monkeypatch.setattr(service, "_sync_gamification", sync)
+    monkeypatch.setattr(svc, "analytics_collection", analytics or Analytics())
+    return service._flush_user_batch([f"{USER_VIEW_KEY_PREFIX}{u}" for u in users])
+
+
+def test_clear_script_only_removes_unchanged_fields(r):
+    key = f"{USER_VIEW_KEY_PREFIX}u1"
+    r.hset(key, mapping={"a1": "old", "a2": "x", "a3": "y"})
+    r.hset(key, "a1", "new")
+    assert r.eval(CLEAR_FLUSHED_SCRIPT, 1, key, "a1", "old", "a2", "x") == 1
+    assert r.hgetall(key) == {"a1": "new", "a3": "y"}
+
+
+def test_flushed_reads_are_cleared(r, monkeypatch):
+    queue(r, "u1", read("a1"), read("a2"))
+    result = flush(monkeypatch, ["u1"])
+    assert (result["users"], result["reads"], result["failed"]) == (1, 2, 0)
+    assert queued(r, "u1") == {}
+
+
+def test_reads_queued_during_the_flush_survive(r, monkeypatch):
+    queue(r, "u1", read("a1"))
+
+    def newer_reads():
+        queue(r, "u1", read("a1", ts="2026-10-19T10:00:00"), read("a2"))
+    flush(monkeypatch, ["u1"], during_sync=newer_reads)
+    assert set(queued(r, "u1")) == {"a1", "a2"}
+    assert json.loads(queued(r, "u1")["a1"])["ts"] == "2026-10-19T10:00:00"
+
+
+def test_unsynced_users_keep_their_reads(r, monkeypatch):
+    queue(r, "u1", read("a1"))
+    queue(r, "u2", read("a2"))
+    result = flush(monkeypatch, ["u1", "u2"], synced=["u1"])
+    assert (result["users"], result["failed"]) == (1, 1)
+    assert queued(r, "u1") == {}
+    assert set(queued(r, "u2")) == {"a2"}
+
+
+def test_users_mongo_rejected_are_not_synced_or_cleared(r, monkeypatch):
+    queue(r, "u1", read("a1"))
+    queue(r, "u2", read("a2"))
+    result = flush(monkeypatch, ["u1", "u2"], analytics=Analytics(fail=[1]))
+    assert (result["users"], result["failed"]) == (1, 1)
+    assert queued(r, "u1") == {}
+    assert set(queued(r, "u2")) == {"a2"}
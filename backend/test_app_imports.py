@@ -0,0 +1,11 @@
+import importlib
+import pytest
+
+# Import cycles between services only show up when the whole app is loaded
+for dep in ("fastapi", "motor", "pymongo", "redis", "dotenv", "supabase", "apscheduler", "transformers", "keybert"):
+    pytest.importorskip(dep)
+
+
+def test_app_imports():
+    main = importlib.import_module("app.main")
+    assert main.app.routes
@@ -0,0 +1,151 @@
+import time
+from types import SimpleNamespace
+import pytest
+
+from app.utils import auth_cache
+from app.utils.auth_cache import TOKEN_TTL, PROFILE_TTL
+from app.utils.response_cache import LocalLRU
+
+
+class FakeQuery:
+    def __init__(self, rows, calls):
+        self.rows = rows
+        self.calls = calls
+        self.username = None
+
+    def select(self, fields):
+        return self
+
+    def eq(self, field, value):
+        self.username = value
+        return self
+
+    def execute(self):
+        self.calls.append(self.username)
+        return SimpleNamespace(data=[r for r in self.rows if r["username"] == self.username])
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        return FakeQuery(self.rows, self.calls)
+
+
+def request():
+    return SimpleNamespace(state=SimpleNamespace())
+
+
+def advance(monkeypatch, seconds: float):
+    now = time.time() + seconds
+    monkeypatch.setattr(time, "time", lambda: now)
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    monkeypatch.setattr(auth_cache, "_tokens", LocalLRU(16))
+    monkeypatch.setattr(auth_cache, "_profiles", LocalLRU(16))
+    payloads = {}
+    calls = []
+
+    def verify(token):
+        calls.append(token)
+        return payloads.get(token)
+    monkeypatch.setattr(auth_cache, "verify_token", verify)
+    return payloads, calls
+
+
+@pytest.fixture
+def users(monkeypatch):
+    db = FakeSupabase([{"id": 1, "username": "alice", "role": None, "email": "a@example.com"}])
+    monkeypatch.setattr(auth_cache, "supabase", db)
+    return db
+
+
+def test_token_is_decoded_once_until_ttl(decoded, monkeypatch):
+    payloads, calls = decoded
+    payloads["t"] = {"sub": "alice"}
+    assert auth_cache.decode_token("t") == {"sub": "alice"}
+    assert auth_cache.decode_token("t") == {"sub": "alice"}
+    assert calls == ["t"]
+
+    advance(monkeypatch, TOKEN_TTL + 1)
+    auth_cache.decode_token("t")
+    assert calls == ["t", "t"]
+
+
+def test_token_cache_never_outlives_exp(decoded, monkeypatch):
+    payloads, calls = decoded
+    payloads["t"] = {"sub": "alice", "exp": time.time() + 10}
+    auth_cache.decode_token("t")
+    advance(monkeypatch, 5)
+    auth_cache.decode_token("t")
+    assert calls == ["t"]
+
+    # Expired: verify_token runs again (and would reject it)
+    advance(monkeypatch, 11)
+    del payloads["t"]
+    assert auth_cache.decode_token("t") is None
+    assert calls == ["t", "t"]
+
+
+def test_expired_and_invalid_tokens_are_not_cached(decoded):
+    payloads, calls = decoded
+    payloads["old"] = {"sub": "alice", "exp": time.time() - 1}
+    auth_cache.decode_token("old")
+    auth_cache.decode_token("old")
+    auth_cache.decode_token("bad")
+    auth_cache.decode_token("bad")
+    assert calls == ["old", "old", "bad", "bad"]
+
+
+def test_token_payload_is_memoized_per_request(decoded):
+    payloads, calls = decoded
+    payloads["a"] = {"sub": "alice"}
+    payloads["b"] = {"sub": "bob"}
+    req = request()
+    assert auth_cache.get_token_payload(req, "a") == {"sub": "alice"}
+    auth_cache._tokens.delete("a")
+    assert auth_cache.get_token_payload(req, "a") == {"sub": "alice"}
+    assert calls == ["a"]
+    # A different token on the same request is decoded, not reused
+    assert auth_cache.get_token_payload(req, "b") == {"sub": "bob"}
+
+
+def test_profile_is_slim_and_cached_until_ttl(decoded, users, monkeypatch):
+    profile = auth_cache.get_user_profile("alice")
+    assert profile == {"id": 1, "username": "alice", "role": "user"}
+    auth_cache.get_user_profile("alice")
+    assert users.calls == ["alice"]
+
+    advance(monkeypatch, PROFILE_TTL + 1)
+    auth_cache.get_user_profile("alice")
+    assert users.calls == ["alice", "alice"]
+
+
+def test_missing_user_is_not_cached(decoded, users):
+    assert auth_cache.get_user_profile("nobody") is None
+    assert auth_cache.get_user_profile("nobody") is None
+    assert auth_cache.get_user_profile("") is None
+    assert users.calls == ["nobody", "nobody"]
+
+
+def test_invalidate_and_remember_profile(decoded, users):
+    auth_cache.get_user_profile("alice")
+    users.rows[0]["role"] = "admin"
+    auth_cache.invalidate_user("alice")
+    assert auth_cache.get_user_profile("alice")["role"] == "admin"
+
+    auth_cache.remember_profile({"id": 2, "username": "bob", "role": "user"})
+    assert auth_cache.get_user_profile("bob") == {"id": 2, "username": "bob", "role": "user"}
+    assert users.calls == ["alice", "alice"]
+
+
+def test_profile_is_memoized_per_request(decoded, users):
+    req = request()
+    auth_cache.get_request_profile(req, "alice")
+    auth_cache.invalidate_user("alice")
+    auth_cache.get_request_profile(req, "alice")
+    assert users.calls == ["alice"]
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.services import feed_service
+from app.services.feed_service import HOT_POOL, POOL_SIZE
+from app.utils.redis_client import FallbackProxy
+from app.utils.async_redis_client import AsyncFallbackProxy
+from app.utils.response_cache import LocalLRU
+
+NOW = datetime.utcnow()
+
+
+def article(i: int, category: str = "Tech", hours_old: float = 1, tags=(), hot: float = 0) -> dict:
+    return {
+        "_id": f"{i:024x}", "title": f"Article {i}", "category": category, "tags": list(tags),
+        "hot_score": hot, "created_at": NOW - timedelta(hours=hours_old),
+    }
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        return self.docs[:n]
+
+
+class FakeArticles:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def _match(self, query):
+        return [
+            d for d in self.docs
+            if d["created_at"] >= query["created_at"]["$gte"]
+            and ("category" not in query or d["category"] == query["category"])
+        ]
+
+    def distinct(self, field, query):
+        return sorted({d[field] for d in self._match(query)})
+
+    def find(self, query, projection=None):
+        return FakeCursor(self._match(query))
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(feed_service, "r", FallbackProxy(fakeredis.FakeRedis(server=server, decode_responses=True)))
+    monkeypatch.setattr(feed_service, "ar", AsyncFallbackProxy(
+        lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    ))
+    monkeypatch.setattr(feed_service, "_local_pools", LocalLRU(64))
+    return server
+
+
+def test_rebuild_stores_recent_pools_per_category_and_hot(redis, monkeypatch):
+    docs = [
+        article(1, "Tech", hot=5), article(2, "Tech", hours_old=2, hot=9),
+        article(3, "Sports", hot=1), article(4, "Sports", hours_old=24 * 5, hot=100),
+    ]
+    monkeypatch.setattr(feed_service, "articles_collection", FakeArticles(docs))
+    assert feed_service.rebuild_candidate_pools() == 2
+
+    # Served from Redis once the local copies are gone
+    monkeypatch.setattr(feed_service, "_local_pools", LocalLRU(64))
+    pools = asyncio.run(feed_service.load_pools(["Tech", "Sports", HOT_POOL]))
+    assert [d["_id"] for d in pools["Tech"]] == [article(1)["_id"], article(2)["_id"]]
+    # Articles older than POOL_MAX_AGE are left out
+    assert [d["_id"] for d in pools["Sports"]] == [article(3)["_id"]]
+    assert [d["_id"] for d in pools[HOT_POOL]] == [article(2)["_id"], article(1)["_id"], article(3)["_id"]]
+
+
+def test_pool_size_is_bounded(redis, monkeypatch):
+    docs = [article(i, hours_old=i / 100) for i in range(POOL_SIZE + 20)]
+    monkeypatch.setattr(feed_service, "articles_collection", FakeArticles(docs))
+    feed_service.rebuild_candidate_pools()
+    pools = asyncio.run(feed_service.load_pools(["Tech"]))
+    assert len(pools["Tech"]) == POOL_SIZE
+
+
+def test_missing_pool_falls_back_to_mongo(redis, monkeypatch):
+    built = []
+
+    async def from_db(name):
+        built.append(name)
+        return [article(7, name)]
+    monkeypatch.setattr(feed_service, "_pool_from_db", from_db)
+
+    feed_service._store_pool("Tech", [article(1)])
+    pools = asyncio.run(feed_service.load_pools(["Tech", "Science"]))
+    assert built == ["Science"]
+    assert pools["Tech"][0]["_id"] == article(1)["_id"]
+
+
+def feed(monkeypatch, pools: dict, signals: dict, **kwargs) -> dict:
+    async def load_signals(user):
+        return signals
+
+    async def load_pools(names):
+        return {n: pools.get(n, []) for n in names}
+
+    monkeypatch.setattr(feed_service, "load_user_signals", load_signals)
+    monkeypatch.setattr(feed_service, "load_pools", load_pools)
+    return asyncio.run(feed_service.get_for_you_feed({"sub": "alice"}, **kwargs))
+
+
+def test_merge_drops_duplicates_and_read_articles(monkeypatch):
+    tech = [article(1, tags=["ai"]), article(2)]
+    hot = [article(1, tags=["ai"]), article(3, "Sports")]
+    signals = {"preferred": ["Tech"], "affinity": {}, "read_ids": {article(2)["_id"]}}
+    result = feed(monkeypatch, {"Tech": tech, HOT_POOL: hot}, signals)
+    assert sorted(d["_id"] for d in result["articles"]) == [article(1)["_id"], article(3)["_id"]]
+
+
+def test_ranking_prefers_categories_tags_and_recency(monkeypatch):
+    preferred = article(1, "Tech", hours_old=6)
+    liked_tags = article(2, "Sports", hours_old=6, tags=["f1"])
+    fresh = article(3, "Science", hours_old=0)
+    stale = article(4, "Science", hours_old=48)
+    signals = {"preferred": ["Tech"], "affinity": {"f1": 1.0}, "read_ids": set()}
+    result = feed(monkeypatch, {"Tech": [preferred], HOT_POOL: [stale, fresh, liked_tags]}, signals)
+    assert [d["_id"] for d in result["articles"]] == [
+        liked_tags["_id"], preferred["_id"], fresh["_id"], stale["_id"]
+    ]
+
+
+def test_pagination(monkeypatch):
+    hot = [article(i, hours_old=i) for i in range(5)]
+    signals = {"preferred": [], "affinity": {}, "read_ids": set()}
+    first = feed(monkeypatch, {HOT_POOL: hot}, signals, limit=2)
+    last = feed(monkeypatch, {HOT_POOL: hot}, signals, limit=2, offset=4)
+    assert [d["_id"] for d in first["articles"]] == [article(0)["_id"], article(1)["_id"]]
+    assert first["next_offset"] == 2
+    assert [d["_id"] for d in last["articles"]] == [article(4)["_id"]]
+    assert last["next_offset"] is None
@@ -0,0 +1,39 @@
+from app.utils.http_cache import make_etag, etag_matches, cache_headers
+
+
+class FakeRequest:
+    def __init__(self, if_none_match=None):
+        self.headers = {"if-none-match": if_none_match} if if_none_match is not None else {}
+
+
+def test_make_etag_is_stable_and_order_sensitive():
+    assert make_etag("a", 1, None) == make_etag("a", 1, None)
+    assert make_etag("a", 1) != make_etag(1, "a")
+    assert make_etag("a").startswith('"') and make_etag("a").endswith('"')
+
+
+def test_etag_matches_exact():
+    etag = make_etag("article", 3)
+    assert etag_matches(FakeRequest(etag), etag)
+    assert not etag_matches(FakeRequest(make_etag("article", 4)), etag)
+
+
+def test_etag_matches_without_header():
+    assert not etag_matches(FakeRequest(), make_etag("x"))
+    assert not etag_matches(FakeRequest(""), make_etag("x"))
+
+
+def test_etag_matches_wildcard():
+    assert etag_matches(FakeRequest(" * "), make_etag("x"))
+
+
+def test_etag_matches_weak_and_lists():
+    etag = make_etag("x")
+    assert etag_matches(FakeRequest(f"W/{etag}"), etag)
+    assert etag_matches(FakeRequest(f'"other", W/{etag}'), etag)
+    assert not etag_matches(FakeRequest('"other", W/"another"'), etag)
+
+
+def test_cache_headers_vary_is_optional():
+    assert cache_headers('"e"', "private, no-cache") == {"ETag": '"e"', "Cache-Control": "private, no-cache"}
+    assert cache_headers('"e"', "public", vary="Authorization")["Vary"] == "Authorization"
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from app.services.job_manager import JobManager
+
+
+def blocking_job(release: threading.Event, result="done"):
+    async def run(job):
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return result
+    return run
+
+
+def wait_finished(job, timeout: float = 5):
+    for _ in range(int(timeout / 0.01)):
+        if not job.is_active:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job.id} still {job.status}")
+
+
+def test_same_key_coalesces_into_running_job():
+    manager = JobManager()
+    release = threading.Event()
+    first, created = manager.submit("ingest", blocking_job(release), coalesce_key="ingest")
+    second, created_again = manager.submit("ingest", blocking_job(release), coalesce_key="ingest")
+    assert created and not created_again
+    assert second is first
+
+    release.set()
+    wait_finished(first)
+    assert first.status == "completed" and first.result == "done"
+
+
+def test_different_keys_run_separately():
+    manager = JobManager()
+    release = threading.Event()
+    a, _ = manager.submit("ingest", blocking_job(release), coalesce_key="ingest:tech")
+    b, created = manager.submit("ingest", blocking_job(release), coalesce_key="ingest:sports")
+    assert created and a is not b
+    release.set()
+    wait_finished(a)
+    wait_finished(b)
+
+
+def test_finished_job_releases_its_key():
+    manager = JobManager()
+    release = threading.Event()
+    release.set()
+    first, _ = manager.submit("ingest", blocking_job(release), coalesce_key="ingest")
+    wait_finished(first)
+
+    second, created = manager.submit("ingest", blocking_job(release), coalesce_key="ingest")
+    assert created and second is not first
+    wait_finished(second)
+
+
+def test_failed_job_releases_its_key():
+    async def boom(job):
+        raise RuntimeError("feed down")
+
+    manager = JobManager()
+    failed, _ = manager.submit("ingest", boom, coalesce_key="ingest")
+    wait_finished(failed)
+    assert failed.status == "failed" and failed.error == "feed down"
+
+    release = threading.Event()
+    release.set()
+    retry, created = manager.submit("ingest", blocking_job(release), coalesce_key="ingest")
+    assert created and retry is not failed
+    wait_finished(retry)
+
+
+def test_trim_keeps_running_jobs():
+    manager = JobManager(max_jobs=2)
+    release = threading.Event()
+    running, _ = manager.submit("reprocess", blocking_job(release))
+    done = threading.Event()
+    done.set()
+    for _ in range(3):
+        job, _ = manager.submit("ingest", blocking_job(done))
+        wait_finished(job)
+
+    assert manager.get(running.id) is running
+    assert len(manager.list_jobs()) <= 2
+    release.set()
+    wait_finished(running)
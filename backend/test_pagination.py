@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter, keyset_sort
+
+
+def test_cursor_round_trip_datetime():
+    doc_id = ObjectId()
+    created_at = datetime(2026, 10, 19, 8, 30, 15, 123000)
+    cursor = encode_cursor("new", created_at, doc_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "new") == (created_at, doc_id)
+
+
+def test_cursor_round_trip_number():
+    doc_id = ObjectId()
+    for value in (0, 42, 3.75):
+        assert decode_cursor(encode_cursor("top", value, doc_id), "top") == (value, doc_id)
+
+
+def test_cursor_from_other_sort_mode_is_rejected():
+    cursor = encode_cursor("top", 10, ObjectId())
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "new")
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJzIjoibmV3In0", encode_cursor("new", 1, "x" * 24)])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "new")
+    assert exc.value.status_code == 400
+
+
+def test_keyset_filter_descending():
+    doc_id = ObjectId()
+    assert keyset_filter("upvotes", -1, 5, doc_id) == {"$or": [
+        {"upvotes": {"$lt": 5}},
+        {"upvotes": 5, "_id": {"$lt": doc_id}},
+    ]}
+
+
+def test_keyset_filter_ascending():
+    doc_id = ObjectId()
+    ts = datetime(2026, 1, 1)
+    assert keyset_filter("created_at", 1, ts, doc_id) == {"$or": [
+        {"created_at": {"$gt": ts}},
+        {"created_at": ts, "_id": {"$gt": doc_id}},
+    ]}
+
+
+def test_keyset_sort_uses_id_as_tiebreaker():
+    assert keyset_sort("hot_score", -1) == [("hot_score", -1), ("_id", -1)]
@@ -0,0 +1,36 @@
+import math
+from datetime import datetime, timedelta
+from app.services.ranking_service import (
+    hot_score, counter_update, HOT_EPOCH, HOT_GRAVITY_SECONDS, VIEW_WEIGHT
+)
+
+
+def test_hot_score_at_epoch_without_engagement_is_zero():
+    assert hot_score(0, 0, 0, HOT_EPOCH) == 0
+
+
+def test_hot_score_engagement_is_log_scaled():
+    # 9 upvotes -> engagement 10 -> one order of magnitude
+    assert math.isclose(hot_score(0, 9, 0, HOT_EPOCH), 1.0)
+    assert math.isclose(hot_score(int(99 / VIEW_WEIGHT), 0, 0, HOT_EPOCH), 2.0)
+
+
+def test_hot_score_never_goes_below_the_age_term():
+    created_at = HOT_EPOCH + timedelta(days=3)
+    assert hot_score(0, 0, 50, created_at) == hot_score(0, 0, 0, created_at)
+
+
+def test_gravity_trades_recency_for_engagement():
+    older = datetime(2026, 1, 1)
+    newer = older + timedelta(seconds=HOT_GRAVITY_SECONDS)
+    # One gravity period of recency is worth 10x the engagement
+    assert math.isclose(hot_score(0, 0, 0, newer), hot_score(0, 9, 0, older))
+    assert hot_score(0, 0, 0, newer + timedelta(seconds=1)) > hot_score(0, 9, 0, older)
+
+
+def test_counter_update_applies_deltas_then_rescores():
+    pipeline = counter_update({"views": 5, "upvotes": -1})
+    assert pipeline[0]["$set"]["views"] == {"$add": [{"$ifNull": ["$views", 0]}, 5]}
+    assert pipeline[0]["$set"]["upvotes"] == {"$add": [{"$ifNull": ["$upvotes", 0]}, -1]}
+    assert pipeline[0]["$set"]["updated_at"] == "$$NOW"
+    assert "hot_score" in pipeline[-1]["$set"]
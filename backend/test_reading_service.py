@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from app.services import reading_service
+from app.services.reading_service import record_reads
+
+TS = datetime(2026, 10, 19, 9, 30)
+
+
+class Collection:
+    """
+    mongomock collection whose bulk_write replays UpdateOne ops one by one
+    (mongomock's bulk API doesn't accept current pymongo UpdateOne objects).
+    """
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    def bulk_write(self, ops, ordered=True):
+        errors = []
+        for i, op in enumerate(ops):
+            try:
+                self._inner.update_one(op._filter, op._doc, upsert=op._upsert)
+            except DuplicateKeyError as e:
+                errors.append({"index": i, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(reading_service, "reading_events_collection", db.reading_events)
+    monkeypatch.setattr(reading_service, "reading_stats_collection", Collection(db.reading_stats))
+    return db
+
+
+def stats(db, user="u1") -> dict:
+    return db.reading_stats.find_one({"_id": user})
+
+
+def test_batch_is_counted(db):
+    assert record_reads([("u1", "a1", 30), ("u1", "a2", None), ("u2", "a1", 10)], "b1", TS)
+    assert db.reading_events.count_documents({}) == 3
+    doc = stats(db)
+    assert (doc["total_reads"], doc["articles_read"], doc["reading_seconds"], doc["streak"]) == (2, 2, 30, 1)
+    assert [r["article_id"] for r in doc["recent"]] == ["a1", "a2"]
+    assert doc["batches"] == ["b1"]
+
+
+def test_retried_batch_is_a_no_op(db):
+    reads = [("u1", "a1", 30), ("u2", "a1", 10)]
+    assert record_reads(reads, "b1", TS)
+    assert record_reads(reads, "b1", TS)
+    assert db.reading_events.count_documents({}) == 2
+    assert stats(db)["total_reads"] == 1
+    assert stats(db, "u2")["reading_seconds"] == 10
+
+
+def test_retry_finishes_a_batch_whose_events_already_landed(db, monkeypatch):
+    reads = [("u1", "a1", 30), ("u1", "a1", 5)]
+
+    def down(*args, **kwargs):
+        raise RuntimeError("mongo unavailable")
+    with monkeypatch.context() as m:
+        m.setattr(Collection, "bulk_write", down)
+        assert not record_reads(reads, "b1", TS)
+    assert db.reading_events.count_documents({}) == 2
+    assert stats(db) is None
+
+    assert record_reads(reads, "b1", TS)
+    doc = stats(db)
+    # The batch's own stored events don't make its article look already read
+    assert (doc["total_reads"], doc["articles_read"], doc["reading_seconds"]) == (2, 1, 35)
+    assert db.reading_events.count_documents({}) == 2
+
+
+def test_rereading_counts_reads_but_not_articles(db):
+    record_reads([("u1", "a1", 30)], "b1", TS)
+    record_reads([("u1", "a1", 30)], "b2", TS + timedelta(minutes=5))
+    doc = stats(db)
+    assert (doc["total_reads"], doc["articles_read"]) == (2, 1)
+    assert doc["batches"] == ["b1", "b2"]
+
+
+def test_streak_follows_consecutive_days(db):
+    record_reads([("u1", "a1", None)], "b1", TS)
+    record_reads([("u1", "a2", None)], "b2", TS + timedelta(days=1))
+    assert stats(db)["streak"] == 2
+    # A late batch from an earlier day neither breaks nor extends it
+    record_reads([("u1", "a3", None)], "b3", TS)
+    assert stats(db)["streak"] == 2
+    record_reads([("u1", "a4", None)], "b4", TS + timedelta(days=3))
+    assert stats(db)["streak"] == 1
+
+
+def test_reads_without_ids_are_ignored(db):
+    assert record_reads([(None, "a1", 5), ("u1", "", 5)], "b1", TS)
+    assert db.reading_events.count_documents({}) == 0
@@ -0,0 +1,106 @@
+import asyncio
+import time
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.utils.redis_client import FallbackProxy
+from app.utils.async_redis_client import AsyncFallbackProxy
+from app.utils import response_cache
+from app.utils.response_cache import ResponseCache
+
+
+def make_cache(up: bool = True, **kwargs) -> ResponseCache:
+    cache = ResponseCache("test", **kwargs)
+    if up:
+        server = fakeredis.FakeServer()
+        cache.r = FallbackProxy(fakeredis.FakeRedis(server=server, decode_responses=True))
+        cache.ar = AsyncFallbackProxy(lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    else:
+        # Every command fails, as with Redis unreachable
+        cache.r = FallbackProxy(None)
+        cache.ar = AsyncFallbackProxy(lambda: None)
+    return cache
+
+
+def counter():
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"n": len(calls)}
+    return compute, calls
+
+
+def advance(monkeypatch, seconds: float):
+    now = time.time() + seconds
+    monkeypatch.setattr(response_cache.time, "time", lambda: now)
+
+
+async def settle(cache: ResponseCache):
+    while cache._tasks:
+        await asyncio.gather(*cache._tasks)
+
+
+@pytest.mark.parametrize("up", [True, False])
+def test_hit_skips_compute(up):
+    async def run():
+        cache = make_cache(up)
+        compute, calls = counter()
+        assert await cache.get_or_compute({"page": 1}, ["all"], compute) == {"n": 1}
+        assert await cache.get_or_compute({"page": 1}, ["all"], compute) == {"n": 1}
+        assert len(calls) == 1
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("up", [True, False])
+def test_invalidate_drops_dependent_entries(up):
+    async def run():
+        cache = make_cache(up)
+        compute, calls = counter()
+        await cache.get_or_compute({"page": 1}, ["category:Tech"], compute)
+        await cache.get_or_compute({"page": 1}, ["category:Sports"], compute)
+
+        cache.invalidate("category:Tech")
+        assert await cache.get_or_compute({"page": 1}, ["category:Tech"], compute) == {"n": 3}
+        assert await cache.get_or_compute({"page": 1}, ["category:Sports"], compute) == {"n": 2}
+    asyncio.run(run())
+
+
+def test_versions_fall_back_to_local_bumps_when_redis_is_down():
+    async def run():
+        cache = make_cache(up=False)
+        cache.invalidate("counters", "counters", "tag:ai")
+        assert await cache.versions(["counters", "tag:ai", "all"]) == [2, 1, 0]
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("up", [True, False])
+def test_stale_entry_is_served_then_refreshed(up, monkeypatch):
+    async def run():
+        cache = make_cache(up, fresh_ttl=30, stale_ttl=300)
+        compute, calls = counter()
+        await cache.get_or_compute({"page": 1}, ["all"], compute)
+        advance(monkeypatch, 31)
+
+        # Stale: served as-is while one background refresh runs
+        assert await cache.get_or_compute({"page": 1}, ["all"], compute) == {"n": 1}
+        await settle(cache)
+        assert len(calls) == 2
+        assert (await cache.get_or_compute({"page": 1}, ["all"], compute)) == {"n": 2}
+    asyncio.run(run())
+
+
+def test_refresh_lock_is_shared_through_redis(monkeypatch):
+    async def run():
+        cache = make_cache(fresh_ttl=30, stale_ttl=300)
+        compute, calls = counter()
+        entry = await cache.get_or_compute_entry({"page": 1}, ["all"], compute)
+        # Another worker holds the refresh lock
+        await cache.ar.set(f"{entry['key']}:lock", "1", ex=300)
+        advance(monkeypatch, 31)
+
+        await cache.get_or_compute({"page": 1}, ["all"], compute)
+        await settle(cache)
+        assert len(calls) == 1
+    asyncio.run(run())
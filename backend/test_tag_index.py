@@ -0,0 +1,69 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.services import tag_index
+from app.services.tag_index import index_article_tags, retag_article, DF_KEY, LEX_KEY, CO_PREFIX, RECENT_PREFIX
+from app.utils.redis_client import FallbackProxy
+
+
+@pytest.fixture
+def r(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(tag_index, "r", FallbackProxy(client))
+    return client
+
+
+def df(r) -> dict:
+    return {t: int(s) for t, s in r.zrange(DF_KEY, 0, -1, withscores=True)}
+
+
+def co(r, tag) -> dict:
+    return {t: int(s) for t, s in r.zrange(f"{CO_PREFIX}{tag}", 0, -1, withscores=True)}
+
+
+def recent(r, tag) -> list:
+    return r.lrange(f"{RECENT_PREFIX}{tag}", 0, -1)
+
+
+def test_index_counts_tags_and_pairs(r):
+    index_article_tags("a1", ["AI", "Chips"])
+    index_article_tags("a2", ["AI", "", "AI"])
+    assert df(r) == {"AI": 2, "Chips": 1}
+    assert co(r, "AI") == {"Chips": 1}
+    assert recent(r, "AI") == ["a2", "a1"]
+    assert set(r.zrange(LEX_KEY, 0, -1)) == {"ai|AI", "chips|Chips"}
+
+
+def test_retag_moves_the_article(r):
+    index_article_tags("a1", ["AI", "Chips"])
+    index_article_tags("a2", ["AI", "Cloud"])
+    retag_article("a1", ["AI", "Chips"], ["AI", "Robots"])
+
+    assert df(r) == {"AI": 2, "Cloud": 1, "Robots": 1}
+    assert co(r, "AI") == {"Cloud": 1, "Robots": 1}
+    assert co(r, "Robots") == {"AI": 1}
+    assert co(r, "Chips") == {}
+    assert recent(r, "Chips") == []
+    assert recent(r, "AI") == ["a2", "a1"]
+    # The lex entry goes with the last article carrying the tag
+    assert set(r.zrange(LEX_KEY, 0, -1)) == {"ai|AI", "cloud|Cloud", "robots|Robots"}
+
+
+def test_retagged_article_joins_recent_lists_at_the_tail(r, monkeypatch):
+    monkeypatch.setattr(tag_index, "RECENT_LIMIT", 2)
+    index_article_tags("a2", ["AI"])
+    retag_article("a1", [], ["AI"])
+    assert recent(r, "AI") == ["a2", "a1"]
+    # A full list keeps its newer articles
+    retag_article("a0", [], ["AI"])
+    assert recent(r, "AI") == ["a2", "a1"]
+    assert df(r) == {"AI": 3}
+
+
+def test_unchanged_tags_are_left_alone(r):
+    index_article_tags("a1", ["AI", "Chips"])
+    assert retag_article("a1", ["AI", "Chips"], [" AI", "Chips "])
+    assert df(r) == {"AI": 1, "Chips": 1}
+    assert recent(r, "AI") == ["a1"]
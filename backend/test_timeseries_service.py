@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from app.services.timeseries_service import _series
+
+
+def day_doc(day: datetime, **slots) -> dict:
+    doc = {"day": day, "views": [0] * 24, "upvotes": [0] * 24, "downvotes": [0] * 24}
+    for metric, values in slots.items():
+        for hour, n in values.items():
+            doc[metric][hour] = n
+    return doc
+
+
+START = datetime(2026, 10, 18)
+
+
+def test_hourly_series_has_a_point_per_hour():
+    docs = [day_doc(START, views={0: 3, 23: 7})]
+    points = _series(docs, START, 2, "hour", ["views"])
+    assert len(points) == 48
+    assert points[0] == {"ts": START, "views": 3}
+    assert points[23] == {"ts": START + timedelta(hours=23), "views": 7}
+    assert all(p["views"] == 0 for p in points[24:])
+
+
+def test_missing_days_are_zero_filled():
+    docs = [day_doc(START + timedelta(days=1), upvotes={5: 2})]
+    points = _series(docs, START, 2, "day", ["views", "upvotes"])
+    assert points == [
+        {"ts": START, "views": 0, "upvotes": 0},
+        {"ts": START + timedelta(days=1), "views": 0, "upvotes": 2},
+    ]
+
+
+def test_six_hour_resolution_sums_slots():
+    docs = [day_doc(START, views={0: 1, 5: 2, 6: 4, 23: 8})]
+    points = _series(docs, START, 1, "6h", ["views"])
+    assert [p["ts"].hour for p in points] == [0, 6, 12, 18]
+    assert [p["views"] for p in points] == [3, 4, 0, 8]
+
+
+def test_projection_without_metric_reads_as_zero():
+    docs = [{"day": START, "views": [1] * 24}]
+    points = _series(docs, START, 1, "day", ["views", "downvotes"])
+    assert points == [{"ts": START, "views": 24, "downvotes": 0}]
@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime
+from app.services.trending_service import window_buckets, OLDEST_BUCKET_WEIGHT, WINDOWS
+
+
+def test_one_hour_window_slides_over_previous_hour():
+    buckets = window_buckets("1h", datetime(2026, 10, 19, 10, 15))
+    assert buckets == [
+        ("trending:h:2026101910", 1.0),
+        ("trending:h:2026101909", round(OLDEST_BUCKET_WEIGHT * 0.75, 4)),
+    ]
+
+
+def test_24h_window_weights_decay_with_age():
+    buckets = window_buckets("24h", datetime(2026, 10, 19, 10, 30))
+    assert len(buckets) == 25
+    assert buckets[0] == ("trending:h:2026101910", 1.0)
+    assert buckets[-1] == ("trending:h:2026101810", round(OLDEST_BUCKET_WEIGHT * 0.5, 4))
+    weights = [w for _, w in buckets[:-1]]
+    assert weights == sorted(weights, reverse=True)
+
+
+def test_oldest_bucket_counts_fully_on_the_hour():
+    buckets = window_buckets("24h", datetime(2026, 10, 19, 10, 0))
+    assert buckets[-1] == ("trending:h:2026101810", OLDEST_BUCKET_WEIGHT)
+
+
+def test_7d_window_uses_day_buckets():
+    buckets = window_buckets("7d", datetime(2026, 10, 19, 18, 0))
+    assert [k for k, _ in buckets] == [f"trending:d:202610{d:02d}" for d in range(19, 11, -1)]
+    assert buckets[-1][1] == round(OLDEST_BUCKET_WEIGHT * 0.25, 4)
+
+
+def test_window_crossing_midnight():
+    buckets = window_buckets("1h", datetime(2026, 10, 19, 0, 30))
+    assert [k for k, _ in buckets] == ["trending:h:2026101900", "trending:h:2026101823"]
+
+
+@pytest.mark.parametrize("window", list(WINDOWS))
+def test_all_weights_positive(window):
+    for minute in (0, 1, 59):
+        assert all(0 < w <= 1 for _, w in window_buckets(window, datetime(2026, 10, 19, 23, minute)))
+
+
+def test_card_counters_are_refreshed_without_touching_other_fields():
+    from app.services.trending_service import _with_counters
+    from app.utils import fast_json
+    card = fast_json.dumps({"_id": "a", "title": "T", "tags": [], "views": 1, "upvotes": 0}).decode("utf-8")
+    merged = fast_json.loads(_with_counters(card, {"views": 7, "upvotes": 2, "title": "ignored"}))
+    assert merged == {"_id": "a", "title": "T", "tags": [], "views": 7, "upvotes": 2}
+
+
+def test_flushers_refresh_existing_cards(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    mongomock = pytest.importorskip("mongomock")
+    from bson import ObjectId
+    from app.services import trending_service
+    from app.utils.redis_client import FallbackProxy
+    client = fakeredis.FakeRedis(decode_responses=True)
+    articles = mongomock.MongoClient().db.articles
+    monkeypatch.setattr(trending_service, "r", FallbackProxy(client))
+    monkeypatch.setattr(trending_service, "articles_collection", articles)
+
+    carded, uncarded = ObjectId(), ObjectId()
+    for oid in (carded, uncarded):
+        articles.insert_one({"_id": oid, "title": "T", "views": 1, "upvotes": 0})
+    trending_service.store_card(articles.find_one({"_id": carded}))
+    articles.update_many({}, {"$set": {"views": 9, "upvotes": 3}})
+
+    assert trending_service.refresh_card_counters([str(carded), str(uncarded), "bad"]) == 1
+    card = trending_service.fast_json.loads(client.get(f"trending:card:{carded}"))
+    assert (card["title"], card["views"], card["upvotes"]) == ("T", 9, 3)
+    assert client.get(f"trending:card:{uncarded}") is None
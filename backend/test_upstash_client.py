@@ -0,0 +1,85 @@
+import pytest
+from app.utils.redis_client import UpstashRESTClient, UpstashError, FallbackProxy
+from upstash_standin import serve
+
+TOKEN = "test"
+
+
+@pytest.fixture
+def standin():
+    servers = []
+
+    def start(shape=None):
+        server = serve(port=0, token=TOKEN, shape=shape)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.mark.parametrize("shape", [0, 1, 2, 3])
+def test_learns_the_accepted_payload_shape(standin, shape):
+    client = UpstashRESTClient(standin(shape), TOKEN)
+    assert client._shape is None
+    assert client.set("k", "v") == "OK"
+    assert client._shape == shape
+    assert client.get("k") == "v"
+
+
+def test_no_accepted_shape_raises(standin):
+    client = UpstashRESTClient(standin(), "wrong-token")
+    with pytest.raises(UpstashError):
+        client.get("k")
+    assert client._shape is None
+
+
+def test_command_error_raises_and_proxy_degrades(standin):
+    client = UpstashRESTClient(standin(), TOKEN)
+    client.set("plain", "v")
+    with pytest.raises(UpstashError, match="WRONGTYPE"):
+        client.hget("plain", "field")
+
+    proxy = FallbackProxy(client)
+    assert proxy.hget("plain", "field") is None
+    assert proxy.hgetall("plain") == {}
+
+
+def test_pipeline_returns_errors_in_position(standin):
+    client = UpstashRESTClient(standin(), TOKEN)
+    pipe = client.pipeline()
+    pipe.set("plain", "v").hget("plain", "field").hincrby("h", "f", 2).hgetall("h")
+    results = pipe.execute(raise_on_error=False)
+    assert results[0] == "OK"
+    assert isinstance(results[1], UpstashError)
+    assert results[2] == 2
+    assert results[3] == {"f": "2"}
+
+
+def test_pipeline_raises_on_error_by_default(standin):
+    client = UpstashRESTClient(standin(), TOKEN)
+    pipe = client.pipeline()
+    pipe.set("plain", "v").hget("plain", "field")
+    with pytest.raises(UpstashError, match="WRONGTYPE"):
+        pipe.execute()
+    # The queue is sent once either way
+    assert pipe.execute() == []
+
+
+def test_scan_batches_yields_lists(standin):
+    proxy = FallbackProxy(UpstashRESTClient(standin(), TOKEN))
+    for i in range(3):
+        proxy.set(f"user_views:{i}", "1")
+    proxy.set("other", "1")
+    batches = list(proxy.scan_batches(match="user_views:*", count=100))
+    assert sorted(k for batch in batches for k in batch) == ["user_views:0", "user_views:1", "user_views:2"]
+
+
+def test_failed_scan_is_told_apart_from_an_empty_one(standin):
+    proxy = FallbackProxy(UpstashRESTClient(standin(), "wrong-token"))
+    assert proxy.scan(0, match="user_views:*") is None
+    assert list(proxy.scan_batches(match="user_views:*")) == []
+
+    proxy = FallbackProxy(UpstashRESTClient(standin(), TOKEN))
+    assert proxy.scan(0, match="user_views:*") == (0, [])
@@ -0,0 +1,78 @@
+import threading
+from app.services import view_buffer as vb
+from app.services.view_buffer import ViewBuffer
+
+
+def patch_stores(monkeypatch, counts_ok=True, readers_ok=True, reads_ok=True):
+    calls = {"counts": [], "readers": [], "reads": []}
+
+    def increment(counts):
+        calls["counts"].append(dict(counts))
+        return counts_ok
+
+    def add_readers(readers):
+        calls["readers"].append({a: set(ids) for a, ids in readers.items()})
+        return readers_ok
+
+    def track(reads, batch_id, ts):
+        calls["reads"].append(batch_id)
+        return reads_ok
+    monkeypatch.setattr(vb, "increment_article_views", increment)
+    monkeypatch.setattr(vb, "add_unique_readers", add_readers)
+    monkeypatch.setattr(vb, "track_reads", track)
+    return calls
+
+
+def test_failed_unique_readers_are_retried_next_tick(monkeypatch):
+    calls = patch_stores(monkeypatch, readers_ok=False)
+    buf = ViewBuffer()
+    buf.record("a", reader_id="r1")
+    buf.flush()
+    buf.record("a", reader_id="r2")
+    buf.flush()
+    assert calls["readers"] == [{"a": {"r1"}}, {"a": {"r1", "r2"}}]
+
+
+def test_unique_readers_are_dropped_after_the_bound(monkeypatch):
+    calls = patch_stores(monkeypatch, readers_ok=False)
+    monkeypatch.setattr(vb, "MAX_FAILED_FLUSHES", 1)
+    buf = ViewBuffer()
+    buf.record("a", reader_id="r1")
+    buf.flush()
+    buf.flush()
+    buf.flush()
+    assert len(calls["readers"]) == 2
+
+
+def test_readers_wait_for_the_counts(monkeypatch):
+    calls = patch_stores(monkeypatch, counts_ok=False)
+    buf = ViewBuffer()
+    buf.record("a", reader_id="r1")
+    buf.flush()
+    assert calls["readers"] == []
+    assert buf._readers == {"a": {"r1"}}
+
+
+def test_stop_skips_final_flush_while_the_thread_is_busy(monkeypatch):
+    calls = patch_stores(monkeypatch)
+    release = threading.Event()
+    buf = ViewBuffer()
+    buf._thread = threading.Thread(target=release.wait, daemon=True)
+    buf._thread.start()
+    buf.record("a")
+    try:
+        assert buf.stop(timeout=0.01) == 0
+        assert calls["counts"] == []
+    finally:
+        release.set()
+
+
+def test_stop_drains_the_buffer(monkeypatch):
+    calls = patch_stores(monkeypatch)
+    buf = ViewBuffer(interval=60)
+    buf.start()
+    buf.record("a")
+    buf.record("a", user_id="u1")
+    assert buf.stop() == 2
+    assert calls["counts"] == [{"a": 2}]
+    assert len(calls["reads"]) == 1
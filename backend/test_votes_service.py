@@ -0,0 +1,61 @@
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.services.votes_service import RECORD_VOTE_SCRIPT, TAKE_DELTAS_SCRIPT, RESTORE_DELTAS_SCRIPT
+
+KEYS = ("article_votes:a1", "article_vote_deltas:a1", "article_votes_dirty")
+
+
+@pytest.fixture
+def r():
+    return fakeredis.FakeRedis(decode_responses=True)
+
+
+def vote(r, user, value):
+    return [int(v) for v in r.eval(RECORD_VOTE_SCRIPT, 3, *KEYS, user, value, "a1")]
+
+
+def deltas(r):
+    return {k: int(v) for k, v in r.hgetall(KEYS[1]).items()}
+
+
+def test_first_upvote(r):
+    assert vote(r, "alice", 1) == [1, 1, 0]
+    assert r.hget(KEYS[0], "alice") == "1"
+    assert deltas(r) == {"upvotes": 1}
+    assert r.smembers(KEYS[2]) == {"a1"}
+
+
+def test_same_vote_twice_toggles_off(r):
+    vote(r, "alice", 1)
+    assert vote(r, "alice", 1) == [0, -1, 0]
+    assert r.hget(KEYS[0], "alice") is None
+    assert deltas(r) == {"upvotes": 0}
+
+
+def test_switching_vote_moves_the_count(r):
+    vote(r, "alice", 1)
+    assert vote(r, "alice", -1) == [-1, -1, 1]
+    assert deltas(r) == {"upvotes": 0, "downvotes": 1}
+
+
+def test_users_are_independent(r):
+    vote(r, "alice", 1)
+    vote(r, "bob", 1)
+    vote(r, "carol", -1)
+    assert deltas(r) == {"upvotes": 2, "downvotes": 1}
+
+
+def test_take_then_restore_deltas(r):
+    vote(r, "alice", 1)
+    vote(r, "bob", -1)
+    taken = r.eval(TAKE_DELTAS_SCRIPT, 1, KEYS[1])
+    assert dict(zip(taken[0][::2], taken[0][1::2])) == {"upvotes": "1", "downvotes": "1"}
+    assert not r.exists(KEYS[1])
+
+    r.srem(KEYS[2], "a1")
+    r.eval(RESTORE_DELTAS_SCRIPT, 2, KEYS[2], KEYS[1], "a1", 1, 1)
+    assert deltas(r) == {"upvotes": 1, "downvotes": 1}
+    assert r.smembers(KEYS[2]) == {"a1"}
@@ -0,0 +1,149 @@
+"""
+In-memory stand-in for the Upstash REST API, for local benchmarks.
+
+Serves POST /command (one command) and POST /pipeline (a JSON array of
+commands) with bearer-token auth, for a small subset of commands. Pass
+--shape N to accept only one of the payload shapes in
+app.utils.redis_client.COMMAND_SHAPES, as the real endpoint does; the
+default accepts all of them.
+
+    python upstash_standin.py [--port 8079] [--token dev] [--shape 0] [--latency-ms 0]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def run(self, cmd: list):
+        name, args = str(cmd[0]).upper(), [str(a) for a in cmd[1:]]
+        with self.lock:
+            value = self.data.get(args[0]) if args else None
+            if name.startswith("H") and value is not None and not isinstance(value, dict):
+                raise ValueError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            if name == "GET":
+                return self.data.get(args[0])
+            if name == "SET":
+                self.data[args[0]] = args[1]
+                return "OK"
+            if name == "GETDEL":
+                return self.data.pop(args[0], None)
+            if name in ("INCR", "INCRBY"):
+                value = int(self.data.get(args[0], 0)) + (int(args[1]) if name == "INCRBY" else 1)
+                self.data[args[0]] = str(value)
+                return value
+            if name == "DEL":
+                return sum(1 for k in args if self.data.pop(k, None) is not None)
+            if name == "MGET":
+                return [self.data.get(k) if isinstance(self.data.get(k), str) else None for k in args]
+            if name == "HSET":
+                h = self.data.setdefault(args[0], {})
+                added = 0
+                for i in range(1, len(args) - 1, 2):
+                    added += args[i] not in h
+                    h[args[i]] = args[i + 1]
+                return added
+            if name == "HINCRBY":
+                h = self.data.setdefault(args[0], {})
+                h[args[1]] = str(int(h.get(args[1], 0)) + int(args[2]))
+                return int(h[args[1]])
+            if name == "HGETALL":
+                h = self.data.get(args[0]) or {}
+                return [x for kv in h.items() for x in kv]
+            if name == "EXPIRE":
+                return 1 if args[0] in self.data else 0
+            if name == "SCAN":
+                match = args[args.index("MATCH") + 1] if "MATCH" in args else "*"
+                prefix = match.rstrip("*")
+                return ["0", [k for k in self.data if k.startswith(prefix)]]
+        raise ValueError(f"ERR unknown command '{name}'")
+
+
+def make_handler(store: Store, token: str, shape: int | None, latency: float):
+    def command_from(payload):
+        # Mirrors COMMAND_SHAPES; returns None if the payload is not accepted
+        shapes = [
+            lambda p: p if isinstance(p, list) else None,
+            lambda p: p.get("cmd") if isinstance(p, dict) else None,
+            lambda p: p.get("command") if isinstance(p, dict) else None,
+            lambda p: (p.get("commands") or [None])[0] if isinstance(p, dict) else None,
+        ]
+        candidates = [shapes[shape]] if shape is not None else shapes
+        for extract in candidates:
+            cmd = extract(payload)
+            if cmd:
+                return cmd
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status: int, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _result(self, cmd):
+            try:
+                return {"result": store.run(cmd)}
+            except Exception as e:
+                return {"error": str(e)}
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"null")
+            if self.headers.get("Authorization") != f"Bearer {token}":
+                return self._reply(401, {"error": "Unauthorized"})
+            if latency:
+                time.sleep(latency)
+
+            if self.path.rstrip("/") == "/pipeline":
+                if not isinstance(payload, list) or not all(isinstance(c, list) for c in payload):
+                    return self._reply(400, {"error": "ERR pipeline expects an array of commands"})
+                return self._reply(200, [self._result(c) for c in payload])
+
+            if self.path.rstrip("/") == "/command":
+                cmd = command_from(payload)
+                if not cmd:
+                    return self._reply(400, {"error": "ERR failed to parse command"})
+                result = self._result(cmd)
+                return self._reply(400 if "error" in result else 200, result)
+
+            return self._reply(404, {"error": "not found"})
+
+    return Handler
+
+
+def serve(port: int = 8079, token: str = "dev", shape: int | None = None, latency_ms: float = 0):
+    """Start the stand-in in a daemon thread; returns the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(Store(), token, shape, latency_ms / 1000))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-memory Upstash REST stand-in.")
+    parser.add_argument("--port", type=int, default=8079)
+    parser.add_argument("--token", default="dev")
+    parser.add_argument("--shape", type=int, choices=range(4), default=None)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.token, args.shape, args.latency_ms)
+    print(f"Upstash stand-in on http://127.0.0.1:{args.port} (token={args.token}, shape={args.shape})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()